@@ -0,0 +1,121 @@
+"""
+Throughput of concurrent add_round calls under each database mode.
+
+Every mode runs in its own process because the database settings are read from the
+environment on startup. Each worker thread plays its own multiplayer game, like one
+daphne worker thread per running game:
+
+    python benchmarks/add_round_throughput.py --threads 8 --rounds 200
+    DATABASE_ENGINE=postgresql DATABASE_PASSWORD=... python benchmarks/add_round_throughput.py
+
+Without DATABASE_ENGINE=postgresql only the two SQLite modes are compared; with it the
+PostgreSQL modes with and without the connection pool are measured as well.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+SQLITE_MODES = {
+    "sqlite default": {"DATABASE_ENGINE": "sqlite", "SQLITE_TUNED": "false"},
+    "sqlite tuned": {"DATABASE_ENGINE": "sqlite", "SQLITE_TUNED": "true"},
+}
+POSTGRES_MODES = {
+    "postgresql persistent": {"DATABASE_ENGINE": "postgresql", "DATABASE_POOL": "false"},
+    "postgresql pool": {"DATABASE_ENGINE": "postgresql", "DATABASE_POOL": "true"},
+}
+
+
+def measure(threads: int, rounds: int):
+    """runs inside the process of one mode"""
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dart.settings")
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.db import OperationalError, connection
+
+    from main.business_logic.multiplayer_game import add_round, get_turn
+    from main.models import MultiplayerGame, MultiplayerPlayer
+    from main.utils import MultiplayerGameStatus
+
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            # a file, the default in-memory test database can not be shared between threads
+            settings.DATABASES["default"]["TEST"]["NAME"] = str(Path(directory) / "benchmark.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            users = [User.objects.create(username=f"benchmark-{i}") for i in range(threads * 2)]
+            games = []
+            for i in range(threads):
+                game = MultiplayerGame.objects.create(
+                    score=1_000_000, max_players=2, status=MultiplayerGameStatus.PROGRESS.value
+                )
+                for rank, user in enumerate(users[i * 2 : i * 2 + 2], start=1):
+                    MultiplayerPlayer.objects.create(game=game, player=user, rank=rank)
+                games.append(game)
+
+            errors = []
+
+            def play(game):
+                try:
+                    for _ in range(rounds):
+                        player = game.game_players.get(rank=get_turn(game))
+                        try:
+                            add_round(game, player, 60, True)
+                        except OperationalError as error:
+                            errors.append(error)
+                finally:
+                    connection.close()
+
+            workers = [threading.Thread(target=play, args=(game,)) for game in games]
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    total = threads * rounds
+    print(
+        f"{total - len(errors)} rounds in {elapsed:.2f}s: {(total - len(errors)) / elapsed:.0f} rounds/s, "
+        f"{len(errors)} failed ({errors[0] if errors else 'no errors'})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=200, help="rounds per thread")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.threads, args.rounds)
+        return
+
+    modes = dict(SQLITE_MODES)
+    if os.environ.get("DATABASE_ENGINE") == "postgresql":
+        modes.update(POSTGRES_MODES)
+    for name, env in modes.items():
+        print(f"== {name}", flush=True)
+        subprocess.run(
+            [sys.executable, __file__, "--child", "--threads", str(args.threads), "--rounds", str(args.rounds)],
+            env={**os.environ, **env},
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
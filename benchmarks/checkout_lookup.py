@@ -0,0 +1,62 @@
+"""
+Lookup cost of checkout suggestions, the generated tables against the previous lookup in
+checkout_map that split every suggestion string on each call:
+
+    python benchmarks/checkout_lookup.py --number 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dart.settings")
+
+import django
+
+django.setup()
+
+from main.constants import checkout_map
+
+started = time.perf_counter()
+from main.business_logic import checkout_solver
+
+IMPORT_SECONDS = time.perf_counter() - started
+
+LOOKUPS = [(score, darts) for score in range(0, 181) for darts in (1, 2, 3)]
+
+
+def previous_get_checkout_suggestion(left_score: int, throws_left: int) -> str | None:
+    checkout_suggestions = checkout_map.get(left_score, [])
+    for suggestion in checkout_suggestions:
+        if len(suggestion.split(" ")) <= throws_left:
+            return suggestion
+    return ""
+
+
+def measure(function, number: int) -> float:
+    """nanoseconds per lookup, over all scores and darts left"""
+    rounds = max(1, number // len(LOOKUPS))
+    seconds = min(
+        timeit.repeat(
+            lambda: [function(score, darts) for score, darts in LOOKUPS], number=rounds, repeat=5
+        )
+    )
+    return seconds / (rounds * len(LOOKUPS)) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200_000, help="lookups per repetition")
+    args = parser.parse_args()
+
+    print(f"building the tables took {IMPORT_SECONDS * 1000:.0f} ms at import")
+    print(f"checkout_map lookup: {measure(previous_get_checkout_suggestion, args.number):.0f} ns")
+    print(f"solver lookup:       {measure(checkout_solver.get_suggestion, args.number):.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
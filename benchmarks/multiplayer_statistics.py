@@ -0,0 +1,72 @@
+"""
+Rows scanned for the multiplayer statistics of one user, all rounds of the games vs the user's rounds.
+
+Creates finished games with many players each and builds the score histogram of one user
+the way it was built before (every round of the user's games) and with
+statistics.get_user_rounds:
+
+    python benchmarks/multiplayer_statistics.py --games 200 --players 10 --rounds 15
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--players", type=int, default=10, help="players per game")
+    parser.add_argument("--rounds", type=int, default=15, help="rounds per player")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dart.settings")
+
+    import django
+
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.db import connection
+
+    from main.business_logic.statistics import get_score_histogram, get_user_rounds
+    from main.models import MultiplayerGame, MultiplayerPlayer, MultiplayerRound
+    from main.utils import MultiplayerGameStatus
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        users = [User.objects.create(username=f"benchmark-{i}") for i in range(args.players)]
+        user = users[0]
+        for _ in range(args.games):
+            game = MultiplayerGame.objects.create(
+                score=501, max_players=args.players, status=MultiplayerGameStatus.FINISHED.value
+            )
+            players = MultiplayerPlayer.objects.bulk_create(
+                MultiplayerPlayer(game=game, player=player, rank=rank) for rank, player in enumerate(users, start=1)
+            )
+            MultiplayerRound.objects.bulk_create(
+                MultiplayerRound(game=game, player=player, points=(i * 37) % 181, needed_darts=3)
+                for player in players
+                for i in range(args.rounds)
+            )
+        games = MultiplayerGame.objects.filter(game_players__player=user)
+
+        for name, rounds in (
+            ("all rounds of the games", MultiplayerRound.objects.filter(game__in=games)),
+            ("rounds of the user", get_user_rounds(games, user)),
+        ):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                histogram = get_score_histogram(rounds)
+            elapsed = (time.perf_counter() - started) / args.repeat
+            print(f"{name}: {rounds.count()} rows scanned, {histogram.total_rounds} rounds counted, {elapsed * 1000:.1f}ms")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Query plans and timings of the hot game lookups with and without the indexes of
+migration 0020.
+
+Seeds a throwaway test database, runs the lookups with all migrations applied, then
+migrates back to 0019 and runs them again:
+
+    python benchmarks/query_plans.py --rounds 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dart.settings")
+
+import django
+
+django.setup()
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+
+from main.models import (
+    Game,
+    MultiplayerGame,
+    MultiplayerPlayer,
+    MultiplayerRound,
+    PreferredKeyBoard,
+)
+from main.utils import GameStatus, MultiplayerGameStatus
+
+BATCH_SIZE = 10_000
+PLAYERS_PER_GAME = 4
+ROUNDS_PER_PLAYER = 25
+
+
+def seed(round_count: int):
+    users = User.objects.bulk_create(
+        User(username=f"benchmark-{i}") for i in range(200)
+    )
+    PreferredKeyBoard.objects.bulk_create(
+        PreferredKeyBoard(player=user, keyboard=i % 2) for i, user in enumerate(users)
+    )
+    start = date(2024, 1, 1)
+    Game.objects.bulk_create(
+        (
+            Game(
+                player=random.choice(users),
+                date=start + timedelta(days=random.randint(0, 700)),
+                rounds=random.choice([3, 5, 10]),
+                score=random.choice([61, 81, 121]),
+                status=random.choice([s.value for s in GameStatus]),
+            )
+            for _ in range(round_count // 20)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    game_count = max(1, round_count // (PLAYERS_PER_GAME * ROUNDS_PER_PLAYER))
+    games = MultiplayerGame.objects.bulk_create(
+        (
+            MultiplayerGame(
+                score=501, max_players=PLAYERS_PER_GAME, status=MultiplayerGameStatus.FINISHED.value
+            )
+            for _ in range(game_count)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    players = MultiplayerPlayer.objects.bulk_create(
+        (
+            MultiplayerPlayer(game=game, player=user, rank=rank)
+            for game in games
+            for rank, user in enumerate(random.sample(users, PLAYERS_PER_GAME), start=1)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    rounds = (
+        MultiplayerRound(game_id=player.game_id, player=player, points=random.randint(0, 180))
+        for _ in range(ROUNDS_PER_PLAYER)
+        for player in players
+    )
+    MultiplayerRound.objects.bulk_create(rounds, batch_size=BATCH_SIZE)
+
+
+def get_lookups() -> dict:
+    player = MultiplayerPlayer.objects.order_by("?").first()
+    game = Game.objects.order_by("?").first()
+    return {
+        "rounds of a player": MultiplayerRound.objects.filter(
+            game_id=player.game_id, player=player
+        ).order_by("id"),
+        "last round of a game": MultiplayerRound.objects.filter(
+            game_id=player.game_id
+        ).order_by("-id")[:1],
+        "player by rank": MultiplayerPlayer.objects.filter(game_id=player.game_id, rank=1),
+        "player by user": MultiplayerPlayer.objects.filter(
+            game_id=player.game_id, player_id=player.player_id
+        ),
+        "games by status": Game.objects.filter(
+            player_id=game.player_id, status=GameStatus.PROGRESS.value
+        ),
+        "games of a category": Game.objects.filter(
+            date=game.date, rounds=game.rounds, score=game.score
+        ),
+        "keyboard of a user": PreferredKeyBoard.objects.filter(player_id=player.player_id),
+    }
+
+
+def measure(lookups: dict, repeat: int) -> dict:
+    results = {}
+    for name, queryset in lookups.items():
+        plan = queryset.explain()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())
+        elapsed_ms = (time.perf_counter() - started) / repeat * 1000
+        results[name] = (plan, elapsed_ms)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = time.perf_counter()
+        seed(args.rounds)
+        print(f"seeded {MultiplayerRound.objects.count()} rounds in {time.perf_counter() - started:.1f}s")
+        lookups = get_lookups()
+        after = measure(lookups, args.repeat)
+        call_command("migrate", "main", "0019", verbosity=0)
+        before = measure(lookups, args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    for name in lookups:
+        before_plan, before_ms = before[name]
+        after_plan, after_ms = after[name]
+        print(f"\n== {name}: {before_ms:.3f} ms -> {after_ms:.3f} ms")
+        print(f"before: {before_plan}")
+        print(f"after:  {after_plan}")
+
+
+if __name__ == "__main__":
+    main()
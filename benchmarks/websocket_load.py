@@ -0,0 +1,177 @@
+"""
+Load test of the game websocket against a running server.
+
+Creates a user, a session and a game in the configured database, opens many spectator
+sockets on the game and lets one player socket throw rounds. Reports the connect latency
+and the latency until a round reached every spectator:
+
+    daphne -p 8000 dart.asgi:application
+    python benchmarks/websocket_load.py --sockets 2000 --rounds 20
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import statistics
+import struct
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dart.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+
+from main.models import MultiplayerGame, MultiplayerPlayer, Session
+from main.utils import MultiplayerGameStatus
+
+
+class Socket:
+    """minimal websocket client, enough for text frames of the consumers"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, url: str, session_key: str) -> "Socket":
+        parsed = urlparse(url)
+        reader, writer = await asyncio.open_connection(parsed.hostname, parsed.port or 80)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write(
+            (
+                f"GET {parsed.path} HTTP/1.1\r\n"
+                f"Host: {parsed.netloc}\r\n"
+                f"Origin: http://{parsed.netloc}\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Key: {key}\r\n"
+                "Sec-WebSocket-Version: 13\r\n"
+                f"Cookie: {settings.SESSION_COOKIE_NAME}={session_key}\r\n\r\n"
+            ).encode()
+        )
+        status = await reader.readline()
+        if b" 101 " not in status:
+            raise ConnectionError(f"handshake failed: {status!r}")
+        while await reader.readline() not in (b"\r\n", b""):
+            pass
+        return cls(reader, writer)
+
+    async def send(self, text: str):
+        payload = text.encode()
+        mask = os.urandom(4)
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x81, 0x80 | length)
+        elif length < 2**16:
+            header = struct.pack("!BBH", 0x81, 0x80 | 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x81, 0x80 | 127, length)
+        masked = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+        self.writer.write(header + mask + masked)
+        await self.writer.drain()
+
+    async def receive(self) -> str:
+        while True:
+            first, second = await self.reader.readexactly(2)
+            length = second & 0x7F
+            if length == 126:
+                (length,) = struct.unpack("!H", await self.reader.readexactly(2))
+            elif length == 127:
+                (length,) = struct.unpack("!Q", await self.reader.readexactly(8))
+            payload = await self.reader.readexactly(length)
+            # skip pings and other control frames of the server
+            if first & 0x0F == 0x1:
+                return payload.decode()
+
+    def close(self):
+        self.writer.close()
+
+
+def create_game() -> tuple[MultiplayerGame, str]:
+    user, _ = User.objects.get_or_create(username="websocket-load-test")
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    game = MultiplayerGame.objects.create(
+        score=100_000,
+        creator=user,
+        max_players=1,
+        status=MultiplayerGameStatus.PROGRESS.value,
+        session=Session.objects.create(),
+        one_device_manage=True,
+    )
+    MultiplayerPlayer.objects.create(game=game, rank=1, player=user)
+    return game, session.session_key
+
+
+def percentiles(values: list[float]) -> str:
+    if len(values) < 2:
+        return "not enough samples"
+    cuts = statistics.quantiles(values, n=100)
+    return f"p50 {cuts[49]:.1f} ms, p90 {cuts[89]:.1f} ms, p99 {cuts[98]:.1f} ms, max {max(values):.1f} ms"
+
+
+async def run(url: str, session_key: str, socket_count: int, rounds: int, concurrency: int):
+    limit = asyncio.Semaphore(concurrency)
+    connect_ms = []
+
+    async def open_socket():
+        async with limit:
+            started = time.perf_counter()
+            socket = await Socket.connect(url, session_key)
+            connect_ms.append((time.perf_counter() - started) * 1000)
+            return socket
+
+    spectators = await asyncio.gather(*(open_socket() for _ in range(socket_count)))
+    player = await Socket.connect(url, session_key)
+    print(f"opened {socket_count} sockets, connect latency: {percentiles(connect_ms)}")
+
+    fan_out_ms = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await player.send(json.dumps({"points": "20"}))
+
+        async def wait(socket: Socket):
+            await socket.receive()
+            fan_out_ms.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(player.receive(), *(wait(socket) for socket in spectators))
+    print(f"{rounds} rounds to {socket_count} sockets, delivery latency: {percentiles(fan_out_ms)}")
+
+    for socket in (player, *spectators):
+        socket.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--server", default="ws://127.0.0.1:8000")
+    parser.add_argument("--sockets", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=200, help="sockets opened at the same time")
+    args = parser.parse_args()
+
+    game, session_key = create_game()
+    try:
+        asyncio.run(
+            run(f"{args.server}/ws/{game.id}/", session_key, args.sockets, args.rounds, args.concurrency)
+        )
+    finally:
+        game.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 from decouple import config, Csv
+from django.core.exceptions import ImproperlyConfigured
 
 import logging
 
@@ -105,12 +106,54 @@ ASGI_APPLICATION = "dart.asgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db/db.sqlite3",
+# sqlite (default) or postgresql
+DATABASE_ENGINE = config("DATABASE_ENGINE", default="sqlite")
+if DATABASE_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": config("DATABASE_NAME", default="dart"),
+            "USER": config("DATABASE_USER", default="dart"),
+            "PASSWORD": config("DATABASE_PASSWORD", default=""),
+            "HOST": config("DATABASE_HOST", default="127.0.0.1"),
+            "PORT": config("DATABASE_PORT", default="5432"),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
     }
-}
+    if config("DATABASE_POOL", default=True, cast=bool):
+        # pooled connections are returned to the pool after each request, so django must
+        # not keep them open itself (CONN_MAX_AGE has to be 0)
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": config("DATABASE_POOL_MIN_SIZE", default=2, cast=int),
+            "max_size": config("DATABASE_POOL_MAX_SIZE", default=20, cast=int),
+        }
+    else:
+        DATABASES["default"]["CONN_MAX_AGE"] = config("DATABASE_CONN_MAX_AGE", default=60, cast=int)
+elif DATABASE_ENGINE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": config("DATABASE_NAME", default=str(BASE_DIR / "db/db.sqlite3")),
+            "OPTIONS": {},
+        }
+    }
+    if config("SQLITE_TUNED", default=True, cast=bool):
+        # WAL lets readers continue while a throw is written, IMMEDIATE takes the write lock
+        # at the start of a transaction, so concurrent writers wait (timeout) instead of
+        # failing with "database is locked" when they upgrade from a read lock
+        DATABASES["default"]["OPTIONS"] = {
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA mmap_size=134217728;"
+                "PRAGMA cache_size=-20000;"
+            ),
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        }
+else:
+    raise ImproperlyConfigured(f"Unknown DATABASE_ENGINE {DATABASE_ENGINE}, use sqlite or postgresql")
 
 
 # Password validation
@@ -160,7 +203,69 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")  #
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Channels configuration
-CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+# memory: single process only, group sends do not reach other workers
+# redis: for multiple daphne workers, needs channels_redis and CHANNEL_LAYER_REDIS_URL
+# sqlite: for multiple workers on one host without a broker, e.g. local setups and tests
+CHANNEL_LAYER = config("CHANNEL_LAYER", default="memory")
+CHANNEL_LAYER_REDIS_URL = config("CHANNEL_LAYER_REDIS_URL", default="redis://127.0.0.1:6379/0")
+if CHANNEL_LAYER == "redis":
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": [CHANNEL_LAYER_REDIS_URL]},
+        }
+    }
+elif CHANNEL_LAYER == "sqlite":
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "main.channel_layers.SQLiteChannelLayer",
+            "CONFIG": {"path": config("CHANNEL_LAYER_SQLITE_PATH", default=str(BASE_DIR / "channel_layer.sqlite3"))},
+        }
+    }
+elif CHANNEL_LAYER == "memory":
+    CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+else:
+    raise ImproperlyConfigured(f"Unknown CHANNEL_LAYER {CHANNEL_LAYER}, use memory, redis or sqlite")
+
+# Cache of the statistics page and the filter choices. Their invalidation has to reach every
+# worker, so the default follows the channel layer, which decides how many workers there are:
+# memory: one process, LocMemCache
+# redis: RedisCache at CACHE_REDIS_URL, by default a database of its own on the Redis server
+#   of the channel layer, so evicting or flushing one does not touch the other
+# sqlite: FileBasedCache in BASE_DIR / "cache", shared by the workers of one host
+# A cache per process (LocMemCache) is refused with the other channel layers; workers started
+# without a shared channel layer (e.g. several gunicorn processes) need CACHE_BACKEND as well.
+CACHE_REDIS_URL = config("CACHE_REDIS_URL", default="redis://127.0.0.1:6379/1")
+DEFAULT_CACHES = {
+    "memory": ("django.core.cache.backends.locmem.LocMemCache", "dart"),
+    "redis": ("django.core.cache.backends.redis.RedisCache", CACHE_REDIS_URL),
+    "sqlite": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / "cache")),
+}
+CACHE_BACKEND = config("CACHE_BACKEND", default=DEFAULT_CACHES[CHANNEL_LAYER][0])
+if CHANNEL_LAYER != "memory" and CACHE_BACKEND.endswith("LocMemCache"):
+    raise ImproperlyConfigured(
+        f"CACHE_BACKEND {CACHE_BACKEND} is local to one process, use a shared cache with CHANNEL_LAYER {CHANNEL_LAYER}"
+    )
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": config("CACHE_LOCATION", default=DEFAULT_CACHES[CHANNEL_LAYER][1]),
+    }
+}
+STATISTICS_CACHE_TIMEOUT = config("STATISTICS_CACHE_TIMEOUT", default=60 * 60 * 24, cast=int)
+# Threads (each with its own database connection) running the independent statistics queries
+# of a request at the same time, 1 runs them one after another
+STATISTICS_QUERY_WORKERS = config("STATISTICS_QUERY_WORKERS", default=4, cast=int)
+
+# Number of running multiplayer games whose published state and recent events are kept in memory per process
+LIVE_GAME_STATE_CACHE_SIZE = config("LIVE_GAME_STATE_CACHE_SIZE", default=128, cast=int)
+# html: the game page swaps in the game card rendered by the server on every update
+# json: the GameBoard component renders versioned state and deltas sent over the socket
+GAME_SOCKET_PROTOCOL = config("GAME_SOCKET_PROTOCOL", default="html")
+# Game card updates within this window are merged into one broadcast, 0 publishes every batch
+GAME_UPDATE_COALESCE_WINDOW_MS = config("GAME_UPDATE_COALESCE_WINDOW_MS", default=40, cast=int)
+# Recent events per game kept for sockets that reconnect, older gaps get a full snapshot
+GAME_EVENT_BUFFER_SIZE = config("GAME_EVENT_BUFFER_SIZE", default=64, cast=int)
 
 # Debug Toolbar configuration
 if DEBUG:
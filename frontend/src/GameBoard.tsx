@@ -0,0 +1,195 @@
+import {Component} from "preact";
+import register from "preact-custom-element";
+import { KeyBoard } from "./KeyBoard";
+
+// Game card of the json protocol mode of the game websocket: the server sends the state once
+// and then only the keys that changed (see main/business_logic/game_state.py).
+
+interface PlayerState {
+    name: string
+    user_id: number | null
+    left_score: number
+    average_points: number | null
+    wins: number
+    tried_doubles: number
+}
+
+interface GameState {
+    game_id: string
+    one_device_manage: boolean
+    players: Record<string, PlayerState>
+    turn: string
+    queue: string[]
+    last_points: number | null
+    checkout_suggestion: string
+    keyboard: number
+}
+
+// position of the message in the event sequence of the game, see main/consumers/game_events.py
+interface Position {
+    epoch: string
+    seq: number
+}
+
+type Message = Position & (
+    | {type: "state", version: string, state: GameState}
+    | {type: "delta", version: string, base_version: string, delta: Partial<GameState>}
+    | {type: "redirect", url: string}
+)
+
+interface Props {
+    "game-id": string
+    "user-id": string
+}
+
+interface State {
+    game: GameState | null
+    version: string | null
+}
+
+const isObject = (value: unknown): value is Record<string, unknown> =>
+    typeof value === "object" && value !== null && !Array.isArray(value);
+
+const applyDelta = <T extends Record<string, unknown>>(state: T, delta: Record<string, unknown>): T => {
+    const next: Record<string, unknown> = {...state};
+    for (const [key, value] of Object.entries(delta)) {
+        next[key] = isObject(value) && isObject(next[key]) ? applyDelta(next[key] as Record<string, unknown>, value) : value;
+    }
+    return next as T;
+}
+
+export class GameBoard extends Component<Props, State> {
+    static tagName = "game-board";
+    private socket: WebSocket | null = null;
+    private position: Position | null = null;
+
+    constructor(props: Props) {
+        super(props);
+        this.state = {game: null, version: null};
+    }
+
+    componentDidMount() {
+        this.connect();
+    }
+
+    componentWillUnmount() {
+        this.socket?.close();
+        this.socket = null;
+    }
+
+    connect = () => {
+        const scheme = window.location.protocol === "https:" ? "wss" : "ws";
+        const params = new URLSearchParams({protocol: "json"});
+        if (this.position !== null && this.state.version !== null) {
+            // the server replays the missed events, or sends the full state if it can not
+            params.set("since", `${this.position.epoch}:${this.position.seq}`);
+            params.set("version", this.state.version);
+        }
+        const socket = new WebSocket(`${scheme}://${window.location.host}/ws/${this.props["game-id"]}/?${params}`);
+        socket.onmessage = (event) => this.receive(JSON.parse(event.data));
+        socket.onclose = () => {
+            if (this.socket === socket) {
+                setTimeout(this.connect, 1000);
+            }
+        };
+        this.socket = socket;
+    }
+
+    send = (data: Record<string, string>) => {
+        this.socket?.send(JSON.stringify(data));
+    }
+
+    receive = (message: Message) => {
+        const position = this.position;
+        if (message.type !== "state" && position !== null && message.epoch === position.epoch && message.seq <= position.seq) {
+            // replayed after a reconnect and received from the group as well
+            return;
+        }
+        this.position = {epoch: message.epoch, seq: message.seq};
+        if (message.type === "redirect") {
+            window.location.href = message.url;
+        } else if (message.type === "state") {
+            this.setState({game: message.state, version: message.version});
+        } else if (message.type === "delta") {
+            if (this.state.game === null || message.base_version !== this.state.version) {
+                this.send({action: "state"});
+                return;
+            }
+            this.setState({game: applyDelta(this.state.game, message.delta), version: message.version});
+        }
+    }
+
+    submitRound = (event: Event) => {
+        event.preventDefault();
+        const data: Record<string, string> = {};
+        new FormData(event.currentTarget as HTMLFormElement).forEach((value, key) => {
+            data[key] = String(value);
+        });
+        this.send(data);
+    }
+
+    deleteLastRound = () => {
+        if (window.confirm("Are you sure you want to delete the last round?")) {
+            this.send({action: "delete_last_round"});
+        }
+    }
+
+    render() {
+        const game = this.state.game;
+        if (game === null) {
+            return <div class="text-center py-5"><div class="spinner-border text-primary" role="status"></div></div>;
+        }
+        const turn = game.players[game.turn];
+        const userId = parseInt(this.props["user-id"]);
+        const canThrow = game.one_device_manage || turn.user_id === null || turn.user_id === userId;
+        return <div class="col-12">
+            {game.last_points ? <div class="score-flash" key={this.state.version}>+{game.last_points}</div> : null}
+            <div class="card">
+                <div class="card-header bg-primary text-white text-left py-2">
+                    <button type="button" class="btn btn-outline-warning btn-sm" aria-label="Delete Last Round"
+                            title="Delete Last Round" style="min-height: 36px;" onClick={this.deleteLastRound}>
+                        <i class="bi bi-arrow-counterclockwise"></i>
+                    </button>
+                    <span class="float-end small">Missed doubles: {turn.tried_doubles}</span>
+                </div>
+                <div class="card-body">
+                    <div class="row align-items-center text-center mb-2">
+                        <div class={game.queue.length ? "col-6" : "col-12"}>
+                            <h3 class="text-primary">
+                                {turn.name}
+                                {turn.wins > 0 && <span class="badge bg-primary ms-2">{turn.wins}</span>}
+                            </h3>
+                            <h1 class="display-4 fw-bold text-primary">{turn.left_score}</h1>
+                            {turn.average_points !== null && <small class="text-muted">Avg: {turn.average_points.toFixed(1)}</small>}
+                        </div>
+                        {game.queue.length > 0 && <div class="col-6">
+                            <div class="list-group list-group-flush">
+                                {game.queue.slice(0, 2).map((id) => {
+                                    const player = game.players[id];
+                                    return <div class="list-group-item px-0 py-1 bg-transparent" key={id}>
+                                        <div class="small fw-semibold text-secondary text-truncate">
+                                            {player.name}
+                                            {player.wins > 0 && <span class="badge bg-primary-subtle text-primary-emphasis ms-2">{player.wins}</span>}
+                                        </div>
+                                        <span class="fw-semibold text-primary">{player.left_score}</span>
+                                    </div>;
+                                })}
+                            </div>
+                        </div>}
+                    </div>
+                    {canThrow ? <div class="mt-3 d-flex justify-content-center">
+                        <form class="text-center game-keyboard-form" onSubmit={this.submitRound}>
+                            {/* a new key resets the entered points after every state */}
+                            <KeyBoard key={this.state.version} keyboard={game.keyboard} score_left={String(turn.left_score)}/>
+                        </form>
+                    </div> : game.checkout_suggestion && <div class="alert alert-info mt-3 py-1 px-2 text-center">
+                        <small>{game.checkout_suggestion}</small>
+                    </div>}
+                </div>
+            </div>
+        </div>;
+    }
+}
+
+
+register(GameBoard, 'game-board', ['game-id', 'user-id'], {shadow: false})
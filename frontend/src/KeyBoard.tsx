@@ -2,6 +2,7 @@ import {Component} from "preact";
 import register from "preact-custom-element";
 import { ThreeThrowKeyBoard } from "./ThreeThrowKeyBoard";
 import { SimpleKeyBoard } from "./SimpleKeyBoard";
+import { getCheckoutSuggestion } from "./checkoutTable";
 
 enum KeyboardType {
     simple = 0,
@@ -29,9 +30,8 @@ export class KeyBoard extends Component<Props, State> {
      }
      checkoutHint = async (points: number, throwsLeft: number) => {
          const leftScore = parseInt(this.props.score_left) - points;
-         const response = await fetch(`/checkout-hint/${leftScore}/${throwsLeft}`);
-         const data = await response.json();
-         this.setState({checkoutHint: data.checkout_suggestion});
+         const checkoutHint = await getCheckoutSuggestion(leftScore, throwsLeft);
+         this.setState({checkoutHint: checkoutHint});
      }
 
 
@@ -0,0 +1,45 @@
+// Checkout suggestions by darts left and score, loaded once per page from the versioned
+// url in the checkout-table meta tag (the browser caches it for as long as the version lives).
+
+type Suggestions = string[][];
+
+let table: Promise<Suggestions | null> | null = null;
+
+const loadTable = async (): Promise<Suggestions | null> => {
+    const url = document.querySelector<HTMLMetaElement>('meta[name="checkout-table"]')?.content;
+    if (!url) {
+        return null;
+    }
+    try {
+        const response = await fetch(url);
+        if (!response.ok) {
+            return null;
+        }
+        const data = await response.json();
+        return data.suggestions;
+    } catch {
+        return null;
+    }
+}
+
+const fetchSuggestion = async (leftScore: number, throwsLeft: number): Promise<string> => {
+    const response = await fetch(`/checkout-hint/${leftScore}/${throwsLeft}`);
+    const data = await response.json();
+    return data.checkout_suggestion;
+}
+
+export const getCheckoutSuggestion = async (leftScore: number, throwsLeft: number): Promise<string> => {
+    if (table === null) {
+        table = loadTable();
+    }
+    const suggestions = await table;
+    if (suggestions === null) {
+        // fallback if the table could not be loaded
+        return fetchSuggestion(leftScore, throwsLeft);
+    }
+    if (throwsLeft <= 0 || leftScore < 0) {
+        return "";
+    }
+    const row = suggestions[Math.min(throwsLeft, suggestions.length - 1)];
+    return row[leftScore] ?? "";
+}
@@ -2,4 +2,5 @@ import './SimpleKeyBoard';
 import './ThreeThrowKeyBoard';
 import './KeyBoard';
 import './InfoButton';
-import './ChartDiagram';
\ No newline at end of file
+import './ChartDiagram';
+import './GameBoard';
\ No newline at end of file
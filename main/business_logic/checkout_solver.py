@@ -0,0 +1,107 @@
+"""
+Checkout routes for every score and number of darts left.
+
+All dart segments are enumerated once at import. For every score from 2 to 170 and 1, 2 or
+3 darts left the tables hold all routes that finish on a double, ranked best first. The
+routes of checkout_map are the preferred ones and always come first, the generated routes
+fill the gaps (e.g. finishes the map only knows with more darts) and list the alternatives. Routes are
+stored as tuples of dart tokens, the bull always as BULL like on the keyboards. The
+suggestion strings are joined once as well, so a lookup is a plain list index.
+"""
+
+import hashlib
+import json
+from itertools import combinations_with_replacement
+
+from main.constants import checkout_map
+
+MAX_DARTS = 3
+MAX_CHECKOUT = 170
+BULL = "BULL"
+
+# finishing doubles in the order players prefer them (they split well after a miss)
+DOUBLE_PREFERENCE = [20, 16, 8, 18, 10, 12, 4, 14, 6, 2, 19, 17, 15, 13, 11, 9, 7, 5, 3, 1, 25]
+
+Route = tuple[str, ...]
+
+
+def _segments() -> list[tuple[str, int]]:
+    """all segments of the board as (token, points), in the order they are preferred as setup darts"""
+    trebles = [(f"T{number}", number * 3) for number in range(20, 0, -1)]
+    singles = [(f"S{number}", number) for number in [25, *range(20, 0, -1)]]
+    doubles = [(f"D{number}", number * 2) for number in [25, *range(20, 0, -1)]]
+    return trebles + singles + doubles
+
+
+SEGMENTS = _segments()
+SEGMENT_RANK = {token: rank for rank, (token, _) in enumerate(SEGMENTS)}
+FINISHING_DOUBLES = [(f"D{number}", number * 2) for number in DOUBLE_PREFERENCE]
+
+
+def _normalize(dart: str) -> str:
+    """the token the keyboards use, checkout_map and the generator call the bull D25 as well"""
+    return BULL if dart == "D25" else dart
+
+
+def _generate_routes() -> dict[int, list[tuple[tuple, Route]]]:
+    """
+    all routes by score with their sort key: fewer darts, fewer doubles as setup darts (they
+    are easy to miss), better finishing double, better setup darts
+    """
+    routes = {}
+    for darts in range(1, MAX_DARTS + 1):
+        # setup darts are unordered, so only one order of each combination is generated
+        for setup in combinations_with_replacement(SEGMENTS, darts - 1):
+            setup_points = sum(points for _, points in setup)
+            if setup_points >= MAX_CHECKOUT:
+                continue
+            setup_tokens = tuple(token for token, _ in setup)
+            setup_doubles = sum(token.startswith("D") for token in setup_tokens)
+            setup_ranks = tuple(SEGMENT_RANK[token] for token in setup_tokens)
+            for double_rank, (double, double_points) in enumerate(FINISHING_DOUBLES):
+                score = setup_points + double_points
+                if score <= MAX_CHECKOUT:
+                    key = (darts, setup_doubles, double_rank, setup_ranks)
+                    routes.setdefault(score, []).append((key, setup_tokens + (double,)))
+    return routes
+
+
+def _build_tables() -> dict[int, dict[int, tuple[Route, ...]]]:
+    generated = _generate_routes()
+    tables = {darts: {} for darts in range(1, MAX_DARTS + 1)}
+    for score in range(2, MAX_CHECKOUT + 1):
+        preferred = [tuple(route.split(" ")) for route in checkout_map.get(score, [])]
+        ranked = [route for _, route in sorted(generated.get(score, []))]
+        for darts in tables:
+            seen = set()
+            table = []
+            for route in preferred + ranked:
+                normalized = tuple(_normalize(dart) for dart in route)
+                if len(route) <= darts and normalized not in seen:
+                    seen.add(normalized)
+                    table.append(normalized)
+            if table:
+                tables[darts][score] = tuple(table)
+    return tables
+
+
+ROUTES = _build_tables()
+# indexed by darts left and score, so a lookup does not need to hash or build keys
+SUGGESTIONS = [
+    [" ".join(ROUTES[darts][score][0]) if score in ROUTES.get(darts, {}) else "" for score in range(MAX_CHECKOUT + 1)]
+    for darts in range(MAX_DARTS + 1)
+]
+
+# changes whenever a suggestion changes, clients may cache the table for as long as it is valid
+TABLE_VERSION = hashlib.sha1(json.dumps(SUGGESTIONS).encode()).hexdigest()[:12]
+
+
+def get_routes(left_score: int, darts_left: int) -> tuple[Route, ...]:
+    """all routes for the score with at most darts_left darts, best first"""
+    return ROUTES.get(min(darts_left, MAX_DARTS), {}).get(left_score, ())
+
+
+def get_suggestion(left_score: int, darts_left: int) -> str:
+    if 0 <= left_score <= MAX_CHECKOUT and darts_left > 0:
+        return SUGGESTIONS[darts_left if darts_left < MAX_DARTS else MAX_DARTS][left_score]
+    return ""
@@ -0,0 +1,60 @@
+"""
+Independent read queries of one request, run at the same time on a bounded thread pool.
+
+Every worker thread has its own database connection, so the queries really run in
+parallel and the request waits for the slowest one instead of their sum. The connections
+are handled like those of a request: stale ones are closed before and after every call,
+which keeps persistent connections (CONN_MAX_AGE) open and hands pooled ones back.
+
+Calls are run one after another in the calling thread when there is nothing to gain or
+it would not be correct:
+ - STATISTICS_QUERY_WORKERS is 1 or less, or there is only one call
+ - the caller is in a transaction, other connections can not see its uncommitted rows
+ - the caller is itself a worker, waiting for the pool from within it could deadlock
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_local = threading.local()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.STATISTICS_QUERY_WORKERS, thread_name_prefix="statistics-query"
+            )
+        return _executor
+
+
+def _run(call: Callable):
+    _local.worker = True
+    close_old_connections()
+    try:
+        return call()
+    finally:
+        close_old_connections()
+
+
+def _run_inline() -> bool:
+    return (
+        settings.STATISTICS_QUERY_WORKERS <= 1
+        or getattr(_local, "worker", False)
+        or connection.in_atomic_block
+    )
+
+
+def run_concurrently(*calls: Callable) -> list:
+    """the results of the calls in their order, an exception of a call is raised here"""
+    if len(calls) <= 1 or _run_inline():
+        return [call() for call in calls]
+    futures = [_get_executor().submit(_run, call) for call in calls]
+    return [future.result() for future in futures]
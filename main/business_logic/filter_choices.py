@@ -0,0 +1,49 @@
+"""
+Cache of the choices of the statistics filter of a user: the distinct numbers of rounds
+and scores of their singleplayer games.
+
+The choices only grow when the user starts a game with a number of rounds or a score that
+is not a choice yet, so only such a game drops them. A deleted game leaves its choices in
+place until they expire, filtering by them just finds no games. The entries expire after
+TIMEOUT as well, in case a drop did not reach the cache of this worker (see CACHES in the
+settings).
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from main.models import Game
+
+TIMEOUT = 60 * 60
+
+
+def _cache():
+    return caches[getattr(settings, "STATISTICS_CACHE_ALIAS", "default")]
+
+
+def _key(user_id: int) -> str:
+    return f"filter-choices:{user_id}"
+
+
+def get_choices(user_id: int) -> tuple[set[int], set[int]]:
+    """the round and score choices of the user"""
+    choices = _cache().get(_key(user_id))
+    if choices is None:
+        games = Game.objects.filter(player_id=user_id).order_by()
+        choices = (
+            set(games.values_list("rounds", flat=True).distinct()),
+            set(games.values_list("score", flat=True).distinct()),
+        )
+        _cache().set(_key(user_id), choices, timeout=TIMEOUT)
+    return choices
+
+
+def add_game(game: Game):
+    """drop the choices of the player of a new game once it is committed, if it is a new configuration"""
+    def drop_new_configuration():
+        choices = _cache().get(_key(game.player_id))
+        if choices is not None and (game.rounds not in choices[0] or game.score not in choices[1]):
+            _cache().delete(_key(game.player_id))
+
+    transaction.on_commit(drop_new_configuration)
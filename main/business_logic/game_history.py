@@ -0,0 +1,71 @@
+"""
+Pages of the game history of the statistics page, newest game first.
+
+The pages are cut by keyset instead of offset: a page ends with a cursor made of the date,
+creation time and id of its last game, and the next page starts with the games ordered
+after it. The creation time orders the games of a day, the id only breaks exact ties. Every
+page is one range scan of LIMIT rows however deep it is, and no count is needed to know
+whether there is a next page, one game more than the page size is fetched for that.
+"""
+
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from django.db.models import Count, Q, QuerySet
+
+from main.models import Game, MultiplayerGame, MultiplayerRound
+
+PAGE_SIZE = 10
+ORDERING = ("-date", "-created_at", "-id")
+
+
+@dataclass(frozen=True)
+class HistoryPage:
+    games: list
+    next_cursor: str | None
+
+
+def encode_cursor(game: Game | MultiplayerGame) -> str:
+    return f"{game.date.isoformat()}_{game.created_at.isoformat()}_{game.id}"
+
+
+def decode_cursor(cursor: str) -> tuple[date, datetime, uuid.UUID]:
+    """the date, creation time and id of the cursor, ValueError if it is not one"""
+    day, created_at, game_id = cursor.split("_")
+    return date.fromisoformat(day), datetime.fromisoformat(created_at), uuid.UUID(game_id)
+
+
+def _get_page(games: QuerySet, cursor: str | None, page_size: int) -> HistoryPage:
+    games = games.order_by(*ORDERING)
+    if cursor:
+        day, created_at, game_id = decode_cursor(cursor)
+        games = games.filter(
+            Q(date__lt=day)
+            | Q(date=day, created_at__lt=created_at)
+            | Q(date=day, created_at=created_at, id__lt=game_id)
+        )
+    page = list(games[: page_size + 1])
+    if len(page) <= page_size:
+        return HistoryPage(page, None)
+    return HistoryPage(page[:page_size], encode_cursor(page[page_size - 1]))
+
+
+def get_singleplayer_page(games: QuerySet[Game], cursor: str | None = None, page_size: int = PAGE_SIZE) -> HistoryPage:
+    return _get_page(games, cursor, page_size)
+
+
+def get_multiplayer_page(
+    games: QuerySet[MultiplayerGame], cursor: str | None = None, page_size: int = PAGE_SIZE
+) -> HistoryPage:
+    """the games come with their winner and the number of their rounds (round_count)"""
+    page = _get_page(games.select_related("winner"), cursor, page_size)
+    round_counts = dict(
+        MultiplayerRound.objects.filter(game__in=[game.id for game in page.games])
+        .values_list("game")
+        .annotate(Count("id"))
+        .order_by()
+    )
+    for game in page.games:
+        game.round_count = round_counts.get(game.id, 0)
+    return page
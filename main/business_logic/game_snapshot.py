@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+
+from django.http import Http404
+
+from main.business_logic.session_standings import get_session_wins
+from main.business_logic.utils import get_checkout_suggestion
+from main.models import MultiplayerGame, MultiplayerPlayer, PreferredKeyBoard
+
+
+@dataclass(frozen=True)
+class PlayerSnapshot:
+    player: MultiplayerPlayer
+    left_score: int
+    average_points: float | None
+    needed_rounds: int
+    wins: int
+
+    def as_context(self) -> dict:
+        return {
+            "player": self.player,
+            "left_score": self.left_score,
+            "wins": self.wins,
+        }
+
+    def as_state(self) -> dict:
+        return {
+            "name": self.player.display_name,
+            "user_id": self.player.player_id,
+            "left_score": self.left_score,
+            "average_points": round(self.average_points, 1) if self.average_points is not None else None,
+            "wins": self.wins,
+            "tried_doubles": self.player.tried_doubles,
+        }
+
+
+@dataclass(frozen=True)
+class GameSnapshot:
+    """Read-only state of a running multiplayer game, loaded in a constant number of queries."""
+
+    game: MultiplayerGame
+    turn: PlayerSnapshot
+    queue: tuple[PlayerSnapshot, ...]
+    last_points: int | None
+    keyboard: int
+
+    @property
+    def checkout_suggestion(self) -> str | None:
+        return get_checkout_suggestion(self.turn.left_score, 3)
+
+    def as_context(self) -> dict:
+        return {
+            "game": self.game,
+            "turn": self.turn.player,
+            "left_score": self.turn.left_score,
+            "checkout_suggestion": self.checkout_suggestion,
+            "average_points": self.turn.average_points,
+            "wins": self.turn.wins,
+            "queue": [player.as_context() for player in self.queue],
+            "last_points": self.last_points,
+            "keyboard": self.keyboard,
+        }
+
+    def as_state(self) -> dict:
+        """plain JSON state of the game card for the game websocket, see main.business_logic.game_state"""
+        players = {str(self.turn.player.id): self.turn.as_state()}
+        players.update((str(player.player.id), player.as_state()) for player in self.queue)
+        return {
+            "game_id": str(self.game.id),
+            "one_device_manage": self.game.one_device_manage,
+            "players": players,
+            "turn": str(self.turn.player.id),
+            "queue": [str(player.player.id) for player in self.queue],
+            "last_points": self.last_points,
+            "checkout_suggestion": self.checkout_suggestion or "",
+            "keyboard": self.keyboard,
+        }
+
+
+def _get_session_wins(game: MultiplayerGame) -> tuple[dict, dict]:
+    """wins of the session grouped by user id and by guest name (one query)"""
+    if not game.session_id:
+        # currently sessions can be null
+        return {}, {}
+    return get_session_wins(game.session_id)
+
+
+def _get_keyboard(player: MultiplayerPlayer) -> int:
+    if player.player_id:
+        keyboards = PreferredKeyBoard.objects.filter(player_id=player.player_id)
+    else:
+        keyboards = PreferredKeyBoard.objects.filter(guest_player=player)
+    keyboard = keyboards.values_list("keyboard", flat=True).first()
+    return keyboard if keyboard is not None else 0
+
+
+def build_game_snapshot(game: MultiplayerGame) -> GameSnapshot:
+    players = list(game.game_players.select_related("player").order_by("rank"))
+    last_round = game.game_rounds.order_by("-id").values("player_id", "points").first()
+    wins_by_user, wins_by_guest = _get_session_wins(game)
+
+    player_states = {}
+    for player in players:
+        if player.player_id:
+            wins = wins_by_user.get(player.player_id, 0)
+        else:
+            wins = wins_by_guest.get(player.guest_name, 0)
+        player_states.setdefault(
+            player.rank,
+            PlayerSnapshot(
+                player=player,
+                left_score=game.score - player.points_scored,
+                average_points=(
+                    player.points_scored / player.rounds_played if player.rounds_played else None
+                ),
+                needed_rounds=player.rounds_played,
+                wins=wins,
+            ),
+        )
+
+    # same rules as get_turn, but resolved against the players already loaded
+    turn = 1
+    if last_round and game.max_players != 1:
+        last_rank = next(
+            (p.rank for p in players if p.id == last_round["player_id"]), None
+        )
+        if last_rank is not None and last_rank != game.max_players:
+            turn = last_rank + 1
+    if turn not in player_states:
+        raise Http404("No MultiplayerPlayer matches the given query.")
+
+    ranks = [player.rank for player in players]
+    queue = tuple(player_states[rank] for rank in ranks[turn:] + ranks[: turn - 1])
+    current = player_states[turn]
+    return GameSnapshot(
+        game=game,
+        turn=current,
+        queue=queue,
+        last_points=last_round["points"] if last_round else None,
+        keyboard=_get_keyboard(current.player),
+    )
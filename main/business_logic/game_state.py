@@ -0,0 +1,99 @@
+"""
+Versioned JSON state of a running multiplayer game for sockets in the json protocol mode.
+
+The state is the game card as plain data (see GameSnapshot.as_state). Its version is a hash
+of its content, so every process derives the same version for the same state. The process
+that publishes an update remembers the last state it published per game and attaches the
+delta to it; a socket that has seen exactly that version gets the delta, every other socket
+the full state.
+
+A delta holds the keys that changed, nested dicts (the players) are diffed per key. Keys
+are never removed from a state, a change that would need it is sent as a full state.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from main.business_logic.game_snapshot import GameSnapshot
+
+_lock = threading.RLock()
+_published: OrderedDict[str, dict] = OrderedDict()
+
+
+def get_version(state: dict) -> str:
+    return hashlib.sha1(json.dumps(state, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def get_delta(old: dict, new: dict) -> dict | None:
+    """the changed keys of new, or None if keys were removed"""
+    if old.keys() - new.keys():
+        return None
+    delta = {}
+    for key, value in new.items():
+        if key not in old:
+            delta[key] = value
+        elif old[key] != value:
+            if isinstance(value, dict) and isinstance(old[key], dict):
+                nested = get_delta(old[key], value)
+                if nested is None:
+                    return None
+                delta[key] = nested
+            else:
+                delta[key] = value
+    return delta
+
+
+def _publish(state: dict, replace: bool = True) -> dict | None:
+    """remember the state as the last one published for its game and return the one before"""
+    game_id = state["game_id"]
+    with _lock:
+        previous = _published.get(game_id)
+        if replace or previous is None:
+            _published[game_id] = state
+        _published.move_to_end(game_id)
+        while len(_published) > settings.LIVE_GAME_STATE_CACHE_SIZE:
+            _published.popitem(last=False)
+    return previous
+
+
+def build_state_message(snapshot: GameSnapshot) -> dict:
+    """the full state, e.g. for a socket that just connected"""
+    state = snapshot.as_state()
+    # the first socket of a game gives the next update a base for its delta
+    _publish(state, replace=False)
+    return {"type": "state", "version": get_version(state), "state": state}
+
+
+def build_state_update(snapshot: GameSnapshot) -> dict:
+    """the state of the snapshot with the delta to the state published before"""
+    state = snapshot.as_state()
+    version = get_version(state)
+    previous = _publish(state)
+    update = {"version": version, "state": state, "base_version": None, "delta": None}
+    if previous is not None:
+        delta = get_delta(previous, state)
+        if delta is not None:
+            update["base_version"] = get_version(previous)
+            update["delta"] = delta
+    return update
+
+
+def get_state_message(update: dict, client_version: str | None) -> dict:
+    """the message for one socket: the delta if it has the base version, else the full state"""
+    if update["delta"] is not None and update["base_version"] == client_version:
+        return {
+            "type": "delta",
+            "version": update["version"],
+            "base_version": update["base_version"],
+            "delta": update["delta"],
+        }
+    return {"type": "state", "version": update["version"], "state": update["state"]}
+
+
+def clear():
+    with _lock:
+        _published.clear()
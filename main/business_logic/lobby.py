@@ -5,21 +5,19 @@ from main.utils import get_guest_names, MultiplayerGameStatus
 
 
 def create_missing_players(game: MultiplayerGame):
-    game_players = game.game_players.all()
-    game_player_count = game_players.count()
-    missing_players = game.max_players - game_player_count
-    missing_ids = list(
-        set(i for i in range(1, game.max_players + 1))
-        - set(game_players.values_list("rank", flat=True))
-    )
+    taken_ranks = set(game.game_players.values_list("rank", flat=True))
+    missing_ids = sorted(set(range(1, game.max_players + 1)) - taken_ranks)
+    missing_players = len(missing_ids)
     guest_names = get_guest_names(missing_players)
-    for counter in range(missing_players):
-        MultiplayerPlayer.objects.create(
+    MultiplayerPlayer.objects.bulk_create(
+        MultiplayerPlayer(
             game=game,
             player=None,
             rank=missing_ids[counter],
             guest_name=guest_names[counter],
         )
+        for counter in range(missing_players)
+    )
 
 
 def set_player_ranks(game: MultiplayerGame, data: dict):
@@ -27,12 +25,11 @@ def set_player_ranks(game: MultiplayerGame, data: dict):
     data = {key: value for key, value in data.items() if "-rank" in key}
     if len(data.values()) != len(set(data.values())):
         raise ValueError("PLayer have to have a different rank")
-    for key, value in data.items():
-        player_id = int(key.split("-")[0])
-        rank = int(value)
-        MultiplayerPlayer.objects.update_or_create(
-            game=game, id=player_id, defaults={"rank": rank}
-        )
+    ranks = {int(key.split("-")[0]): int(value) for key, value in data.items()}
+    players = list(game.game_players.filter(id__in=ranks))
+    for player in players:
+        player.rank = ranks[player.id]
+    MultiplayerPlayer.objects.bulk_update(players, ["rank"])
 
 
 def create_game(game: MultiplayerGame, data: dict):
@@ -1,8 +1,11 @@
 from django.shortcuts import get_object_or_404
-from django.db.models import Sum, Avg
 import logging
-from main.business_logic.utils import get_points_of_round, get_checkout_suggestion
-from main.models import MultiplayerGame, MultiplayerPlayer, MultiplayerRound, Session, PreferredKeyBoard
+from django.db import transaction
+from main.business_logic.game_snapshot import build_game_snapshot
+from main.business_logic.session_standings import get_standing_wins
+from main.business_logic.statistics_rollup import refresh_rollups_for_game
+from main.business_logic.utils import get_points_of_round
+from main.models import MultiplayerGame, MultiplayerPlayer, MultiplayerRound, Session
 from main.utils import MultiplayerGameStatus
 from collections import defaultdict
 
@@ -15,24 +18,27 @@ def get_game_info(game_id: int):
 
 
 def get_turn(game) -> int:
-    last_turn = game.game_rounds.order_by("id").last()
+    last_rank = game.game_rounds.order_by("-id").values_list("player__rank", flat=True).first()
     # if no rounds, return 1
-    if not last_turn or game.max_players == 1:
+    if not last_rank or game.max_players == 1:
         return 1
-    last_rank = last_turn.player.rank
     if last_rank == game.max_players:
         return 1
     return last_rank + 1
 
 
+def _get_totals(player) -> tuple[int, int]:
+    """
+    points and rounds of the player, read from the running totals (see main.signals). The
+    columns are the live state of a running game, written in the transaction of every round,
+    so every worker reads the same state without aggregating rounds.
+    """
+    return MultiplayerPlayer.objects.filter(id=player.id).values_list("points_scored", "rounds_played").get()
+
+
 def get_left_score(game, game_player) -> int:
-    total_points = game.game_rounds.filter(player=game_player).aggregate(
-        total_points=Sum("points")
-    )["total_points"]
-    # If no rounds exist, total_points will be None, so default to 0
-    if total_points is None:
-        total_points = 0
-    return game.score - total_points
+    points_scored, _ = _get_totals(game_player)
+    return game.score - points_scored
 
 
 def get_queue(game, turn: int) -> list:
@@ -44,80 +50,67 @@ def get_wins(session: Session | None, player: MultiplayerPlayer) -> int:
     if not session:
         # currently sessions can be null
         return 0
-    # Filter by the actual User, not the MultiplayerPlayer instance
-    if player.player:  # Check if it's not a guest
-        return session.games.filter(winner__player=player.player).count()
-    else:  # For guest players, filter by guest_name
-        return session.games.filter(winner__guest_name=player.guest_name).count()
+    return get_standing_wins(session.id, player)
 
 
 def get_game_context(game) -> dict:
-    current_user = get_object_or_404(MultiplayerPlayer, game=game, rank=get_turn(game))
-    queue_list = []
-    for rank in get_queue(game, current_user.rank):
-        player = game.game_players.get(rank=rank)
-        queue_list.append(
-            {
-                "player": player,
-                "left_score": get_left_score(game, player),
-                "wins": get_wins(game.session, player),
-            }
-        )
-    last_round = game.game_rounds.order_by("id").last()
-    last_points = last_round.points if last_round else None
-    if current_user.player:
-        preferred_keyboard = PreferredKeyBoard.objects.filter(player=current_user.player).first()
-    else:
-        preferred_keyboard = PreferredKeyBoard.objects.filter(guest_player=current_user).first()
-    keyboard = preferred_keyboard.keyboard if preferred_keyboard else 0
-    return {
-        "game": game,
-        "turn": current_user,
-        "left_score": get_left_score(game, current_user),
-        "checkout_suggestion": get_checkout_suggestion(
-            get_left_score(game, current_user), 3
-        ),
-        "average_points": get_average_points(game, current_user),
-        "wins": get_wins(game.session, current_user),
-        "queue": queue_list,
-        "last_points": last_points,
-        "keyboard": keyboard,
-    }
+    return build_game_snapshot(game).as_context()
 
 
-def add_round(game, player, points, is_valid_checkout: bool, needed_darts=3) -> bool:
-    left_score = get_left_score(game, player)
-    points = get_points_of_round(left_score, points, is_valid_checkout)
-    game_won = left_score == points
-    # it is possible that the player missed and dont input a miss, so the needed darts are only set lower than 3 if the game was won
-    cleaned_needed_darts = needed_darts if game_won else 3
-    MultiplayerRound(game=game, player=player, points=points, needed_darts=cleaned_needed_darts).save()
-    if game_won:
-        game.status = MultiplayerGameStatus.FINISHED.value
-        game.winner = player
-        game.save()
-        return True
-    return False
-
-
-def get_average_points(game, player) -> float:
-    return game.game_rounds.filter(player=player).aggregate(
-        average_points=Avg("points")
-    )["average_points"]
+def lock_game(game) -> None:
+    """
+    Lock the row of the game until the end of the transaction and reload its status. Rounds
+    of a game are added one at a time, also by other workers, so whatever is read after the
+    lock (the turn, the left score) can not change before the round is saved.
+    """
+    MultiplayerGame.objects.select_for_update().only("id").get(id=game.id)
+    game.refresh_from_db(fields=["status", "winner"])
 
 
-def get_needed_rounds(game, player) -> int:
-    return game.game_rounds.filter(player=player).count()
+def add_round(game, player, points, is_valid_checkout: bool, needed_darts=3) -> bool:
+    with transaction.atomic():
+        lock_game(game)
+        left_score = get_left_score(game, player)
+        points = get_points_of_round(left_score, points, is_valid_checkout, needed_darts)
+        game_won = left_score == points
+        # it is possible that the player missed and dont input a miss, so the needed darts are only set lower than 3 if the game was won
+        cleaned_needed_darts = needed_darts if game_won else 3
+        game_round = MultiplayerRound(game=game, player=player, points=points, needed_darts=cleaned_needed_darts)
+        game_round.save()
+        if game_won:
+            game.status = MultiplayerGameStatus.FINISHED.value
+            game.winner = player
+            game.save()
+            refresh_rollups_for_game(game)
+    return game_won
+
+
+def get_average_points(game, player) -> float | None:
+    points_scored, rounds_played = _get_totals(player)
+    return points_scored / rounds_played if rounds_played else None
 
 
-def get_players_ordered_by_wins(session: Session) -> list:
+def get_needed_rounds(game, player) -> int:
+    _, rounds_played = _get_totals(player)
+    return rounds_played
+
+
+def get_players_ordered_by_wins(session: Session, game: MultiplayerGame | None = None) -> list:
+    """
+    (name, wins) of all players of the session, most wins first. The wins are read from
+    the session standings, so the cost does not grow with the number of games in the session.
+    """
+    standings = (
+        session.standings.filter(wins__gt=0)
+        .select_related("player")
+        .order_by("player__username", "guest_name")
+    )
     winner_dict = defaultdict(int)
-    for game in session.games.all():
-        if game.winner.player:
-            winner_dict[game.winner.player.username] += 1
-        else:
-            winner_dict[game.winner.guest_name] += 1
-    for player in session.games.first().game_players.all():
+    for standing in standings:
+        winner_dict[standing.player.username if standing.player else standing.guest_name] += standing.wins
+    if game is None:
+        game = session.games.first()
+    for player in game.game_players.select_related("player").order_by("rank"):
         winner_dict[player.player.username if player.player else player.guest_name] += 0
     return sorted(winner_dict.items(), key=lambda x: x[1], reverse=True)
 
@@ -132,7 +125,7 @@ def get_ending_context(game) -> dict:
         "game": game,
         "winner": game.winner,
         "winner_stats": winner_stats,
-        "players": get_players_ordered_by_wins(game.session),
+        "players": get_players_ordered_by_wins(game.session, game),
         "session_won": game.session.first_to
         and get_wins(game.session, game.winner) == game.session.first_to,
         "needed_darts": game.game_rounds.last().needed_darts,
@@ -140,31 +133,36 @@ def get_ending_context(game) -> dict:
 
 
 def create_follow_up_game(game: MultiplayerGame) -> MultiplayerGame:
-    # create also new session if session was won
-    session = game.session
-    if game.winner and game.session and game.session.first_to:
-        wins = get_wins(game.session, game.winner)
-        if wins == game.session.first_to:
-            session = Session.objects.create(first_to=game.session.first_to)
-
-    new_game = MultiplayerGame(
-        score=game.score,
-        creator=game.creator,
-        max_players=game.max_players,
-        online=game.online,
-        status=MultiplayerGameStatus.PROGRESS.value,
-        session=session,
-    )
-    new_game.save()
-
-    for player in game.game_players.all():
-        possible_new_rank = player.rank - 1
-        new_rank = possible_new_rank if possible_new_rank != 0 else game.max_players
-        MultiplayerPlayer.objects.create(
-            game=new_game,
-            player=player.player,
-            rank=new_rank,
-            guest_name=player.guest_name,
+    with transaction.atomic():
+        # create also new session if session was won
+        session = game.session
+        if game.winner and game.session and game.session.first_to:
+            wins = get_wins(game.session, game.winner)
+            if wins == game.session.first_to:
+                session = Session.objects.create(first_to=game.session.first_to)
+
+        new_game = MultiplayerGame(
+            score=game.score,
+            creator=game.creator,
+            max_players=game.max_players,
+            online=game.online,
+            status=MultiplayerGameStatus.PROGRESS.value,
+            session=session,
         )
-        logger.info(f"New game created: {new_game.id}")
+        new_game.save()
+
+        new_players = []
+        for player in game.game_players.all():
+            possible_new_rank = player.rank - 1
+            new_rank = possible_new_rank if possible_new_rank != 0 else game.max_players
+            new_players.append(
+                MultiplayerPlayer(
+                    game=new_game,
+                    player_id=player.player_id,
+                    rank=new_rank,
+                    guest_name=player.guest_name,
+                )
+            )
+        MultiplayerPlayer.objects.bulk_create(new_players)
+    logger.info(f"New game created: {new_game.id}")
     return new_game
@@ -0,0 +1,60 @@
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from main.models import Game, MultiplayerPlayer, MultiplayerRound, Round
+
+# (model holding the totals, round model, foreign key of the round, related name of the rounds)
+TOTAL_SOURCES = [
+    (Game, Round, "game", "game_rounds"),
+    (MultiplayerPlayer, MultiplayerRound, "player", "player_rounds"),
+]
+
+
+def update_running_totals(model, pk, points: int, rounds: int, darts: int):
+    model.objects.filter(pk=pk).update(
+        points_scored=F("points_scored") + points,
+        rounds_played=F("rounds_played") + rounds,
+        darts_thrown=F("darts_thrown") + darts,
+    )
+
+
+def _total(rounds, aggregate):
+    return Coalesce(Subquery(rounds.annotate(total=aggregate).values("total")), Value(0))
+
+
+def rebuild_running_totals() -> int:
+    """recompute points_scored, rounds_played and darts_thrown from the rounds"""
+    updated = 0
+    for model, round_model, foreign_key, _ in TOTAL_SOURCES:
+        rounds = round_model.objects.filter(**{foreign_key: OuterRef("pk")}).order_by().values(foreign_key)
+        updated += model.objects.update(
+            points_scored=_total(rounds, Sum("points")),
+            rounds_played=_total(rounds, Count("id")),
+            darts_thrown=_total(rounds, Sum("needed_darts")),
+        )
+    return updated
+
+
+def get_running_total_mismatches() -> list[tuple]:
+    """rows whose stored totals differ from their rounds as (model name, pk, stored, actual)"""
+    mismatches = []
+    for model, _, _, related_name in TOTAL_SOURCES:
+        rows = (
+            model.objects.annotate(
+                actual_points=Sum(f"{related_name}__points", default=0),
+                actual_rounds=Count(related_name),
+                actual_darts=Sum(f"{related_name}__needed_darts", default=0),
+            )
+            .filter(
+                ~Q(points_scored=F("actual_points"))
+                | ~Q(rounds_played=F("actual_rounds"))
+                | ~Q(darts_thrown=F("actual_darts"))
+            )
+            .values_list(
+                "pk", "points_scored", "rounds_played", "darts_thrown",
+                "actual_points", "actual_rounds", "actual_darts",
+            )
+        )
+        for pk, *totals in rows:
+            mismatches.append((model.__name__, pk, tuple(totals[:3]), tuple(totals[3:])))
+    return mismatches
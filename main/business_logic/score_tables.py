@@ -0,0 +1,51 @@
+"""
+Scores that can be thrown with 1, 2 or 3 darts, built once at import.
+
+A missed dart counts as a dart scoring 0, so the scores of n darts include all scores of
+fewer darts. The tables are bitsets (bit n is set if n points are possible), checking a
+score is a shift and a mask.
+"""
+
+from main.business_logic.checkout_solver import FINISHING_DOUBLES, MAX_DARTS, SEGMENTS
+
+MAX_POINTS = 180
+
+DART_POINTS = {0, *(points for _, points in SEGMENTS)}
+DOUBLE_POINTS = {points for _, points in FINISHING_DOUBLES}
+
+
+def _to_bitset(scores) -> int:
+    bitset = 0
+    for score in scores:
+        bitset |= 1 << score
+    return bitset
+
+
+def _build_tables() -> tuple[dict[int, int], dict[int, int]]:
+    reachable = {0: {0}}
+    finishable = {}
+    for darts in range(1, MAX_DARTS + 1):
+        previous = reachable[darts - 1]
+        reachable[darts] = {score + points for score in previous for points in DART_POINTS}
+        # the last dart of a checkout has to be a double
+        finishable[darts] = {score + points for score in previous for points in DOUBLE_POINTS}
+    return (
+        {darts: _to_bitset(scores) for darts, scores in reachable.items() if darts},
+        {darts: _to_bitset(scores) for darts, scores in finishable.items()},
+    )
+
+
+REACHABLE, FINISHABLE = _build_tables()
+
+
+def _darts(needed_darts: int) -> int:
+    # unknown dart counts are treated like a full round
+    return needed_darts if 1 <= needed_darts <= MAX_DARTS else MAX_DARTS
+
+
+def is_reachable(points: int, needed_darts: int = MAX_DARTS) -> bool:
+    return 0 <= points <= MAX_POINTS and REACHABLE[_darts(needed_darts)] >> points & 1 == 1
+
+
+def is_finishable(points: int, needed_darts: int = MAX_DARTS) -> bool:
+    return 0 <= points <= MAX_POINTS and FINISHABLE[_darts(needed_darts)] >> points & 1 == 1
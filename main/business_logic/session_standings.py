@@ -0,0 +1,117 @@
+"""
+Wins and finished legs per user or guest of a session.
+
+The game that gets its winner adds its leg to every player of the game and its win to the
+winner, in the transaction of the winning round (see main.signals). Only deleting a finished
+game or a user, or changing a winner, recomputes the standings of the whole session. Reading the wins of a
+player is then a single indexed lookup instead of counting the won games of the session.
+Users are matched by their id and guests by their name, like the session games do.
+"""
+
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from main.models import MultiplayerGame, MultiplayerPlayer, Session, SessionStanding
+
+
+def _get_standings(session_id: int, player_id: int | None, guest_name: str | None):
+    standings = SessionStanding.objects.filter(session_id=session_id)
+    if player_id:
+        return standings.filter(player_id=player_id)
+    return standings.filter(player__isnull=True, guest_name=guest_name)
+
+
+def _add_leg(session_id: int, player: MultiplayerPlayer, won: bool) -> None:
+    if not player.player_id and not player.guest_name:
+        return
+    standings = _get_standings(session_id, player.player_id, player.guest_name)
+    if standings.update(wins=F("wins") + int(won), legs_played=F("legs_played") + 1):
+        return
+    try:
+        with transaction.atomic():
+            SessionStanding.objects.create(
+                session_id=session_id,
+                player_id=player.player_id,
+                guest_name=None if player.player_id else player.guest_name,
+                wins=int(won),
+                legs_played=1,
+            )
+    except IntegrityError:
+        # another game of the session created the row in the meantime
+        standings.update(wins=F("wins") + int(won), legs_played=F("legs_played") + 1)
+
+
+def record_finished_game(game: MultiplayerGame) -> None:
+    """add the leg of a game that just got its winner to the standings of its session"""
+    if not game.session_id:
+        return
+    for player in game.game_players.all():
+        _add_leg(game.session_id, player, won=player.id == game.winner_id)
+
+
+def refresh_session_standings(session_id: int) -> None:
+    standings = defaultdict(lambda: [0, 0])
+    legs = (
+        MultiplayerPlayer.objects.filter(game__session_id=session_id, game__winner__isnull=False)
+        .values_list("player_id", "guest_name")
+        .annotate(legs=Count("game_id", distinct=True))
+        .order_by()
+    )
+    for player_id, guest_name, game_legs in legs:
+        standings[(player_id, None) if player_id else (None, guest_name)][1] += game_legs
+    wins = (
+        MultiplayerGame.objects.filter(session_id=session_id, winner__isnull=False)
+        .values_list("winner__player_id", "winner__guest_name")
+        .annotate(wins=Count("id"))
+        .order_by()
+    )
+    for player_id, guest_name, game_wins in wins:
+        standings[(player_id, None) if player_id else (None, guest_name)][0] += game_wins
+
+    SessionStanding.objects.filter(session_id=session_id).delete()
+    SessionStanding.objects.bulk_create(
+        SessionStanding(
+            session_id=session_id, player_id=player_id, guest_name=guest_name, wins=wins, legs_played=legs_played
+        )
+        for (player_id, guest_name), (wins, legs_played) in standings.items()
+        if player_id or guest_name
+    )
+
+
+def move_user_to_guest(user_id: int, guest_name: str) -> None:
+    """
+    replace the user by a guest in all games and standings, e.g. before the user is deleted.
+    The standings are recomputed since the guest may have standings in the session already.
+    """
+    session_ids = list(SessionStanding.objects.filter(player_id=user_id).values_list("session_id", flat=True))
+    MultiplayerPlayer.objects.filter(player_id=user_id).update(player=None, guest_name=guest_name)
+    for session_id in session_ids:
+        refresh_session_standings(session_id)
+
+
+def rebuild_session_standings() -> int:
+    """recompute the standings of all sessions, e.g. after importing games"""
+    session_ids = list(Session.objects.values_list("id", flat=True))
+    for session_id in session_ids:
+        refresh_session_standings(session_id)
+    return len(session_ids)
+
+
+def get_standing_wins(session_id: int, player: MultiplayerPlayer) -> int:
+    standings = _get_standings(session_id, player.player_id, player.guest_name)
+    return standings.values_list("wins", flat=True).first() or 0
+
+
+def get_session_wins(session_id: int) -> tuple[dict, dict]:
+    """wins of the session by user id and by guest name"""
+    wins_by_user, wins_by_guest = {}, {}
+    for player_id, guest_name, wins in SessionStanding.objects.filter(session_id=session_id).values_list(
+        "player_id", "guest_name", "wins"
+    ):
+        if player_id:
+            wins_by_user[player_id] = wins
+        else:
+            wins_by_guest[guest_name] = wins
+    return wins_by_user, wins_by_guest
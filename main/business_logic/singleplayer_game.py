@@ -1,15 +1,20 @@
-from django.db.models import Sum
+from django.db import transaction
 
+from main.business_logic.statistics_rollup import refresh_rollups_for_game
 from main.business_logic.utils import get_points_of_round, get_checkout_suggestion
 from main.models import Round, Game, PreferredKeyBoard
 from main.utils import GameStatus
 
 
+RUNNING_TOTAL_FIELDS = ["points_scored", "rounds_played", "darts_thrown"]
+
+
 def get_game_context(game: Game) -> dict:
+    game.refresh_from_db(fields=RUNNING_TOTAL_FIELDS)
     rounds = Round.objects.filter(game=game)
-    round_count = rounds.count()
-    current_score_left = game.score - sum(rounds.values_list("points", flat=True))
-    total_points_scored = sum(rounds.values_list("points", flat=True))
+    round_count = game.rounds_played
+    total_points_scored = game.points_scored
+    current_score_left = game.score - total_points_scored
     average_score = (
         round(total_points_scored / round_count, 1) if round_count > 0 else 0
     )
@@ -33,26 +38,28 @@ def get_game_context(game: Game) -> dict:
 
 
 def get_left_points(game: Game) -> int:
-    total_points = (
-        game.game_rounds.all().aggregate(total_points=Sum("points"))["total_points"]
-        or 0
-    )
-    return game.score - total_points
+    game.refresh_from_db(fields=RUNNING_TOTAL_FIELDS)
+    return game.score - game.points_scored
 
 
 def add_round(game: Game, points: int, is_valid_checkout: bool, needed_darts=3):
-    left_points = get_left_points(game)
-    points = get_points_of_round(left_points, points, is_valid_checkout)
-    left_points -= points
-    game_won = left_points == 0
-    # it is possible that the player missed and dont input a miss, so the needed darts are only set lower than 3 if the game was won
-    cleaned_needed_dars = needed_darts if game_won else 3
-    Round(game=game, points=points, needed_darts=cleaned_needed_dars).save()
-    if game_won:
-        game.status = GameStatus.WON.value
-        game.save()
-        return game.status
-    if game.game_rounds.count() == game.rounds:
-        game.status = GameStatus.LOST.value
-        game.save()
+    with transaction.atomic():
+        left_points = get_left_points(game)
+        points = get_points_of_round(left_points, points, is_valid_checkout, needed_darts)
+        left_points -= points
+        game_won = left_points == 0
+        # it is possible that the player missed and dont input a miss, so the needed darts are only set lower than 3 if the game was won
+        cleaned_needed_dars = needed_darts if game_won else 3
+        Round(game=game, points=points, needed_darts=cleaned_needed_dars).save()
+        # the totals in the database are updated by main.signals, keep the instance in sync
+        game.points_scored += points
+        game.rounds_played += 1
+        game.darts_thrown += cleaned_needed_dars
+        if game_won:
+            game.status = GameStatus.WON.value
+        elif game.rounds_played == game.rounds:
+            game.status = GameStatus.LOST.value
+        if game.status != GameStatus.PROGRESS.value:
+            game.save(update_fields=["status"])
+            refresh_rollups_for_game(game)
     return game.status
@@ -1,12 +1,13 @@
-from dataclasses import dataclass
-from django.db.models import QuerySet, Q, Sum, Case, When, Value, Avg
+from dataclasses import dataclass, astuple
+from django.db.models import QuerySet, Q, Sum
 from django.db.models.aggregates import Count
 from django.db.models.functions import TruncWeek
 
+from main.business_logic.concurrent_queries import run_concurrently
 from main.models import Game, MultiplayerGame, Round, MultiplayerRound, MultiplayerPlayer
 from main.utils import GameStatus, MultiplayerGameStatus
 
-from datetime import datetime
+from datetime import date, datetime
 
 
 
@@ -27,6 +28,9 @@ class PartStatistics:
     hundred_eighty: int = 0
     twenty_six: int = 0
 
+    def __add__(self, other: "PartStatistics") -> "PartStatistics":
+        return PartStatistics(*(a + b for a, b in zip(astuple(self), astuple(other))))
+
     @property
     def win_rate(self) -> float:
         if self.total_games == 0:
@@ -74,77 +78,181 @@ class Statistics:
     
 
 
-def _aggregate_rounds(rounds_qs):
-    return rounds_qs.aggregate(
-        total_points=Sum("points", default=0),
-        total_rounds=Count("id"),
-        total_needed_darts=Sum("needed_darts", default=0),
-        sixty_plus=Count(Case(
-            When(Q(points__gte=60) & Q(points__lt=80), then=Value(1))
-        )),
-        eighty_plus=Count(Case(
-            When(Q(points__gte=80) & Q(points__lt=100), then=Value(1))
-        )),
-        hundred_plus=Count(Case(
-            When(Q(points__gte=100) & Q(points__lt=140), then=Value(1))
-        )),
-        hundred_forty_plus=Count(Case(
-            When(Q(points__gte=140) & Q(points__lt=180), then=Value(1))
-        )),
-        hundred_eighty=Count(Case(
-            When(points=180, then=Value(1))
-        )),
-        twenty_six=Count(Case(
-            When(points=26, then=Value(1))
-        ))
+MAX_POINTS = 180
+MAX_DARTS = 3
+
+# bands of the statistics as [low, high) ranges of points
+BANDS = {
+    "sixty_plus": (60, 80),
+    "eighty_plus": (80, 100),
+    "hundred_plus": (100, 140),
+    "hundred_forty_plus": (140, 180),
+    "hundred_eighty": (180, 181),
+    "twenty_six": (26, 27),
+}
+
+
+@dataclass(frozen=True)
+class ScoreHistogram:
+    """
+    Number of rounds per points (0-180) and per needed darts (index 0 is unused). Totals,
+    averages and bands are all derived from it, also from the histograms stored in the
+    weekly rollups. A new band needs an entry in BANDS and a PartStatistics field of the
+    same name, but no new query or rollup column.
+    """
+
+    points: tuple[int, ...] = (0,) * (MAX_POINTS + 1)
+    darts: tuple[int, ...] = (0,) * (MAX_DARTS + 1)
+
+    def __add__(self, other: "ScoreHistogram") -> "ScoreHistogram":
+        return ScoreHistogram(
+            tuple(a + b for a, b in zip(self.points, other.points)),
+            tuple(a + b for a, b in zip(self.darts, other.darts)),
+        )
+
+    @classmethod
+    def from_lists(cls, points: list[int], darts: list[int]) -> "ScoreHistogram":
+        if not points:
+            return cls()
+        return cls(tuple(points), tuple(darts))
+
+    @property
+    def total_rounds(self) -> int:
+        return sum(self.points)
+
+    @property
+    def total_points(self) -> int:
+        return sum(points * count for points, count in enumerate(self.points))
+
+    @property
+    def total_darts(self) -> int:
+        return sum(darts * count for darts, count in enumerate(self.darts))
+
+    def count(self, low: int, high: int = MAX_POINTS + 1) -> int:
+        """rounds with low <= points < high"""
+        return sum(self.points[low:high])
+
+    def bands(self) -> dict[str, int]:
+        return {name: self.count(low, high) for name, (low, high) in BANDS.items()}
+
+
+def get_score_histogram(rounds_qs: QuerySet[Round] | QuerySet[MultiplayerRound]) -> ScoreHistogram:
+    """the histogram of the rounds in one GROUP BY query"""
+    points = [0] * (MAX_POINTS + 1)
+    darts = [0] * (MAX_DARTS + 1)
+    rows = rounds_qs.values_list("points", "needed_darts").annotate(rounds=Count("id")).order_by()
+    for round_points, needed_darts, rounds in rows:
+        # the validators keep both in range, clamping keeps rows saved without them countable
+        points[min(max(round_points, 0), MAX_POINTS)] += rounds
+        darts[min(max(needed_darts, 0), MAX_DARTS)] += rounds
+    return ScoreHistogram(tuple(points), tuple(darts))
+
+
+def part_statistics_from_histogram(wins: int, losses: int, total_games: int, histogram: ScoreHistogram) -> PartStatistics:
+    return PartStatistics(
+        wins,
+        losses,
+        total_games,
+        histogram.total_points,
+        histogram.total_rounds,
+        histogram.total_darts,
+        **histogram.bands(),
+    )
+
+
+def get_singleplayer_results(games: QuerySet[Game]) -> tuple[int, int, int]:
+    """wins, losses and finished games"""
+    results = games.aggregate(
+        wins=Count("id", filter=Q(status=GameStatus.WON.value)),
+        losses=Count("id", filter=Q(status=GameStatus.LOST.value)),
+        total_games=Count("id", filter=~Q(status=GameStatus.PROGRESS.value)),
     )
+    return results["wins"], results["losses"], results["total_games"]
+
+
+def get_singleplayer_histogram(games: QuerySet[Game]) -> ScoreHistogram:
+    return get_score_histogram(Round.objects.filter(game__in=games.exclude(status=GameStatus.PROGRESS.value)))
 
 
 def get_singleplayer_statistics(games: QuerySet[Game]) -> PartStatistics:
-    wins = games.filter(status=GameStatus.WON.value).count()
-    losses = games.filter(status=GameStatus.LOST.value).count()
-    total_games = games.exclude(status=GameStatus.PROGRESS.value)
-    total_rounds = _aggregate_rounds(Round.objects.filter(game__in=total_games))
-    return PartStatistics(wins, losses, total_games.count(), total_rounds.get("total_points", 0), total_rounds.get("total_rounds", 0), total_rounds.get("total_needed_darts", 0), total_rounds.get("sixty_plus", 0), total_rounds.get("eighty_plus", 0), total_rounds.get("hundred_plus", 0), total_rounds.get("hundred_forty_plus", 0), total_rounds.get("hundred_eighty", 0), total_rounds.get("twenty_six", 0))
+    return part_statistics_from_histogram(*get_singleplayer_results(games), get_singleplayer_histogram(games))
 
 
-def get_multiplayer_statistics(games: QuerySet[MultiplayerGame], user) -> PartStatistics:
+def get_multiplayer_results(games: QuerySet[MultiplayerGame], user) -> tuple[int, int, int]:
+    """wins, losses and finished games of the user"""
     wins = games.filter(winner__player=user).count()
     losses = games.filter(
         ~Q(winner__player=user), status=MultiplayerGameStatus.FINISHED.value
     ).count()
     total_games = games.filter(status=MultiplayerGameStatus.FINISHED.value).count()
-    total_rounds = _aggregate_rounds(
-        MultiplayerRound.objects.filter(
-            game__in=games
-        )
+    return wins, losses, total_games
+
+
+def get_user_rounds(games: QuerySet[MultiplayerGame], user) -> QuerySet[MultiplayerRound]:
+    """
+    the rounds the user threw in the games, without the rounds of the other players. The
+    user's players are found by (player, game) and their rounds by (player, points,
+    needed_darts), so the scan does not grow with the number of players in a game.
+    """
+    players = MultiplayerPlayer.objects.filter(player=user, game__in=games).values("id")
+    return MultiplayerRound.objects.filter(player__in=players)
+
+
+def get_multiplayer_histogram(games: QuerySet[MultiplayerGame], user) -> ScoreHistogram:
+    return get_score_histogram(get_user_rounds(games, user))
+
+
+def get_multiplayer_statistics(games: QuerySet[MultiplayerGame], user) -> PartStatistics:
+    return part_statistics_from_histogram(
+        *get_multiplayer_results(games, user), get_multiplayer_histogram(games, user)
     )
-    return PartStatistics(wins, losses, total_games, total_rounds.get("total_points", 0), total_rounds.get("total_rounds", 0), total_rounds.get("total_needed_darts", 0), total_rounds.get("sixty_plus", 0), total_rounds.get("eighty_plus", 0), total_rounds.get("hundred_plus", 0), total_rounds.get("hundred_forty_plus", 0), total_rounds.get("hundred_eighty", 0), total_rounds.get("twenty_six", 0))
 
 
-def get_checkout_rate(singleplayer_games: QuerySet[Game], multiplayer_games: QuerySet[MultiplayerGame], user) -> float:
-    singleplayer_checkout_info = singleplayer_games.aggregate(total_tries=Sum("tried_doubles", default=0), wins=Count("id", filter=Q(tried_doubles__gt=0)))
-    multiplayer_checkout_info= MultiplayerPlayer.objects.filter(game__in=multiplayer_games, player=user).aggregate(total_tries=Sum("tried_doubles", default=0), wins=Count("id", filter=Q(tried_doubles__gt=0)))
-    wins = singleplayer_checkout_info.get("wins", 0) + multiplayer_checkout_info.get("wins", 0)
-    checkout_tries =singleplayer_checkout_info.get("total_tries", 0) + multiplayer_checkout_info.get("total_tries", 0)
+def get_singleplayer_checkout_info(games: QuerySet[Game]) -> tuple[int, int]:
+    """checkouts and tried doubles of the games"""
+    info = games.aggregate(total_tries=Sum("tried_doubles", default=0), wins=Count("id", filter=Q(tried_doubles__gt=0)))
+    return info.get("wins", 0), info.get("total_tries", 0)
+
+
+def get_multiplayer_checkout_info(games: QuerySet[MultiplayerGame], user) -> tuple[int, int]:
+    """checkouts and tried doubles of the user in the games"""
+    info = MultiplayerPlayer.objects.filter(game__in=games, player=user).aggregate(total_tries=Sum("tried_doubles", default=0), wins=Count("id", filter=Q(tried_doubles__gt=0)))
+    return info.get("wins", 0), info.get("total_tries", 0)
+
+
+def checkout_rate(wins: int, checkout_tries: int) -> float:
     if checkout_tries == 0:
         return 0.0
     return round(wins / checkout_tries * 100, 2)
 
+
+def get_checkout_rate(singleplayer_games: QuerySet[Game], multiplayer_games: QuerySet[MultiplayerGame], user) -> float:
+    singleplayer_wins, singleplayer_tries = get_singleplayer_checkout_info(singleplayer_games)
+    multiplayer_wins, multiplayer_tries = get_multiplayer_checkout_info(multiplayer_games, user)
+    return checkout_rate(singleplayer_wins + multiplayer_wins, singleplayer_tries + multiplayer_tries)
+
 def get_statistics(games: QuerySet[Game], multiplayer_games: QuerySet[MultiplayerGame], user) -> Statistics:
-    singleplayer_statistics = get_singleplayer_statistics(games)
-    multiplayer_statistics = get_multiplayer_statistics(multiplayer_games, user)
-    checkout_rate= get_checkout_rate(games, multiplayer_games, user)
+    singleplayer_statistics, multiplayer_statistics, checkout_rate = run_concurrently(
+        lambda: get_singleplayer_statistics(games),
+        lambda: get_multiplayer_statistics(multiplayer_games, user),
+        lambda: get_checkout_rate(games, multiplayer_games, user),
+    )
     return Statistics(singleplayer_statistics, multiplayer_statistics, checkout_rate)
 
 def get_avg_per_week_singleplayer(games: QuerySet[Game]):
     rounds = Round.objects.filter(game__in=games)
     return _get_avg_json(rounds)
-def get_avg_per_week_multiplayer(games: QuerySet[MultiplayerGame]):
-    rounds = MultiplayerRound.objects.filter(game__in=games)
-    return _get_avg_json(rounds)
+def get_avg_per_week_multiplayer(games: QuerySet[MultiplayerGame], user):
+    return _get_avg_json(get_user_rounds(games, user))
+
+def get_week_totals(rounds: QuerySet[MultiplayerRound] | QuerySet[Round]) -> dict[date, tuple[int, int]]:
+    """points and number of rounds per week (monday) of the game date"""
+    week_totals = rounds.annotate(
+        week=TruncWeek("game__date")).values("week").annotate(points=Sum("points"), rounds=Count("id")).order_by("week")
+    return {i.get("week"): (i.get("points"), i.get("rounds")) for i in week_totals}
+
+def week_totals_to_json(week_totals: dict[date, tuple[int, int]]) -> list:
+    return [{"x": datetime.strftime(week, '%Y-%W'), "y": points / rounds} for week, (points, rounds) in sorted(week_totals.items()) if rounds]
 
 def _get_avg_json(rounds: QuerySet[MultiplayerRound] | QuerySet[Round]) -> list:
-    week_avgs = rounds.annotate(
-        week=TruncWeek("game__date")).values("week").annotate(avg=Avg("points")).order_by("week")
-    return [{"x": datetime.strftime(i.get('week'), '%Y-%W'), "y": i.get("avg")} for i in week_avgs]
\ No newline at end of file
+    return week_totals_to_json(get_week_totals(rounds))
@@ -0,0 +1,87 @@
+"""
+Cache of the statistics of a user.
+
+Every cached value is stored under a key that contains the current statistics version of
+the user. Invalidating the statistics of a user only bumps that version, so all cached
+values of the user (for every filter) are skipped at once and expire on their own.
+"""
+
+import hashlib
+import time
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import QueryDict
+
+HITS_KEY = "statistics-cache:hits"
+MISSES_KEY = "statistics-cache:misses"
+DEFAULT_TIMEOUT = 60 * 60 * 24
+
+
+def _cache():
+    return caches[getattr(settings, "STATISTICS_CACHE_ALIAS", "default")]
+
+
+def _timeout() -> int:
+    return getattr(settings, "STATISTICS_CACHE_TIMEOUT", DEFAULT_TIMEOUT)
+
+
+def _version_key(user_id: int) -> str:
+    return f"statistics-cache:version:{user_id}"
+
+
+def _get_version(user_id: int) -> int:
+    version = _cache().get(_version_key(user_id))
+    if version is None:
+        version = time.time_ns()
+        # another process may have set a version in the meantime, use that one then
+        if not _cache().add(_version_key(user_id), version, timeout=None):
+            version = _cache().get(_version_key(user_id), version)
+    return version
+
+
+def _count(key: str):
+    try:
+        _cache().incr(key)
+    except ValueError:
+        _cache().add(key, 0, timeout=None)
+        _cache().incr(key)
+
+
+def get_params_digest(params: QueryDict) -> str:
+    """digest of filter parameters, independent of their order"""
+    return hashlib.md5(repr(sorted(params.lists())).encode()).hexdigest()
+
+
+def get_or_compute(user_id: int, name: str, params_digest: str, compute: Callable):
+    key = f"statistics-cache:{user_id}:{_get_version(user_id)}:{name}:{params_digest}"
+    value = _cache().get(key)
+    if value is not None:
+        _count(HITS_KEY)
+        return value
+    _count(MISSES_KEY)
+    value = compute()
+    _cache().set(key, value, timeout=_timeout())
+    return value
+
+
+def invalidate(*user_ids: int):
+    """drop the cached statistics of the users once the current transaction is committed"""
+    def bump_versions():
+        for user_id in user_ids:
+            _cache().set(_version_key(user_id), time.time_ns(), timeout=None)
+
+    if user_ids:
+        transaction.on_commit(bump_versions)
+
+
+def get_counters() -> dict:
+    hits = _cache().get(HITS_KEY, 0)
+    misses = _cache().get(MISSES_KEY, 0)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses) * 100, 2) if hits + misses else 0.0,
+    }
@@ -0,0 +1,221 @@
+"""
+Weekly statistics of finished games per user.
+
+A rollup row holds the statistics of all finished games of one user, mode and week. Rows
+are refreshed whenever a game finishes or a finished game changes. Statistics for a date
+range read the rollups of all weeks that lie completely inside the range and only scan the
+rounds of the remaining games (games in progress and games in the partial weeks at the
+edges of the range).
+"""
+
+from datetime import date, datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Q, QuerySet
+
+from main.business_logic.concurrent_queries import run_concurrently
+from main.business_logic.statistics import (
+    PartStatistics,
+    ScoreHistogram,
+    Statistics,
+    checkout_rate,
+    get_multiplayer_checkout_info,
+    get_multiplayer_histogram,
+    get_multiplayer_results,
+    get_singleplayer_checkout_info,
+    get_singleplayer_histogram,
+    get_singleplayer_results,
+    get_user_rounds,
+    get_week_totals,
+    part_statistics_from_histogram,
+    week_totals_to_json,
+)
+from main.models import (
+    Game,
+    MultiplayerGame,
+    Round,
+    StatisticsRollup,
+    StatisticsRollupCoverage,
+)
+from main.utils import GameStatus, MultiplayerGameStatus, StatisticsMode
+
+# the bands are not stored, they are derived from the stored histograms like everywhere else
+ROLLUP_FIELDS = ["wins", "losses", "total_games", "total_points", "total_rounds", "total_darts_needed"]
+FINISHED_GAME_STATUS = {
+    StatisticsMode.SINGLEPLAYER: Q(status__in=[GameStatus.WON.value, GameStatus.LOST.value]),
+    StatisticsMode.MULTIPLAYER: Q(status=MultiplayerGameStatus.FINISHED.value),
+}
+
+
+def week_of(day: date) -> date:
+    if isinstance(day, datetime):
+        day = day.date()
+    return day - timedelta(days=day.weekday())
+
+
+def get_user_games(user_id: int, mode: StatisticsMode) -> QuerySet:
+    if mode == StatisticsMode.SINGLEPLAYER:
+        return Game.objects.filter(player_id=user_id)
+    return MultiplayerGame.objects.filter(game_players__player_id=user_id)
+
+
+def _compute_part(games: QuerySet, user_id: int, mode: StatisticsMode) -> tuple[PartStatistics, ScoreHistogram, int, int]:
+    if mode == StatisticsMode.SINGLEPLAYER:
+        histogram = get_singleplayer_histogram(games)
+        part = part_statistics_from_histogram(*get_singleplayer_results(games), histogram)
+        return (part, histogram, *get_singleplayer_checkout_info(games))
+    histogram = get_multiplayer_histogram(games, user_id)
+    part = part_statistics_from_histogram(*get_multiplayer_results(games, user_id), histogram)
+    return (part, histogram, *get_multiplayer_checkout_info(games, user_id))
+
+
+def refresh_rollup(user_id: int, week: date, mode: StatisticsMode):
+    games = get_user_games(user_id, mode).filter(
+        FINISHED_GAME_STATUS[mode], date__gte=week, date__lte=week + timedelta(days=6)
+    )
+    part, histogram, checkouts, checkout_tries = _compute_part(games, user_id, mode)
+    if part.total_games == 0:
+        StatisticsRollup.objects.filter(user_id=user_id, week=week, mode=mode.value).delete()
+        return
+    StatisticsRollup.objects.update_or_create(
+        user_id=user_id,
+        week=week,
+        mode=mode.value,
+        defaults={
+            **{name: getattr(part, name) for name in ROLLUP_FIELDS},
+            "checkouts": checkouts,
+            "checkout_tries": checkout_tries,
+            "points_histogram": list(histogram.points),
+            "darts_histogram": list(histogram.darts),
+        },
+    )
+
+
+def refresh_rollups_for_game(game: Game | MultiplayerGame, *previous_dates: date):
+    """refresh the week of the game (and the weeks it was moved from) for all its users"""
+    if isinstance(game, Game):
+        mode = StatisticsMode.SINGLEPLAYER
+        user_ids = [game.player_id]
+    else:
+        mode = StatisticsMode.MULTIPLAYER
+        user_ids = game.game_players.filter(player__isnull=False).values_list("player_id", flat=True)
+    # users without coverage get all their rollups built on their next statistics request
+    covered_user_ids = StatisticsRollupCoverage.objects.filter(
+        user_id__in=list(user_ids)
+    ).values_list("user_id", flat=True)
+    weeks = {week_of(day) for day in (game.date, *previous_dates)}
+    for user_id in covered_user_ids:
+        for week in weeks:
+            refresh_rollup(user_id, week, mode)
+
+
+def rebuild_rollups(user_id: int):
+    with transaction.atomic():
+        StatisticsRollup.objects.filter(user_id=user_id).delete()
+        for mode in StatisticsMode:
+            finished_games = get_user_games(user_id, mode).filter(FINISHED_GAME_STATUS[mode])
+            weeks = {week_of(day) for day in finished_games.values_list("date", flat=True)}
+            for week in sorted(weeks):
+                refresh_rollup(user_id, week, mode)
+        StatisticsRollupCoverage.objects.update_or_create(user_id=user_id)
+
+
+def ensure_rollups(user_id: int):
+    if not StatisticsRollupCoverage.objects.filter(user_id=user_id).exists():
+        rebuild_rollups(user_id)
+
+
+def _split_period(start: date | None, end: date | None):
+    """first and last monday of the weeks completely inside the period, None if there are none"""
+    first_week = week_of(start) if start else None
+    if start and first_week != start:
+        first_week += timedelta(days=7)
+    last_week = week_of(end) if end else None
+    if end and last_week + timedelta(days=6) != end:
+        last_week -= timedelta(days=7)
+    if first_week and last_week and first_week > last_week:
+        return None
+    return first_week, last_week
+
+
+class _Period:
+    def __init__(self, user_id: int, mode: StatisticsMode, start: date | None, end: date | None):
+        self.user_id = user_id
+        self.mode = mode
+        games = get_user_games(user_id, mode)
+        if start:
+            games = games.filter(date__gte=start)
+        if end:
+            games = games.filter(date__lte=end)
+        self.rollups = StatisticsRollup.objects.none()
+        self.uncovered_games = games
+        full_weeks = _split_period(start, end)
+        if full_weeks is None:
+            return
+        first_week, last_week = full_weeks
+        self.rollups = StatisticsRollup.objects.filter(user_id=user_id, mode=mode.value)
+        covered = FINISHED_GAME_STATUS[mode]
+        if first_week:
+            self.rollups = self.rollups.filter(week__gte=first_week)
+            covered &= Q(date__gte=first_week)
+        if last_week:
+            self.rollups = self.rollups.filter(week__lte=last_week)
+            covered &= Q(date__lte=last_week + timedelta(days=6))
+        self.uncovered_games = games.exclude(covered)
+
+    def get_statistics(self) -> tuple[PartStatistics, int, int]:
+        uncovered, histogram, checkouts, checkout_tries = _compute_part(self.uncovered_games, self.user_id, self.mode)
+        wins, losses, total_games = uncovered.wins, uncovered.losses, uncovered.total_games
+        rows = self.rollups.values_list(
+            "wins", "losses", "total_games", "checkouts", "checkout_tries", "points_histogram", "darts_histogram"
+        )
+        for row_wins, row_losses, row_games, row_checkouts, row_tries, points, darts in rows:
+            wins, losses, total_games = wins + row_wins, losses + row_losses, total_games + row_games
+            checkouts, checkout_tries = checkouts + row_checkouts, checkout_tries + row_tries
+            histogram += ScoreHistogram.from_lists(points, darts)
+        return part_statistics_from_histogram(wins, losses, total_games, histogram), checkouts, checkout_tries
+
+    def get_histogram(self) -> ScoreHistogram:
+        if self.mode == StatisticsMode.SINGLEPLAYER:
+            histogram = get_singleplayer_histogram(self.uncovered_games)
+        else:
+            histogram = get_multiplayer_histogram(self.uncovered_games, self.user_id)
+        for points, darts in self.rollups.values_list("points_histogram", "darts_histogram"):
+            histogram += ScoreHistogram.from_lists(points, darts)
+        return histogram
+
+    def get_avg_per_week(self) -> list:
+        if self.mode == StatisticsMode.SINGLEPLAYER:
+            rounds = Round.objects.filter(game__in=self.uncovered_games)
+        else:
+            rounds = get_user_rounds(self.uncovered_games, self.user_id)
+        week_totals = get_week_totals(rounds)
+        for week, points, rounds in self.rollups.values_list("week", "total_points", "total_rounds"):
+            week_points, week_rounds = week_totals.get(week, (0, 0))
+            week_totals[week] = (week_points + points, week_rounds + rounds)
+        return week_totals_to_json(week_totals)
+
+
+def get_rollup_statistics(user_id: int, start: date | None = None, end: date | None = None) -> Statistics:
+    ensure_rollups(user_id)
+    singleplayer_part, multiplayer_part = run_concurrently(
+        lambda: _Period(user_id, StatisticsMode.SINGLEPLAYER, start, end).get_statistics(),
+        lambda: _Period(user_id, StatisticsMode.MULTIPLAYER, start, end).get_statistics(),
+    )
+    singleplayer, singleplayer_checkouts, singleplayer_tries = singleplayer_part
+    multiplayer, multiplayer_checkouts, multiplayer_tries = multiplayer_part
+    return Statistics(
+        singleplayer,
+        multiplayer,
+        checkout_rate(singleplayer_checkouts + multiplayer_checkouts, singleplayer_tries + multiplayer_tries),
+    )
+
+
+def get_rollup_histogram(user_id: int, mode: StatisticsMode, start: date | None = None, end: date | None = None) -> ScoreHistogram:
+    ensure_rollups(user_id)
+    return _Period(user_id, mode, start, end).get_histogram()
+
+
+def get_rollup_avg_per_week(user_id: int, mode: StatisticsMode, start: date | None = None, end: date | None = None) -> list:
+    ensure_rollups(user_id)
+    return _Period(user_id, mode, start, end).get_avg_per_week()
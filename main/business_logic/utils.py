@@ -1,10 +1,14 @@
 from django.contrib.auth.models import User
+from django.db import transaction
 
-from main.constants import checkout_map, special_checkout_map, IMPOSSIBLE_POINTS
+from main.business_logic import checkout_solver, score_tables
+from main.business_logic.running_totals import update_running_totals
+from main.business_logic.statistics_rollup import refresh_rollups_for_game
 from main.models import Game, MultiplayerGame, PreferredKeyBoard, MultiplayerPlayer
+from main.utils import GameStatus
 
 
-def get_points_of_round(left_score: int, points: int, is_valid_checkout: bool) -> int:
+def get_points_of_round(left_score: int, points: int, is_valid_checkout: bool, needed_darts: int = 3) -> int:
     if points > 180:
         points = 180
     if points < 0:
@@ -12,27 +16,47 @@ def get_points_of_round(left_score: int, points: int, is_valid_checkout: bool) -
     left_score = left_score - points
     if left_score < 0 or left_score == 1:
         points = 0
-    if left_score == 0 and points not in checkout_map:
+    if left_score == 0 and not score_tables.is_finishable(points, needed_darts):
         points = 0
     if not is_valid_checkout and left_score == 0:
         points = 0
-    if points in IMPOSSIBLE_POINTS:
+    if not score_tables.is_reachable(points, needed_darts):
         points = 0
     return points
 
 
 def get_checkout_suggestion(left_score: int, throws_left: int) -> str | None:
-    checkout_suggestions =  checkout_map.get(left_score, [])
-    for suggestion in checkout_suggestions:
-        if len(suggestion.split(" ")) <= throws_left:
-            return suggestion
-    return ""
+    return checkout_solver.get_suggestion(left_score, throws_left)
 
 
 def delete_last_round(game: Game | MultiplayerGame) -> None:
-    round_to_delete = game.game_rounds.last()
-    if round_to_delete:
-        round_to_delete.delete()
+    with transaction.atomic():
+        round_to_delete = game.game_rounds.last()
+        if round_to_delete:
+            round_to_delete.delete()
+            if is_finished(game):
+                refresh_rollups_for_game(game)
+
+
+def set_needed_darts(game: Game | MultiplayerGame, needed_darts: int):
+    """correct the darts of the last round, e.g. the darts needed for the checkout"""
+    with transaction.atomic():
+        last_round = game.game_rounds.last()
+        darts_difference = needed_darts - last_round.needed_darts
+        last_round.needed_darts = needed_darts
+        last_round.save(update_fields=["needed_darts"])
+        if isinstance(game, MultiplayerGame):
+            update_running_totals(MultiplayerPlayer, last_round.player_id, 0, 0, darts_difference)
+        else:
+            update_running_totals(Game, game.id, 0, 0, darts_difference)
+        if is_finished(game):
+            refresh_rollups_for_game(game)
+
+
+def is_finished(game: Game | MultiplayerGame) -> bool:
+    if isinstance(game, MultiplayerGame):
+        return game.is_finished
+    return game.status != GameStatus.PROGRESS.value
 
 def set_keyboard(user: User, keyboard: int):
     PreferredKeyBoard.objects.update_or_create(
@@ -0,0 +1,186 @@
+"""
+Channel layer that stores messages and groups in a SQLite file.
+
+All daphne workers on one host that point to the same file share the groups, so a
+group_send of one worker reaches the consumers of every worker. It is meant for local
+multi-worker setups and tests without a redis server, not for high traffic.
+"""
+
+import asyncio
+import pickle
+import random
+import sqlite3
+import string
+import threading
+import time
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_message (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    expires REAL NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS channel_message_channel_idx ON channel_message (channel, id);
+CREATE TABLE IF NOT EXISTS channel_group (
+    name TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (name, channel)
+);
+"""
+
+
+class SQLiteChannelLayer(BaseChannelLayer):
+    extensions = ["groups", "flush"]
+
+    def __init__(
+        self,
+        path="channel_layer.sqlite3",
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        poll_interval=0.02,
+    ):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        self.channel_capacity = self.compile_capacities(channel_capacity or {})
+        self.path = str(path)
+        self.group_expiry = group_expiry
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite connections can not be shared between the threads of the executor
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    async def _run(self, function, *args):
+        return await asyncio.to_thread(function, *args)
+
+    # channel layer API
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        assert "__asgi_channel__" not in message
+        await self._run(self._send, channel, message)
+
+    def _send(self, channel, message):
+        connection = self._connection()
+        # messages only ever contain plain python types written by our own workers
+        body = pickle.dumps(message)
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            if self._queue_length(connection, channel) >= self.get_capacity(channel):
+                raise ChannelFull(channel)
+            self._insert(connection, channel, body)
+
+    def _queue_length(self, connection, channel) -> int:
+        return connection.execute(
+            "SELECT COUNT(*) FROM channel_message WHERE channel = ? AND expires > ?",
+            (channel, time.time()),
+        ).fetchone()[0]
+
+    def _insert(self, connection, channel, body):
+        connection.execute(
+            "INSERT INTO channel_message (channel, expires, body) VALUES (?, ?, ?)",
+            (channel, time.time() + self.expiry, body),
+        )
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+        while True:
+            body = await self._run(self._pop, channel)
+            if body is not None:
+                return pickle.loads(body)
+            await asyncio.sleep(self.poll_interval)
+
+    def _pop(self, channel) -> bytes | None:
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "DELETE FROM channel_message WHERE channel = ? AND expires <= ?",
+                (channel, time.time()),
+            )
+            row = connection.execute(
+                "SELECT id, body FROM channel_message WHERE channel = ? ORDER BY id LIMIT 1",
+                (channel,),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("DELETE FROM channel_message WHERE id = ?", (row[0],))
+            return row[1]
+
+    async def new_channel(self, prefix="specific."):
+        return prefix + "".join(random.choices(string.ascii_letters, k=12))
+
+    # flush extension
+
+    async def flush(self):
+        await self._run(self._flush)
+
+    def _flush(self):
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM channel_message")
+            connection.execute("DELETE FROM channel_group")
+
+    async def close(self):
+        pass
+
+    # groups extension
+
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await self._run(self._group_add, group, channel)
+
+    def _group_add(self, group, channel):
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO channel_group (name, channel, expires) VALUES (?, ?, ?)",
+                (group, channel, time.time() + self.group_expiry),
+            )
+
+    async def group_discard(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await self._run(self._group_discard, group, channel)
+
+    def _group_discard(self, group, channel):
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "DELETE FROM channel_group WHERE name = ? AND channel = ?", (group, channel)
+            )
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_group_name(group)
+        await self._run(self._group_send, group, message)
+
+    def _group_send(self, group, message):
+        connection = self._connection()
+        body = pickle.dumps(message)
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("DELETE FROM channel_group WHERE expires <= ?", (time.time(),))
+            channels = connection.execute(
+                "SELECT channel FROM channel_group WHERE name = ?", (group,)
+            ).fetchall()
+            for (channel,) in channels:
+                # like the other layers, full channels of a group are skipped silently
+                if self._queue_length(connection, channel) < self.get_capacity(channel):
+                    self._insert(connection, channel, body)
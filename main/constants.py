@@ -163,11 +163,6 @@ checkout_map = {
     2: ["D1"],
 }
 
-special_checkout_map = { # checkout map if only 1 or 2 darts are left handle only possibilities, that are safed for 3 darts in checkout_map
-    50: "BULL",
-
-}
-
 first_names = [
     "Luke",
     "Luke",
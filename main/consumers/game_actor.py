@@ -0,0 +1,295 @@
+"""
+One command queue per running game and process.
+
+The sockets of a game (the players' phones and a one device manage screen) do not touch the
+database themselves, they submit their messages to the actor of the game. The actor applies
+the commands strictly in the order they arrived, so two throws sent at the same moment can
+not both be validated against the same turn. Commands that queue up while a batch is applied
+form the next batch: all of its writes run in one transaction, i.e. one write lock.
+
+Card updates are coalesced: the first update starts a window of GAME_UPDATE_COALESCE_WINDOW_MS,
+every update until its end is merged into it and the card is rendered and published once,
+with the latest state. Quick corrections (a throw and its deletion) thus cost one broadcast.
+A redirect is published at once and drops the pending card, which it outdates.
+
+The actor lives as long as it has commands or a pending card, so an idle game costs nothing.
+Different daphne processes have their own actors, between them the row lock of the game
+keeps the order: a throw takes it before it reads whose turn it is, so a throw of another
+process is either saved before (and moves the turn on) or waits until this one is saved.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from main.business_logic.game_snapshot import build_game_snapshot
+from main.business_logic.game_state import build_state_update
+from main.business_logic.multiplayer_game import add_round, create_follow_up_game, get_turn, lock_game
+from main.business_logic.utils import delete_last_round, get_needed_darts, set_multiplayer_keyboard
+from main.consumers import game_events
+from main.models import MultiplayerGame
+
+logger = logging.getLogger(__name__)
+
+GAME_CARD_TEMPLATE = "multiplayer/game/partials/game_card.html"
+MAX_BATCH_SIZE = 20
+# marks commands whose update is the rendered game card
+CONTENT_UPDATE = {"type": "send_game_content"}
+
+
+def redirect_all_event(url: str) -> dict:
+    return {
+        "type": "redirect_all",
+        "url": url,
+    }
+
+
+def build_game_content_event(game_id, render_html: bool = True) -> dict:
+    """
+    Render the game card once for every socket of the game. The card only depends on the
+    viewer for showing the keyboard, so at most two variants are rendered: one for the
+    player at turn and one for spectators. Sockets in the json protocol mode get the state
+    of the card instead, without render_html the html is left to the sockets that need it.
+    """
+    game = MultiplayerGame.objects.get(id=game_id)
+    snapshot = build_game_snapshot(game)
+    context = snapshot.as_context()
+    turn_player = context["turn"].player
+    html = spectator_html = None
+    if render_html:
+        context["user"] = turn_player
+        html = render_to_string(GAME_CARD_TEMPLATE, context=context)
+        if turn_player is not None and not game.one_device_manage:
+            context["user"] = None
+            spectator_html = render_to_string(GAME_CARD_TEMPLATE, context=context)
+    return {
+        "type": "send_game_content",
+        "game_id": str(game_id),
+        "html": html,
+        "spectator_html": spectator_html,
+        "turn_player_id": turn_player.id if turn_player else None,
+        "state": build_state_update(snapshot),
+    }
+
+
+def add_html_socket(game_id):
+    _html_sockets[str(game_id)] += 1
+
+
+def remove_html_socket(game_id):
+    _html_sockets[str(game_id)] -= 1
+    if _html_sockets[str(game_id)] <= 0:
+        del _html_sockets[str(game_id)]
+
+
+@dataclass
+class Command:
+    user: object
+    data: dict
+    done: asyncio.Future = field(default=None, repr=False)
+
+
+def apply_command(game: MultiplayerGame, user, data: dict) -> dict | None:
+    """apply one message to the game and return its update for all sockets, if any"""
+    keyboard = int(data.get("keyboard") or 0)
+    action = data.get("action")
+    if action == "new_game":
+        new_game = create_follow_up_game(game)
+        return redirect_all_event(f"/multiplayer/game/{new_game.id}/")
+    if action == "delete_last_round":
+        delete_last_round(game)
+        return CONTENT_UPDATE
+    lock_game(game)
+    if game.is_finished:
+        # e.g. a second throw that was sent while the winning throw was applied
+        return None
+    points = data.get("points")
+    if not points:
+        points = 0
+    player = game.game_players.get(rank=get_turn(game))
+    set_multiplayer_keyboard(player, keyboard)
+    if player.player != user and player.player is not None and not game.one_device_manage:
+        logger.warning(f"Player {player.player} is not the current player")
+        return None
+    ended_with_double = data.get("ended_with_double") == "true"
+    is_valid_checkout = (ended_with_double and keyboard == 1) or keyboard == 0
+    needed_darts = get_needed_darts(data)
+    # add round returns true if game is ended
+    if add_round(game, player, int(points), is_valid_checkout, needed_darts):
+        return redirect_all_event(f"/multiplayer/game/{game.id}/overview/")
+    return CONTENT_UPDATE
+
+
+def apply_commands(game_id, commands: list[Command]) -> list[dict]:
+    """
+    Apply a batch of commands in one transaction and return the updates to publish, in
+    order. A failing command is rolled back alone and does not publish anything.
+    """
+    updates = []
+    with transaction.atomic():
+        game = MultiplayerGame.objects.get(id=game_id)
+        for command in commands:
+            try:
+                with transaction.atomic():
+                    update = apply_command(game, command.user, command.data)
+            except Exception:
+                logger.exception(f"Command {command.data} of game {game_id} failed")
+                game.refresh_from_db()
+                continue
+            if update is not None:
+                updates.append(update)
+    return updates
+
+
+def resolve(commands: list[Command], error: Exception | None = None):
+    """
+    resolve the futures of the commands. A future can be cancelled already, e.g. when the
+    server cancelled the consumer task of a closed socket while its batch was applied.
+    """
+    for command in commands:
+        if command.done.done():
+            continue
+        if error is None:
+            command.done.set_result(None)
+        else:
+            command.done.set_exception(error)
+
+
+def _coalesce_window() -> float:
+    return settings.GAME_UPDATE_COALESCE_WINDOW_MS / 1000
+
+
+class GameActor:
+    def __init__(self, game_id):
+        self.game_id = str(game_id)
+        self.queue: asyncio.Queue[Command] = asyncio.Queue()
+        self.task: asyncio.Task | None = None
+        self.wakeup = asyncio.Event()
+        # card updates waiting for the end of the window, they are published as one
+        self.pending_updates = 0
+        self.publish_at: float | None = None
+
+    async def submit(self, user, data: dict):
+        """queue a command and wait until its batch was applied"""
+        command = Command(user, data, asyncio.get_running_loop().create_future())
+        self.queue.put_nowait(command)
+        self.wakeup.set()
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+        await command.done
+
+    async def run(self):
+        channel_layer = get_channel_layer()
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                if self.queue.empty():
+                    if self.publish_at is None:
+                        break
+                    timeout = self.publish_at - loop.time()
+                    if timeout > 0:
+                        self.wakeup.clear()
+                        try:
+                            await asyncio.wait_for(self.wakeup.wait(), timeout)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                    await self.publish_content(channel_layer)
+                    continue
+                batch = []
+                while not self.queue.empty() and len(batch) < MAX_BATCH_SIZE:
+                    batch.append(self.queue.get_nowait())
+                _counters["commands"] += len(batch)
+                _counters["batches"] += 1
+                try:
+                    updates = await database_sync_to_async(apply_commands)(self.game_id, batch)
+                except Exception as error:
+                    resolve(batch, error)
+                    continue
+                # the batch is committed, a failing publish does not make its commands fail
+                resolve(batch)
+                try:
+                    for update in updates:
+                        await self.publish(channel_layer, update, loop.time())
+                    if self.publish_at is not None and _coalesce_window() <= 0:
+                        await self.publish_content(channel_layer)
+                except Exception:
+                    logger.exception(f"Updates of game {self.game_id} could not be published")
+        finally:
+            # nothing is awaited between the empty queue and the removal, so no command is lost
+            _actors.pop(self.game_id, None)
+
+    async def publish(self, channel_layer, update: dict, now: float):
+        if update is CONTENT_UPDATE:
+            _counters["content_updates"] += 1
+            self.pending_updates += 1
+            if self.publish_at is None:
+                self.publish_at = now + _coalesce_window()
+            return
+        # e.g. the game was won, the pending card is outdated before it is sent
+        self.pending_updates = 0
+        self.publish_at = None
+        _counters["redirects"] += 1
+        await channel_layer.group_send(self.game_id, game_events.record(self.game_id, update))
+
+    async def publish_content(self, channel_layer):
+        """publish one card with the latest state for all pending updates"""
+        self.pending_updates = 0
+        self.publish_at = None
+        try:
+            # sockets of other processes render the html themselves if they need it
+            event = await database_sync_to_async(build_game_content_event)(
+                self.game_id, render_html=self.game_id in _html_sockets
+            )
+        except Exception:
+            logger.exception(f"Game content of game {self.game_id} could not be built")
+            return
+        _counters["content_published"] += 1
+        try:
+            await channel_layer.group_send(self.game_id, game_events.record(self.game_id, event))
+        except Exception:
+            logger.exception(f"Game content of game {self.game_id} could not be published")
+
+
+_actors: dict[str, GameActor] = {}
+# html protocol sockets per game in this process
+_html_sockets: Counter[str] = Counter()
+_counters: Counter[str] = Counter()
+
+
+def get_actor(game_id) -> GameActor:
+    actor = _actors.get(str(game_id))
+    if actor is None:
+        actor = _actors[str(game_id)] = GameActor(game_id)
+    return actor
+
+
+async def submit(game_id, user, data: dict):
+    await get_actor(game_id).submit(user, data)
+
+
+def get_counters() -> dict:
+    """update counters of the actors of this process since it started"""
+    content_updates = _counters["content_updates"]
+    coalesced = content_updates - _counters["content_published"]
+    return {
+        "commands": _counters["commands"],
+        "batches": _counters["batches"],
+        "content_updates": content_updates,
+        "content_published": _counters["content_published"],
+        "coalesced": coalesced,
+        "coalesced_rate": round(coalesced / content_updates * 100, 2) if content_updates else 0.0,
+        "redirects": _counters["redirects"],
+        "coalesce_window_ms": settings.GAME_UPDATE_COALESCE_WINDOW_MS,
+    }
+
+
+def reset_counters():
+    _counters.clear()
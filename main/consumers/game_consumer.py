@@ -1,47 +1,87 @@
 import json
-from channels.generic.websocket import WebsocketConsumer
-from asgiref.sync import async_to_sync
-from main.business_logic.utils import delete_last_round, set_keyboard, set_multiplayer_keyboard, get_needed_darts
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from main.business_logic.game_snapshot import build_game_snapshot
+from main.business_logic.game_state import build_state_message, get_state_message
+from main.consumers import game_actor, game_events
+from main.consumers.game_actor import build_game_content_event, redirect_all_event
 from main.models import MultiplayerGame
-from django.template.loader import render_to_string
 from urllib.parse import parse_qs
-from main.business_logic.multiplayer_game import (
-    get_game_context,
-    get_turn,
-    add_round,
-    create_follow_up_game,
-)
-import logging
 
-logger = logging.getLogger(__name__)
+__all__ = ["GameConsumer", "build_game_content_event", "redirect_all_event"]
 
+HTML_PROTOCOL = "html"
+# versioned state and deltas for the GameBoard component, see main.business_logic.game_state
+JSON_PROTOCOL = "json"
 
-class GameConsumer(WebsocketConsumer):
-    def connect(self):
+
+def get_query(scope) -> dict:
+    return {key: values[0] for key, values in parse_qs(scope.get("query_string", b"").decode()).items()}
+
+
+def get_protocol(query: dict) -> str:
+    return JSON_PROTOCOL if query.get("protocol") == JSON_PROTOCOL else HTML_PROTOCOL
+
+
+def get_resume_position(query: dict) -> tuple[str, int] | None:
+    """epoch and sequence number of the last event a reconnecting client saw (since=<epoch>:<seq>)"""
+    epoch, _, seq = query.get("since", "").partition(":")
+    if not epoch or not seq.isdigit():
+        return None
+    return epoch, int(seq)
+
+
+def build_current_state_message(game_id) -> dict:
+    game = MultiplayerGame.objects.get(id=game_id)
+    return build_state_message(build_game_snapshot(game))
+
+
+class GameConsumer(AsyncWebsocketConsumer):
+    async def connect(self):
         self.user = self.scope["user"]
 
         # Check if user is authenticated
         if not self.user.is_authenticated:
-            self.close()
+            await self.close()
             return
 
         self.game_id = self.scope["url_route"]["kwargs"]["game_id"]
-        self.game = MultiplayerGame.objects.get(id=self.game_id)
-        async_to_sync(self.channel_layer.group_add)(
-            str(self.game_id), self.channel_name
-        )
-        self.accept()
+        self.game = await MultiplayerGame.objects.aget(id=self.game_id)
+        query = get_query(self.scope)
+        self.protocol = get_protocol(query)
+        # version of the state the client has, deltas are only sent on top of it
+        self.state_version = None
+        await self.channel_layer.group_add(str(self.game_id), self.channel_name)
+        await self.accept()
+        if self.protocol == JSON_PROTOCOL:
+            await self.resume(get_resume_position(query), query.get("version"))
+        else:
+            game_actor.add_html_socket(self.game_id)
 
-    def disconnect(self, close_code):
-        async_to_sync(self.channel_layer.group_discard)(
-            str(self.game_id), self.channel_name
-        )
+    async def disconnect(self, close_code):
+        if hasattr(self, "game_id"):
+            await self.channel_layer.group_discard(str(self.game_id), self.channel_name)
+            if getattr(self, "protocol", None) == HTML_PROTOCOL:
+                game_actor.remove_html_socket(self.game_id)
+
+    async def resume(self, position: tuple[str, int] | None, version: str | None):
+        """send a reconnecting client the events it missed, or the full state"""
+        events = game_events.get_events_since(self.game_id, *position) if position else None
+        if events is None:
+            await self.send_current_state()
+            return
+        self.state_version = version
+        for event in events:
+            # events published meanwhile may arrive twice, the client skips known sequence numbers
+            await getattr(self, event["type"])(event)
 
-    def new_game(self):
-        new_game = create_follow_up_game(self.game)
-        self.create_redirect_all_event(f"/multiplayer/game/{new_game.id}/")
+    async def send_current_state(self):
+        epoch, seq = game_events.get_position(self.game_id)
+        message = await database_sync_to_async(build_current_state_message)(self.game_id)
+        self.state_version = message["version"]
+        await self.send(text_data=json.dumps({**message, "epoch": epoch, "seq": seq}))
 
-    def receive(self, text_data):
+    async def receive(self, text_data):
         data = {}
         # Try JSON first (manual sends)
         try:
@@ -56,66 +96,34 @@ class GameConsumer(WebsocketConsumer):
                 data.update(parsed)
             except Exception:
                 pass
-        user = self.scope["user"]
-        keyboard = int(data.get("keyboard") or 0)
-        action = data.get("action")
-        if action == "new_game":
-            self.new_game()
+        if data.get("action") == "state":
+            # the client lost track of the versions, e.g. after a delta it could not apply
+            await self.send_current_state()
             return
-        if action == "delete_last_round":
-            delete_last_round(self.game)
-            self.update_content_event()
+        # the actor of the game applies the messages of all its sockets one after another
+        await game_actor.submit(self.game_id, self.scope["user"], data)
+
+    async def send_game_content(self, event):
+        if self.protocol == JSON_PROTOCOL:
+            message = get_state_message(event["state"], self.state_version)
+            self.state_version = message["version"]
+            await self.send(text_data=json.dumps({**message, "epoch": event["epoch"], "seq": event["seq"]}))
             return
-        points = data.get("points")
-        if not points:
-            points = 0
-        player = self.game.game_players.get(rank=get_turn(self.game))
-        set_multiplayer_keyboard(player, keyboard)
+        if event["html"] is None:
+            # published by a process without html sockets of this game
+            event = await database_sync_to_async(build_game_content_event)(self.game_id)
+        html = event["html"]
         if (
-            player.player != user
-            and player.player != None
-            and not self.game.one_device_manage
+            event["spectator_html"] is not None
+            and event["turn_player_id"] != self.scope["user"].id
         ):
-            logger.warning(f"Player {player.player} is not the current player")
-            return
-        ended_with_double = data.get("ended_with_double") == "true"
-        is_valid_checkout = (ended_with_double and keyboard == 1) or keyboard == 0
-        needed_darts = get_needed_darts(data)
-        # add round returns true if game is ended
-        if add_round(self.game, player, int(points), is_valid_checkout, needed_darts):
-
-            self.create_redirect_all_event(
-                f"/multiplayer/game/{self.game_id}/overview/"
-            )
-            return
-
-        self.update_content_event()
-
-    def send_game_content(self, event):
-        game_id = event["game_id"]
-        game = MultiplayerGame.objects.get(id=game_id)
-        context = get_game_context(game)
-        context["user"] = self.scope["user"]
-        html = render_to_string(
-            "multiplayer/game/partials/game_card.html", context=context
-        )
-        self.send(
+            html = event["spectator_html"]
+        await self.send(
             text_data=f'<div id="game-content" hx-swap-oob="innerHTML">{html}</div>'
         )
 
-    def redirect_all(self, event):
+    async def redirect_all(self, event):
         url = event["url"]
         # Send JSON message with redirect instruction
-        redirect_message = {"type": "redirect", "url": url}
-        self.send(text_data=json.dumps(redirect_message))
-
-    def create_redirect_all_event(self, url: str):
-        event = {
-            "type": "redirect_all",
-            "url": url,
-        }
-        async_to_sync(self.channel_layer.group_send)(str(self.game_id), event)
-
-    def update_content_event(self):
-        event = {"type": "send_game_content", "game_id": self.game_id}
-        async_to_sync(self.channel_layer.group_send)(str(self.game_id), event)
+        redirect_message = {"type": "redirect", "url": url, "epoch": event["epoch"], "seq": event["seq"]}
+        await self.send(text_data=json.dumps(redirect_message))
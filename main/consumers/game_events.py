@@ -0,0 +1,78 @@
+"""
+Sequence numbers and a short history of the events published to the sockets of a game.
+
+Every event an actor publishes gets the next sequence number of its game and is kept in a
+bounded ring buffer. A socket that reconnects sends the epoch and sequence number of the
+last event it saw and is sent only the events it missed. If the buffer does not reach back
+that far, or the epoch belongs to another process (or an earlier start of this one), the
+socket gets a full snapshot instead.
+
+The buffered events are kept without their html, sockets that need it render the card
+themselves.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+# sequence numbers are only comparable within one epoch
+EPOCH = uuid.uuid4().hex[:8]
+
+
+@dataclass
+class GameEvents:
+    seq: int = 0
+    events: deque = field(default_factory=deque)
+
+
+_lock = threading.RLock()
+_games: OrderedDict[str, GameEvents] = OrderedDict()
+
+
+def _get_game(game_id: str) -> GameEvents:
+    game = _games.get(game_id)
+    if game is None:
+        game = _games[game_id] = GameEvents(events=deque(maxlen=settings.GAME_EVENT_BUFFER_SIZE))
+        while len(_games) > settings.LIVE_GAME_STATE_CACHE_SIZE:
+            _games.popitem(last=False)
+    _games.move_to_end(game_id)
+    return game
+
+
+def record(game_id, event: dict) -> dict:
+    """number the event and keep it for sockets that reconnect"""
+    with _lock:
+        game = _get_game(str(game_id))
+        game.seq += 1
+        event = {**event, "epoch": EPOCH, "seq": game.seq}
+        buffered = {**event, "html": None, "spectator_html": None} if "html" in event else event
+        game.events.append(buffered)
+    return event
+
+
+def get_position(game_id) -> tuple[str, int]:
+    """epoch and sequence number of the last event of the game"""
+    with _lock:
+        game = _games.get(str(game_id))
+        return EPOCH, game.seq if game else 0
+
+
+def get_events_since(game_id, epoch: str, seq: int) -> list[dict] | None:
+    """the events after seq, or None if they are not all buffered any more"""
+    with _lock:
+        game = _games.get(str(game_id))
+        if epoch != EPOCH or game is None or seq > game.seq:
+            return None
+        if seq == game.seq:
+            return []
+        if not game.events or game.events[0]["seq"] > seq + 1:
+            return None
+        return [event for event in game.events if event["seq"] > seq]
+
+
+def clear():
+    with _lock:
+        _games.clear()
@@ -1,6 +1,6 @@
 import json
-from channels.generic.websocket import WebsocketConsumer
-from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
 from django.urls import reverse
 
 from main.business_logic.lobby import create_game
@@ -9,28 +9,25 @@ from django.template.loader import render_to_string
 from urllib.parse import parse_qs
 
 
-class LobbyConsumer(WebsocketConsumer):
-    def connect(self):
+class LobbyConsumer(AsyncWebsocketConsumer):
+    async def connect(self):
         self.user = self.scope["user"]
 
         # Check if user is authenticated
         if not self.user.is_authenticated:
-            self.close()
+            await self.close()
             return
 
         self.game_id = self.scope["url_route"]["kwargs"]["game_id"]
-        self.game = MultiplayerGame.objects.get(id=self.game_id)
-        async_to_sync(self.channel_layer.group_add)(
-            str(self.game_id), self.channel_name
-        )
-        self.accept()
+        self.game = await MultiplayerGame.objects.select_related("creator").aget(id=self.game_id)
+        await self.channel_layer.group_add(str(self.game_id), self.channel_name)
+        await self.accept()
 
-    def disconnect(self, close_code):
-        async_to_sync(self.channel_layer.group_discard)(
-            str(self.game_id), self.channel_name
-        )
+    async def disconnect(self, close_code):
+        if hasattr(self, "game_id"):
+            await self.channel_layer.group_discard(str(self.game_id), self.channel_name)
 
-    def receive(self, text_data):
+    async def receive(self, text_data):
 
         data = {}
         # Try JSON first (manual sends), then fallback to form-encoded (htmx ws-send)
@@ -45,14 +42,19 @@ class LobbyConsumer(WebsocketConsumer):
                 data.update(parsed)
             except Exception:
                 pass
-        # Ensure sender is tracked as player
+        event = await database_sync_to_async(self.handle_message)(data)
+        await self.channel_layer.group_send(str(self.game_id), event)
+
+    def handle_message(self, data: dict) -> dict:
+        """apply the message to the lobby and return the event for all sockets of the lobby"""
+        # Ensure sender is tracked as player (one row per user, see unique_user_per_game)
         if not MultiplayerPlayer.objects.filter(
             game=self.game, player=self.user
         ).exists():
-            MultiplayerPlayer.objects.create(
+            MultiplayerPlayer.objects.get_or_create(
                 game=self.game,
                 player=self.user,
-                rank=self.game.game_players.count() + 1,
+                defaults={"rank": self.game.game_players.count() + 1},
             )
 
         # Handle actions
@@ -62,44 +64,32 @@ class LobbyConsumer(WebsocketConsumer):
             if self.user == self.game.creator:
                 try:
                     create_game(self.game, data)
-                    async_to_sync(self.channel_layer.group_send)(
-                        str(self.game_id),
-                        {
-                            "type": "redirect_all",
-                            "url": f"/multiplayer/game/{self.game_id}/",
-                        },
-                    )
                 except Exception:
                     message = (
                         f"{self.game.creator} has to give the players different ranks!"
                     )
-                    async_to_sync(self.channel_layer.group_send)(
-                        str(self.game_id),
-                        {
-                            "type": "redirect_all",
-                            "url": f'{reverse("lobby", kwargs={"game_id": self.game_id})}?message={message}',
-                        },
-                    )
-                    return
+                    return {
+                        "type": "redirect_all",
+                        "url": f'{reverse("lobby", kwargs={"game_id": self.game_id})}?message={message}',
+                    }
             # Broadcast redirect to all clients in group
-            async_to_sync(self.channel_layer.group_send)(
-                str(self.game_id),
-                {
-                    "type": "redirect_all",
-                    "url": f"/multiplayer/game/{self.game_id}/",
-                },
-            )
-            return
+            return {
+                "type": "redirect_all",
+                "url": f"/multiplayer/game/{self.game_id}/",
+            }
 
         # Default: update lobby content
-        event = {"type": "send_lobby_content", "game_id": self.game_id}
-        async_to_sync(self.channel_layer.group_send)(str(self.game_id), event)
+        return {"type": "send_lobby_content", "game_id": str(self.game_id)}
 
-    def send_lobby_content(self, event):
-        game_id = event["game_id"]
-        game = MultiplayerGame.objects.get(id=game_id)
+    async def send_lobby_content(self, event):
+        html = await database_sync_to_async(self.render_lobby)(event["game_id"])
+        await self.send(
+            text_data=f'<div id="lobby-content" hx-swap-oob="innerHTML">{html}</div>'
+        )
 
-        html = render_to_string(
+    def render_lobby(self, game_id) -> str:
+        game = MultiplayerGame.objects.get(id=game_id)
+        return render_to_string(
             "multiplayer/lobby/partials/player_list.html",
             context={
                 "game": game,
@@ -108,12 +98,9 @@ class LobbyConsumer(WebsocketConsumer):
                 "range": range(1, game.max_players + 1),
             },
         )
-        self.send(
-            text_data=f'<div id="lobby-content" hx-swap-oob="innerHTML">{html}</div>'
-        )
 
-    def redirect_all(self, event):
+    async def redirect_all(self, event):
         url = event["url"]
         # Send JSON message with redirect instruction
         redirect_message = {"type": "redirect", "url": url}
-        self.send(text_data=json.dumps(redirect_message))
+        await self.send(text_data=json.dumps(redirect_message))
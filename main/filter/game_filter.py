@@ -1,7 +1,7 @@
 import django_filters
 from django import forms
 
-from main.models import Game, MultiplayerGame
+from main.models import Game
 
 
 class GameFilter(django_filters.FilterSet):
@@ -48,18 +48,3 @@ class GameFilter(django_filters.FilterSet):
             return queryset
         return queryset.filter(score=int(value))
 
-
-class MultiplayerGameFilter(django_filters.FilterSet):
-
-    date = django_filters.DateFromToRangeFilter(
-        widget=django_filters.widgets.RangeWidget(
-            attrs={"class": "form-control", "type": "date"}
-        )
-    )
-
-    class Meta:
-        model = MultiplayerGame
-        fields = ["date"]
-
-    def filter_by_date(self, queryset, name, value):
-        return queryset.filter(date=value)
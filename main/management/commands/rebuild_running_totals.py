@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from main.business_logic.running_totals import (
+    get_running_total_mismatches,
+    rebuild_running_totals,
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuild the points, rounds and darts totals of games and multiplayer players from their rounds."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report rows whose totals differ from their rounds and fail if there are any.",
+        )
+
+    def handle(self, *args, verify=False, **options):
+        mismatches = get_running_total_mismatches()
+        for model_name, pk, stored, actual in mismatches:
+            self.stdout.write(
+                f"{model_name} {pk}: stored (points, rounds, darts) {stored}, actual {actual}"
+            )
+        if verify:
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} rows have wrong running totals")
+            self.stdout.write(self.style.SUCCESS("All running totals are correct"))
+            return
+        with transaction.atomic():
+            updated = rebuild_running_totals()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the running totals of {updated} rows"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.business_logic.session_standings import rebuild_session_standings
+
+
+class Command(BaseCommand):
+    help = "Rebuild the wins and legs played per player of every session from the finished games."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            sessions = rebuild_session_standings()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the standings of {sessions} sessions"))
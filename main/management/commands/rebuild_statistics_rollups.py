@@ -0,0 +1,25 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from main.business_logic.statistics_rollup import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the weekly statistics rollups of finished games from their rounds."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            help="Only rebuild the rollups of the user with this username.",
+        )
+
+    def handle(self, *args, user=None, **options):
+        users = User.objects.all()
+        if user is not None:
+            users = users.filter(username=user)
+            if not users.exists():
+                raise CommandError(f"User {user} does not exist")
+        user_ids = list(users.values_list("id", flat=True))
+        for user_id in user_ids:
+            rebuild_rollups(user_id)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the statistics rollups of {len(user_ids)} users"))
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def remove_duplicates(apps, schema_editor):
+    """the new unique constraints would fail on rows created by racing requests"""
+    PreferredKeyBoard = apps.get_model("main", "PreferredKeyBoard")
+    MultiplayerPlayer = apps.get_model("main", "MultiplayerPlayer")
+    for field in ("player", "guest_player"):
+        seen = set()
+        # keep the newest keyboard, it is the one update_or_create would have updated last
+        for keyboard in PreferredKeyBoard.objects.filter(**{f"{field}__isnull": False}).order_by("-id"):
+            key = getattr(keyboard, f"{field}_id")
+            if key in seen:
+                keyboard.delete()
+            seen.add(key)
+    MultiplayerGame = apps.get_model("main", "MultiplayerGame")
+    MultiplayerRound = apps.get_model("main", "MultiplayerRound")
+    kept = {}
+    # keep the first player of a user in a game and move what was recorded on the others to it
+    for player in MultiplayerPlayer.objects.filter(player__isnull=False).order_by("id"):
+        key = (player.game_id, player.player_id)
+        if key not in kept:
+            kept[key] = player
+            continue
+        kept_player = kept[key]
+        MultiplayerRound.objects.filter(player=player).update(player=kept_player)
+        MultiplayerGame.objects.filter(winner=player).update(winner=kept_player)
+        kept_player.tried_doubles += player.tried_doubles
+        kept_player.save(update_fields=["tried_doubles"])
+        player.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0019_alter_multiplayergame_creator'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['player', 'status'], name='game_player_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['date', 'rounds', 'score'], name='game_date_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='multiplayerplayer',
+            index=models.Index(fields=['game', 'rank'], name='mp_player_game_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='multiplayerround',
+            index=models.Index(fields=['game', 'player', 'id'], name='mp_round_game_player_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='multiplayerplayer',
+            constraint=models.UniqueConstraint(condition=models.Q(('player__isnull', False)), fields=('game', 'player'), name='unique_user_per_game'),
+        ),
+        migrations.AddConstraint(
+            model_name='preferredkeyboard',
+            constraint=models.UniqueConstraint(condition=models.Q(('player__isnull', False)), fields=('player',), name='unique_keyboard_per_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='preferredkeyboard',
+            constraint=models.UniqueConstraint(condition=models.Q(('guest_player__isnull', False)), fields=('guest_player',), name='unique_keyboard_per_guest'),
+        ),
+    ]
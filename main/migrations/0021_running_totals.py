@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:06
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_running_totals(apps, schema_editor):
+    sources = [
+        ("Game", "Round", "game"),
+        ("MultiplayerPlayer", "MultiplayerRound", "player"),
+    ]
+    for model_name, round_model_name, foreign_key in sources:
+        model = apps.get_model("main", model_name)
+        round_model = apps.get_model("main", round_model_name)
+        rounds = round_model.objects.filter(**{foreign_key: OuterRef("pk")}).order_by().values(foreign_key)
+
+        def total(aggregate):
+            return Coalesce(Subquery(rounds.annotate(total=aggregate).values("total")), Value(0))
+
+        model.objects.update(
+            points_scored=total(Sum("points")),
+            rounds_played=total(Count("id")),
+            darts_thrown=total(Sum("needed_darts")),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0020_indexes_and_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='darts_thrown',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='points_scored',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='rounds_played',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='multiplayerplayer',
+            name='darts_thrown',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='multiplayerplayer',
+            name='points_scored',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='multiplayerplayer',
+            name='rounds_played',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_running_totals, migrations.RunPython.noop),
+    ]
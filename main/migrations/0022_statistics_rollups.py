@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('main', '0021_running_totals'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatisticsRollupCoverage',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics_rollup_coverage', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StatisticsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField()),
+                ('mode', models.IntegerField(choices=[(0, 'SINGLEPLAYER'), (1, 'MULTIPLAYER')])),
+                ('wins', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('total_games', models.IntegerField(default=0)),
+                ('total_points', models.IntegerField(default=0)),
+                ('total_rounds', models.IntegerField(default=0)),
+                ('total_darts_needed', models.IntegerField(default=0)),
+                ('sixty_plus', models.IntegerField(default=0)),
+                ('eighty_plus', models.IntegerField(default=0)),
+                ('hundred_plus', models.IntegerField(default=0)),
+                ('hundred_forty_plus', models.IntegerField(default=0)),
+                ('hundred_eighty', models.IntegerField(default=0)),
+                ('twenty_six', models.IntegerField(default=0)),
+                ('checkouts', models.IntegerField(default=0)),
+                ('checkout_tries', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statistics_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'mode', 'week'), name='unique_rollup_per_week')],
+            },
+        ),
+    ]
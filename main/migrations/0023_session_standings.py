@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_session_standings(apps, schema_editor):
+    session_model = apps.get_model("main", "Session")
+    game_model = apps.get_model("main", "MultiplayerGame")
+    player_model = apps.get_model("main", "MultiplayerPlayer")
+    standing_model = apps.get_model("main", "SessionStanding")
+    standings = {}
+    legs = (
+        player_model.objects.filter(game__session__isnull=False, game__winner__isnull=False)
+        .values("game__session_id", "player_id", "guest_name")
+        .annotate(legs=Count("game_id", distinct=True))
+        .order_by()
+    )
+    for row in legs:
+        identity = (row["player_id"], None) if row["player_id"] else (None, row["guest_name"])
+        standings.setdefault((row["game__session_id"], *identity), [0, 0])[1] += row["legs"]
+    wins = (
+        game_model.objects.filter(session__isnull=False, winner__isnull=False)
+        .values("session_id", "winner__player_id", "winner__guest_name")
+        .annotate(wins=Count("id"))
+        .order_by()
+    )
+    for row in wins:
+        player_id, guest_name = row["winner__player_id"], row["winner__guest_name"]
+        identity = (player_id, None) if player_id else (None, guest_name)
+        standings.setdefault((row["session_id"], *identity), [0, 0])[0] += row["wins"]
+    standing_model.objects.bulk_create(
+        standing_model(session_id=session_id, player_id=player_id, guest_name=guest_name, wins=wins, legs_played=legs_played)
+        for (session_id, player_id, guest_name), (wins, legs_played) in standings.items()
+        if player_id or guest_name
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0022_statistics_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guest_name', models.CharField(max_length=20, null=True)),
+                ('wins', models.IntegerField(default=0)),
+                ('legs_played', models.IntegerField(default=0)),
+                ('player', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='main.session')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('player__isnull', False)), fields=('session', 'player'), name='unique_standing_per_user'), models.UniqueConstraint(condition=models.Q(('player__isnull', True)), fields=('session', 'guest_name'), name='unique_standing_per_guest')],
+            },
+        ),
+        migrations.RunPython(fill_session_standings, migrations.RunPython.noop),
+    ]
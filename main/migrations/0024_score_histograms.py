@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+def rebuild_rollups_on_next_request(apps, schema_editor):
+    # the existing rollups have no histograms, ensure_rollups rebuilds users without coverage
+    apps.get_model("main", "StatisticsRollupCoverage").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0023_session_standings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statisticsrollup',
+            name='darts_histogram',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='statisticsrollup',
+            name='points_histogram',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(rebuild_rollups_on_next_request, migrations.RunPython.noop),
+    ]
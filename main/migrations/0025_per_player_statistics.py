@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def rebuild_rollups_on_next_request(apps, schema_editor):
+    # multiplayer rollups counted the rounds of all players of a game
+    apps.get_model("main", "StatisticsRollupCoverage").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0024_score_histograms'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='multiplayerplayer',
+            index=models.Index(fields=['player', 'game'], name='mp_player_user_game_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='multiplayerround',
+            index=models.Index(fields=['player', 'points', 'needed_darts'], name='mp_round_player_points_idx'),
+        ),
+        migrations.RunPython(rebuild_rollups_on_next_request, migrations.RunPython.noop),
+    ]
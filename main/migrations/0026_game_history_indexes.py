@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0025_per_player_statistics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['player', 'date', 'id'], name='game_player_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='multiplayergame',
+            index=models.Index(fields=['date', 'id'], name='mp_game_history_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0026_game_history_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='statisticsrollup',
+            name='eighty_plus',
+        ),
+        migrations.RemoveField(
+            model_name='statisticsrollup',
+            name='hundred_eighty',
+        ),
+        migrations.RemoveField(
+            model_name='statisticsrollup',
+            name='hundred_forty_plus',
+        ),
+        migrations.RemoveField(
+            model_name='statisticsrollup',
+            name='hundred_plus',
+        ),
+        migrations.RemoveField(
+            model_name='statisticsrollup',
+            name='sixty_plus',
+        ),
+        migrations.RemoveField(
+            model_name='statisticsrollup',
+            name='twenty_six',
+        ),
+    ]
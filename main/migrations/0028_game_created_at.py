@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:30
+
+from datetime import datetime, time, timedelta
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Min
+
+
+def order_existing_games(apps, schema_editor):
+    """
+    Existing games get no real creation time, but the ids of their first rounds keep the
+    order in which they were played on a day. Games without rounds come first.
+    """
+    tz = django.utils.timezone.get_current_timezone() if settings.USE_TZ else None
+    for model_name in ("Game", "MultiplayerGame"):
+        model = apps.get_model("main", model_name)
+        games = model.objects.annotate(first_round=Min("game_rounds__id")).order_by(
+            "date", F("first_round").asc(nulls_first=True), "id"
+        )
+        updated = []
+        day, position = None, 0
+        for game in games.iterator():
+            if game.date != day:
+                day, position = game.date, 0
+            position += 1
+            game.created_at = datetime.combine(day, time(), tzinfo=tz) + timedelta(microseconds=position)
+            updated.append(game)
+        model.objects.bulk_update(updated, ["created_at"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0027_rollup_bands_from_histograms'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='game',
+            name='game_player_history_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='multiplayergame',
+            name='mp_game_history_idx',
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='multiplayergame',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(order_existing_games, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['player', 'date', 'created_at', 'id'], name='game_player_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='multiplayergame',
+            index=models.Index(fields=['date', 'created_at', 'id'], name='mp_game_history_idx'),
+        ),
+    ]
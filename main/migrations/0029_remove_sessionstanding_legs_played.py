@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0028_game_created_at'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='sessionstanding',
+            name='legs_played',
+        ),
+    ]
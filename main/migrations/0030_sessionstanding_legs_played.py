@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_legs_played(apps, schema_editor):
+    player_model = apps.get_model("main", "MultiplayerPlayer")
+    standing_model = apps.get_model("main", "SessionStanding")
+    legs = (
+        player_model.objects.filter(game__session__isnull=False, game__winner__isnull=False)
+        .values("game__session_id", "player_id", "guest_name")
+        .annotate(legs=Count("game_id", distinct=True))
+        .order_by()
+    )
+    for row in legs:
+        standings = standing_model.objects.filter(session_id=row["game__session_id"])
+        if row["player_id"]:
+            standings = standings.filter(player_id=row["player_id"])
+        else:
+            standings = standings.filter(player__isnull=True, guest_name=row["guest_name"])
+        if not standings.update(legs_played=row["legs"]) and (row["player_id"] or row["guest_name"]):
+            # players without a win have no standing yet
+            standing_model.objects.create(
+                session_id=row["game__session_id"],
+                player_id=row["player_id"],
+                guest_name=None if row["player_id"] else row["guest_name"],
+                legs_played=row["legs"],
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0029_remove_sessionstanding_legs_played'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sessionstanding',
+            name='legs_played',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_legs_played, migrations.RunPython.noop),
+    ]
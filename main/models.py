@@ -5,6 +5,7 @@ from django.utils import timezone
 from main.utils import (
     GAME_STATUS_CHOICES,
     MULTIPLAYER_GAME_STATUS_CHOICES,
+    STATISTICS_MODE_CHOICES,
     MultiplayerGameStatus,
 )
 import uuid
@@ -14,11 +15,25 @@ import uuid
 class Game(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     date = models.DateField(default=timezone.now)
+    # orders the games of a day, the ids are random
+    created_at = models.DateTimeField(default=timezone.now)
     rounds = models.IntegerField(validators=[MinValueValidator(0)])
     score = models.IntegerField(validators=[MinValueValidator(0)])
     status = models.IntegerField(choices=GAME_STATUS_CHOICES, default=0)
     player = ForeignKey("auth.User", on_delete=models.DO_NOTHING)
     tried_doubles = models.IntegerField(validators=[MinValueValidator(0)], default=0)
+    # running totals of game_rounds, maintained by main.signals
+    points_scored = models.IntegerField(default=0)
+    rounds_played = models.IntegerField(default=0)
+    darts_thrown = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["player", "status"], name="game_player_status_idx"),
+            models.Index(fields=["date", "rounds", "score"], name="game_date_category_idx"),
+            # keyset pages of the game history, see business_logic.game_history
+            models.Index(fields=["player", "date", "created_at", "id"], name="game_player_history_idx"),
+        ]
 
 
 class Round(models.Model):
@@ -46,9 +61,35 @@ class Session(models.Model):
         return self.games.all().count()
 
 
+class SessionStanding(models.Model):
+    """Wins and finished legs of a user or guest in a session, see main.business_logic.session_standings"""
+
+    session = models.ForeignKey("Session", on_delete=models.CASCADE, related_name="standings")
+    player = models.ForeignKey("auth.User", on_delete=models.CASCADE, null=True, blank=True)
+    guest_name = models.CharField(max_length=20, null=True)
+    wins = models.IntegerField(default=0)
+    legs_played = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["session", "player"],
+                condition=models.Q(player__isnull=False),
+                name="unique_standing_per_user",
+            ),
+            models.UniqueConstraint(
+                fields=["session", "guest_name"],
+                condition=models.Q(player__isnull=True),
+                name="unique_standing_per_guest",
+            ),
+        ]
+
+
 class MultiplayerGame(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     date = models.DateField(default=timezone.now)
+    # orders the games of a day, the ids are random
+    created_at = models.DateTimeField(default=timezone.now)
     score = models.IntegerField(validators=[MinValueValidator(0)])
     status = models.IntegerField(choices=MULTIPLAYER_GAME_STATUS_CHOICES, default=0)
     online = models.BooleanField(default=False)
@@ -68,6 +109,11 @@ class MultiplayerGame(models.Model):
     )
     one_device_manage = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["date", "created_at", "id"], name="mp_game_history_idx"),
+        ]
+
     @property
     def is_waiting(self):
         return self.status == MultiplayerGameStatus.WAITING.value
@@ -96,6 +142,13 @@ class MultiplayerRound(models.Model):
         "MultiplayerPlayer", on_delete=models.CASCADE, related_name="player_rounds"
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["game", "player", "id"], name="mp_round_game_player_idx"),
+            # covers the score histogram of a user's players, see statistics.get_user_rounds
+            models.Index(fields=["player", "points", "needed_darts"], name="mp_round_player_points_idx"),
+        ]
+
 
 class MultiplayerPlayer(models.Model):
     game = models.ForeignKey(
@@ -107,6 +160,24 @@ class MultiplayerPlayer(models.Model):
     rank = models.IntegerField()
     guest_name = models.CharField(max_length=20, null=True)
     tried_doubles = models.IntegerField(validators=[MinValueValidator(0)], default=0)
+    # running totals of player_rounds, maintained by main.signals
+    points_scored = models.IntegerField(default=0)
+    rounds_played = models.IntegerField(default=0)
+    darts_thrown = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["game", "rank"], name="mp_player_game_rank_idx"),
+            models.Index(fields=["player", "game"], name="mp_player_user_game_idx"),
+        ]
+        constraints = [
+            # ranks are swapped one by one in set_player_ranks, so (game, rank) can not be unique
+            models.UniqueConstraint(
+                fields=["game", "player"],
+                condition=models.Q(player__isnull=False),
+                name="unique_user_per_game",
+            ),
+        ]
 
     def __str__(self):
         return self.player.username if self.player else self.guest_name or ""
@@ -119,4 +190,52 @@ class MultiplayerPlayer(models.Model):
 class PreferredKeyBoard(models.Model):
     player = models.ForeignKey("auth.User", on_delete=models.CASCADE, related_name='keyboard', null=True)
     guest_player = models.ForeignKey("MultiplayerPlayer", on_delete=models.CASCADE, related_name='keyboard', null=True, default=None)
-    keyboard = models.IntegerField()
\ No newline at end of file
+    keyboard = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["player"],
+                condition=models.Q(player__isnull=False),
+                name="unique_keyboard_per_user",
+            ),
+            models.UniqueConstraint(
+                fields=["guest_player"],
+                condition=models.Q(guest_player__isnull=False),
+                name="unique_keyboard_per_guest",
+            ),
+        ]
+
+
+# statistics
+
+
+class StatisticsRollup(models.Model):
+    """Statistics of the finished games of a user in one week, see main.business_logic.statistics_rollup"""
+
+    user = models.ForeignKey("auth.User", on_delete=models.CASCADE, related_name="statistics_rollups")
+    week = models.DateField()  # monday of the week
+    mode = models.IntegerField(choices=STATISTICS_MODE_CHOICES)
+    wins = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+    total_games = models.IntegerField(default=0)
+    total_points = models.IntegerField(default=0)
+    total_rounds = models.IntegerField(default=0)
+    total_darts_needed = models.IntegerField(default=0)
+    checkouts = models.IntegerField(default=0)
+    checkout_tries = models.IntegerField(default=0)
+    # rounds per points and per needed darts, see main.business_logic.statistics.ScoreHistogram
+    points_histogram = models.JSONField(default=list)
+    darts_histogram = models.JSONField(default=list)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "mode", "week"], name="unique_rollup_per_week"),
+        ]
+
+
+class StatisticsRollupCoverage(models.Model):
+    """Marks users whose finished games are all contained in their rollups"""
+
+    user = models.OneToOneField("auth.User", on_delete=models.CASCADE, primary_key=True, related_name="statistics_rollup_coverage")
+    built_at = models.DateTimeField(default=timezone.now)
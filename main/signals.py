@@ -0,0 +1,145 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from main.business_logic import filter_choices, statistics_cache
+from main.business_logic.session_standings import record_finished_game, refresh_session_standings
+from main.business_logic.running_totals import update_running_totals
+from main.models import Game, MultiplayerGame, MultiplayerPlayer, MultiplayerRound, Round, Session
+from main.utils import GameStatus, MultiplayerGameStatus
+
+_UNKNOWN_WINNER = object()
+
+
+def _deleted_by_cascade(origin, round_model) -> bool:
+    """the totals of a game or player that is deleted itself do not need to be kept up to date"""
+    if origin is None:
+        return False
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model is not round_model
+
+
+@receiver(post_save, sender=Round)
+def add_round_to_game_totals(sender, instance: Round, created: bool, **kwargs):
+    if created:
+        update_running_totals(Game, instance.game_id, instance.points, 1, instance.needed_darts)
+
+
+@receiver(post_delete, sender=Round)
+def remove_round_from_game_totals(sender, instance: Round, origin=None, **kwargs):
+    if not _deleted_by_cascade(origin, Round):
+        update_running_totals(Game, instance.game_id, -instance.points, -1, -instance.needed_darts)
+
+
+@receiver(post_save, sender=MultiplayerRound)
+def add_round_to_player_totals(sender, instance: MultiplayerRound, created: bool, **kwargs):
+    if created:
+        update_running_totals(
+            MultiplayerPlayer, instance.player_id, instance.points, 1, instance.needed_darts
+        )
+
+
+@receiver(post_delete, sender=MultiplayerRound)
+def remove_round_from_player_totals(sender, instance: MultiplayerRound, origin=None, **kwargs):
+    if not _deleted_by_cascade(origin, MultiplayerRound):
+        update_running_totals(
+            MultiplayerPlayer, instance.player_id, -instance.points, -1, -instance.needed_darts
+        )
+
+
+def _get_game_user_ids(game_id) -> list[int]:
+    return list(
+        MultiplayerPlayer.objects.filter(game_id=game_id, player__isnull=False).values_list(
+            "player_id", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=Game)
+def invalidate_statistics_of_finished_game(sender, instance: Game, **kwargs):
+    if instance.status != GameStatus.PROGRESS.value:
+        statistics_cache.invalidate(instance.player_id)
+
+
+@receiver(post_save, sender=Game)
+def add_game_to_filter_choices(sender, instance: Game, created: bool, **kwargs):
+    if created:
+        filter_choices.add_game(instance)
+
+
+@receiver(post_delete, sender=Game)
+def invalidate_statistics_of_deleted_game(sender, instance: Game, **kwargs):
+    statistics_cache.invalidate(instance.player_id)
+
+
+@receiver(post_save, sender=MultiplayerGame)
+def invalidate_statistics_of_finished_multiplayer_game(sender, instance: MultiplayerGame, **kwargs):
+    if instance.status == MultiplayerGameStatus.FINISHED.value:
+        statistics_cache.invalidate(*_get_game_user_ids(instance.id))
+
+
+@receiver(post_save, sender=MultiplayerPlayer)
+def invalidate_statistics_of_player(sender, instance: MultiplayerPlayer, created: bool, **kwargs):
+    # e.g. corrected checkout misses, new players have no statistics yet
+    if not created and instance.player_id:
+        statistics_cache.invalidate(instance.player_id)
+
+
+@receiver(post_delete, sender=MultiplayerPlayer)
+def invalidate_statistics_of_deleted_player(sender, instance: MultiplayerPlayer, **kwargs):
+    if instance.player_id:
+        statistics_cache.invalidate(instance.player_id)
+
+
+@receiver(post_save, sender=Round)
+@receiver(post_delete, sender=Round)
+def invalidate_statistics_of_round(sender, instance: Round, created: bool = False, origin=None, **kwargs):
+    if not created and not _deleted_by_cascade(origin, Round):
+        statistics_cache.invalidate(
+            *Game.objects.filter(id=instance.game_id).values_list("player_id", flat=True)
+        )
+
+
+@receiver(post_save, sender=MultiplayerRound)
+@receiver(post_delete, sender=MultiplayerRound)
+def invalidate_statistics_of_multiplayer_round(
+    sender, instance: MultiplayerRound, created: bool = False, origin=None, **kwargs
+):
+    if not created and not _deleted_by_cascade(origin, MultiplayerRound):
+        statistics_cache.invalidate(*_get_game_user_ids(instance.game_id))
+
+
+@receiver(post_init, sender=MultiplayerGame)
+def remember_winner(sender, instance: MultiplayerGame, **kwargs):
+    # the winner as loaded, so saving the game counts a new winner once without querying the
+    # old one, a game loaded without its winner column is recounted if it gets one
+    instance._saved_winner_id = instance.__dict__.get("winner_id", _UNKNOWN_WINNER)
+
+
+@receiver(post_save, sender=MultiplayerGame)
+def update_session_standings(sender, instance: MultiplayerGame, **kwargs):
+    # runs inside the transaction that sets the winner (add_round), games without one do not count
+    saved_winner_id, instance._saved_winner_id = instance._saved_winner_id, instance.winner_id
+    if not instance.session_id or instance.winner_id == saved_winner_id:
+        return
+    if saved_winner_id is None:
+        record_finished_game(instance)
+    else:
+        # the winner was changed or removed, which is rare enough to recount the session
+        refresh_session_standings(instance.session_id)
+
+
+def _refresh_remaining_session_standings(session_id):
+    with transaction.atomic():
+        if Session.objects.filter(id=session_id).exists():
+            refresh_session_standings(session_id)
+
+
+@receiver(post_delete, sender=MultiplayerGame)
+def remove_game_from_session_standings(sender, instance: MultiplayerGame, **kwargs):
+    # after the commit, the game may be deleted together with its session or its players
+    if instance.session_id and instance.winner_id:
+        transaction.on_commit(partial(_refresh_remaining_session_standings, instance.session_id))
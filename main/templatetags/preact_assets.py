@@ -1,8 +1,11 @@
 from django import template
 from django.conf import settings
 from django.templatetags.static import static
+from django.urls import reverse
 import os
 
+from main.business_logic import checkout_solver
+
 register = template.Library()
 
 
@@ -27,3 +30,7 @@ def preact_bundle() -> str:
     return static(f"assets/{chosen}")
 
 
+@register.simple_tag
+def checkout_table_url() -> str:
+    """URL of the current checkout table, the keyboards load it once and cache it"""
+    return reverse("checkout_table", kwargs={"version": checkout_solver.TABLE_VERSION})
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from channels.exceptions import ChannelFull
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from main.channel_layers import SQLiteChannelLayer
+
+SEND_FROM_OTHER_PROCESS = """
+import asyncio, sys
+from main.channel_layers import SQLiteChannelLayer
+asyncio.run(SQLiteChannelLayer(path=sys.argv[1]).group_send("game", {"type": "send_game_content", "html": "<p>"}))
+"""
+
+
+class SQLiteChannelLayerTests(SimpleTestCase):
+
+    def setUp(self):
+        """Set up a fresh layer file for each test method."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(Path(directory.name) / "layer.sqlite3")
+
+    def create_layer(self, **kwargs):
+        return SQLiteChannelLayer(path=self.path, poll_interval=0.01, **kwargs)
+
+    def receive(self, layer, channel, timeout=2):
+        async def receive():
+            return await asyncio.wait_for(layer.receive(channel), timeout)
+
+        return async_to_sync(receive)()
+
+    def test_group_send_reaches_other_worker(self):
+        """Test a group send of one layer instance reaches the channels added by another."""
+        worker_1, worker_2 = self.create_layer(), self.create_layer()
+        channel_1 = async_to_sync(worker_1.new_channel)()
+        channel_2 = async_to_sync(worker_2.new_channel)()
+        async_to_sync(worker_1.group_add)("game", channel_1)
+        async_to_sync(worker_2.group_add)("game", channel_2)
+
+        async_to_sync(worker_2.group_send)("game", {"type": "update_content", "id": 1})
+
+        self.assertEqual(self.receive(worker_1, channel_1), {"type": "update_content", "id": 1})
+        self.assertEqual(self.receive(worker_2, channel_2), {"type": "update_content", "id": 1})
+
+    def test_group_send_from_other_process(self):
+        """Test a group send of another process is received."""
+        layer = self.create_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)("game", channel)
+
+        subprocess.run(
+            [sys.executable, "-c", SEND_FROM_OTHER_PROCESS, self.path],
+            check=True,
+            cwd=settings.BASE_DIR,
+        )
+
+        self.assertEqual(self.receive(layer, channel), {"type": "send_game_content", "html": "<p>"})
+
+    def test_group_discard(self):
+        """Test discarded channels do not receive group messages."""
+        layer = self.create_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)("game", channel)
+        async_to_sync(layer.group_discard)("game", channel)
+
+        async_to_sync(layer.group_send)("game", {"type": "update_content"})
+
+        with self.assertRaises(asyncio.TimeoutError):
+            self.receive(layer, channel, timeout=0.1)
+
+    def test_capacity(self):
+        """Test sending to a full channel fails and messages keep their order."""
+        layer = self.create_layer(capacity=2)
+        async_to_sync(layer.send)("worker", {"number": 1})
+        async_to_sync(layer.send)("worker", {"number": 2})
+
+        with self.assertRaises(ChannelFull):
+            async_to_sync(layer.send)("worker", {"number": 3})
+        self.assertEqual(self.receive(layer, "worker"), {"number": 1})
+        self.assertEqual(self.receive(layer, "worker"), {"number": 2})
+
+
+class CacheSettingsTests(SimpleTestCase):
+
+    def load_settings(self, expression="s.CACHES['default']['BACKEND']", **env):
+        """Helper method to import the settings in a new process with the environment and print the expression."""
+        return subprocess.run(
+            [sys.executable, "-c", f"import dart.settings as s; print({expression})"],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+            env={**os.environ, **env},
+        )
+
+    def test_cache_follows_the_channel_layer(self):
+        """Test workers that share a channel layer share the cache by default."""
+        for channel_layer, backend in (
+            ("memory", "LocMemCache"),
+            ("redis", "RedisCache"),
+            ("sqlite", "FileBasedCache"),
+        ):
+            with self.subTest(channel_layer=channel_layer):
+                result = self.load_settings(CHANNEL_LAYER=channel_layer)
+                self.assertTrue(result.stdout.strip().endswith(backend), result.stderr)
+
+    def test_redis_cache_has_its_own_database(self):
+        """Test the Redis cache does not share the database of the channel layer."""
+        result = self.load_settings(
+            "s.CACHES['default']['LOCATION'], s.CHANNEL_LAYERS['default']['CONFIG']['hosts']", CHANNEL_LAYER="redis"
+        )
+        self.assertEqual(result.stdout.strip(), "redis://127.0.0.1:6379/1 ['redis://127.0.0.1:6379/0']", result.stderr)
+
+    def test_process_cache_with_shared_channel_layer_is_refused(self):
+        """Test a LocMemCache is not accepted for multiple workers."""
+        result = self.load_settings(
+            CHANNEL_LAYER="redis", CACHE_BACKEND="django.core.cache.backends.locmem.LocMemCache"
+        )
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("ImproperlyConfigured", result.stderr)
@@ -0,0 +1,106 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from main.business_logic import checkout_solver
+from main.business_logic.utils import get_checkout_suggestion
+from main.constants import checkout_map, IMPOSSIBLE_POINTS
+
+DART_POINTS = {"S": 1, "D": 2, "T": 3}
+
+
+def route_points(route) -> int:
+    return sum(50 if dart == "BULL" else DART_POINTS[dart[0]] * int(dart[1:]) for dart in route)
+
+
+class CheckoutSolverTests(TestCase):
+
+    def test_preferred_routes_of_checkout_map_first(self):
+        """Test the best route is the first route of checkout_map that fits the darts left."""
+        for score, routes in checkout_map.items():
+            for darts in (1, 2, 3):
+                fitting = [route.replace("D25", "BULL") for route in routes if len(route.split(" ")) <= darts]
+                if fitting:
+                    self.assertEqual(
+                        get_checkout_suggestion(score, darts), fitting[0], f"{score} with {darts} darts"
+                    )
+
+    def test_all_routes_valid(self):
+        """Test every route scores its points, ends on a double and fits the darts left."""
+        for darts in (1, 2, 3):
+            for score, routes in checkout_solver.ROUTES[darts].items():
+                for route in routes:
+                    self.assertEqual(route_points(route), score, route)
+                    self.assertTrue(route[-1] == "BULL" or route[-1].startswith("D"), route)
+                    self.assertLessEqual(len(route), darts, route)
+
+    def test_bull_is_one_token(self):
+        """Test the bull is called BULL in every route, like on the keyboards."""
+        self.assertEqual(get_checkout_suggestion(170, 3), "T20 T20 BULL")
+        for darts in (1, 2, 3):
+            for routes in checkout_solver.ROUTES[darts].values():
+                for route in routes:
+                    self.assertNotIn("D25", route)
+
+    def test_complete_tables(self):
+        """Test exactly the scores that can be finished have routes."""
+        self.assertEqual(set(checkout_solver.ROUTES[3]), set(checkout_map))
+        self.assertEqual(max(checkout_solver.ROUTES[2]), 110)
+        self.assertEqual(max(checkout_solver.ROUTES[1]), 50)
+        self.assertTrue(IMPOSSIBLE_POINTS.isdisjoint(checkout_solver.ROUTES[3]))
+
+    def test_gaps_of_checkout_map_filled(self):
+        """Test finishes the map only knows with more darts get a suggestion."""
+        self.assertEqual(get_checkout_suggestion(38, 1), "D19")
+        self.assertEqual(get_checkout_suggestion(38, 2), "S18 D10")
+
+    def test_no_suggestion(self):
+        """Test scores without a finish give an empty suggestion."""
+        self.assertEqual(get_checkout_suggestion(169, 3), "")
+        self.assertEqual(get_checkout_suggestion(99, 2), "")
+        self.assertEqual(get_checkout_suggestion(1, 3), "")
+        self.assertEqual(get_checkout_suggestion(40, 0), "")
+
+
+class CheckoutTableViewTests(TestCase):
+
+    def setUp(self):
+        """Set up a logged in user for each test method."""
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.client.force_login(self.user)
+
+    def test_table_is_long_cacheable(self):
+        """Test the versioned table matches the suggestions and may be cached for good."""
+        url = reverse("checkout_table", kwargs={"version": checkout_solver.TABLE_VERSION})
+
+        response = self.client.get(url)
+
+        self.assertIn("immutable", response["Cache-Control"])
+        suggestions = response.json()["suggestions"]
+        self.assertEqual(suggestions[3][170], get_checkout_suggestion(170, 3))
+        self.assertEqual(suggestions[1][38], get_checkout_suggestion(38, 1))
+
+    def test_old_version_redirects(self):
+        """Test an outdated table version redirects to the current table."""
+        response = self.client.get(reverse("checkout_table", kwargs={"version": "outdated"}))
+
+        self.assertRedirects(
+            response,
+            reverse("checkout_table", kwargs={"version": checkout_solver.TABLE_VERSION}),
+        )
+
+    def test_hint_not_modified(self):
+        """Test the hint endpoint answers a matching ETag without a body."""
+        url = reverse("checkout_hint", kwargs={"left_score": 100, "throws_left": 2})
+
+        response = self.client.get(url)
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(response.json(), {"checkout_suggestion": "T20 D20"})
+        self.assertEqual(cached.status_code, 304)
+
+    def test_pages_link_the_table(self):
+        """Test pages point the keyboards to the current table."""
+        response = self.client.get(reverse("home"))
+
+        self.assertContains(response, f"checkout-table/{checkout_solver.TABLE_VERSION}.json")
@@ -0,0 +1,71 @@
+import threading
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from main.business_logic.concurrent_queries import run_concurrently
+from main.business_logic.statistics import get_statistics
+from main.models import Game, MultiplayerGame, Round
+from main.utils import GameStatus
+
+
+class ConcurrentQueriesTests(TransactionTestCase):
+
+    def setUp(self):
+        """A user with a finished game and an empty statistics cache"""
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        game = Game.objects.create(score=121, rounds=5, player=self.user, status=GameStatus.WON.value)
+        Round.objects.create(game=game, points=60, needed_darts=3)
+
+    def test_calls_run_at_the_same_time(self):
+        """Every call waits for the other one, so they only finish if they run in parallel"""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def count_users():
+            barrier.wait()
+            return User.objects.count(), threading.get_ident()
+
+        (first, first_thread), (second, second_thread) = run_concurrently(count_users, count_users)
+        self.assertEqual((first, second), (1, 1))
+        self.assertNotEqual(first_thread, second_thread)
+        self.assertNotIn(threading.get_ident(), (first_thread, second_thread))
+
+    def test_results_keep_the_order_of_the_calls(self):
+        """The results are returned in the order of the calls, exceptions are raised"""
+        self.assertEqual(run_concurrently(lambda: 1, lambda: 2, lambda: 3), [1, 2, 3])
+        with self.assertRaises(ZeroDivisionError):
+            run_concurrently(lambda: 1, lambda: 1 / 0)
+
+    def test_nested_calls_run_inline(self):
+        """A worker runs its own calls itself instead of waiting for the pool"""
+        def nested():
+            return run_concurrently(threading.get_ident, threading.get_ident), threading.get_ident()
+
+        for threads, worker in run_concurrently(nested, nested):
+            self.assertEqual(threads, [worker, worker])
+
+    @override_settings(STATISTICS_QUERY_WORKERS=1)
+    def test_single_worker_runs_inline(self):
+        """With one worker the calls run one after another in the calling thread"""
+        self.assertEqual(run_concurrently(threading.get_ident, threading.get_ident), [threading.get_ident()] * 2)
+
+    def test_statistics_page_assembles_the_results(self):
+        """The page shows the same statistics and weekly averages as the sequential queries"""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("statistics"))
+        self.assertEqual(
+            response.context["statistics"],
+            get_statistics(Game.objects.filter(player=self.user), MultiplayerGame.objects.none(), self.user),
+        )
+        self.assertIn('"y": 60', response.context["week_avg_singleplayer"])
+
+
+class ConcurrentQueriesInTransactionTests(TestCase):
+
+    def test_transaction_runs_inline(self):
+        """Other connections can not see the rows of an open transaction, so it runs inline"""
+        User.objects.create_user(username="testuser", password="testpass")
+        self.assertEqual(run_concurrently(User.objects.count, threading.get_ident), [1, threading.get_ident()])
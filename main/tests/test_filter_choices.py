@@ -0,0 +1,77 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django_filters.fields import DateRangeField
+
+from main.business_logic import filter_choices
+from main.business_logic.filter_choices import get_choices
+from main.models import Game, MultiplayerGame, MultiplayerPlayer
+from main.views.statistics import get_filters, get_rollup_period
+
+
+class FilterChoicesTests(TestCase):
+
+    def setUp(self):
+        """Set up a user with two games of the same configuration and an empty cache."""
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        for day in (date(2026, 1, 1), date(2026, 3, 1)):
+            Game.objects.create(score=301, rounds=5, player=self.user, date=day)
+
+    def create_game(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            Game.objects.create(player=self.user, **kwargs)
+
+    def test_choices_are_cached(self):
+        """The distinct values are queried once"""
+        self.assertEqual(get_choices(self.user.id), ({5}, {301}))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_choices(self.user.id), ({5}, {301}))
+
+    def test_new_configuration_drops_choices(self):
+        """A game with a new score is a choice right away, a known configuration keeps the cache"""
+        get_choices(self.user.id)
+        self.create_game(score=301, rounds=5)
+        with self.assertNumQueries(0):
+            get_choices(self.user.id)
+
+        self.create_game(score=501, rounds=5)
+        self.assertEqual(get_choices(self.user.id), ({5}, {301, 501}))
+
+    def test_unfiltered_request_uses_the_base(self):
+        """Without filter values the games of the user are not filtered"""
+        request = RequestFactory().get("/statistics/", {"rounds": "", "date_min": ""})
+        request.user = self.user
+        _, games, _ = get_filters(request)
+        self.assertEqual(str(games.query), str(Game.objects.filter(player=self.user).query))
+
+    def test_empty_date_range_uses_the_base(self):
+        """A date range without bounds counts as no filter, for the base and the rollups"""
+        request = RequestFactory().get("/statistics/", {"date_min": "", "date_max": ""})
+        request.user = self.user
+        with mock.patch.object(DateRangeField, "compress", return_value=slice(None, None)):
+            game_filter, games, _ = get_filters(request)
+        self.assertEqual(str(games.query), str(Game.objects.filter(player=self.user).query))
+        self.assertEqual(get_rollup_period(game_filter), (None, None))
+
+    def test_date_filters_multiplayer_games(self):
+        """The date range of the filter selects the multiplayer games as well"""
+        for day in (date(2026, 1, 1), date(2026, 3, 1)):
+            game = MultiplayerGame.objects.create(score=301, max_players=1, date=day)
+            MultiplayerPlayer.objects.create(game=game, player=self.user, rank=1)
+        request = RequestFactory().get("/statistics/", {"date_min": "2026-02-01"})
+        request.user = self.user
+
+        _, games, multiplayer_games = get_filters(request)
+        self.assertEqual(list(games.values_list("date", flat=True)), [date(2026, 3, 1)])
+        self.assertEqual(list(multiplayer_games.values_list("date", flat=True)), [date(2026, 3, 1)])
+
+    def test_choices_expire(self):
+        """The choices are not kept longer than the timeout"""
+        with mock.patch.object(filter_choices, "_cache") as cache_:
+            cache_.return_value.get.return_value = None
+            filter_choices.get_choices(self.user.id)
+        self.assertEqual(cache_.return_value.set.call_args.kwargs["timeout"], filter_choices.TIMEOUT)
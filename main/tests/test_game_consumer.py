@@ -0,0 +1,356 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.db import transaction
+from main.business_logic import game_state
+from main.consumers import game_actor, game_events
+from main.consumers.game_actor import CONTENT_UPDATE, Command, apply_command, apply_commands
+from main.consumers.game_consumer import build_game_content_event, redirect_all_event
+from main.models import MultiplayerGame, MultiplayerPlayer, MultiplayerRound, Session
+from main.routing import websocket_urlpatterns
+from main.utils import MultiplayerGameStatus
+
+
+class GameContentEventTests(TestCase):
+
+    def setUp(self):
+        """Set up test data for each test method."""
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass")
+        self.user2 = User.objects.create_user(username="testuser2", password="testpass")
+
+    def create_game(self, one_device_manage=False):
+        """Helper method to create a two player game."""
+        game = MultiplayerGame.objects.create(
+            score=301,
+            creator=self.user1,
+            max_players=2,
+            status=MultiplayerGameStatus.PROGRESS.value,
+            session=Session.objects.create(),
+            one_device_manage=one_device_manage,
+        )
+        MultiplayerPlayer.objects.create(game=game, rank=1, player=self.user1)
+        MultiplayerPlayer.objects.create(game=game, rank=2, player=self.user2)
+        return game
+
+    def test_spectator_variant_without_keyboard(self):
+        """Test the spectator variant hides the keyboard of the player at turn."""
+        game = self.create_game()
+
+        event = build_game_content_event(game.id)
+
+        self.assertEqual(event["type"], "send_game_content")
+        self.assertEqual(event["turn_player_id"], self.user1.id)
+        self.assertIn("<key-board", event["html"])
+        self.assertNotIn("<key-board", event["spectator_html"])
+
+    def test_one_device_manage_single_variant(self):
+        """Test only one variant is rendered if every device may throw."""
+        game = self.create_game(one_device_manage=True)
+
+        event = build_game_content_event(game.id)
+
+        self.assertIn("<key-board", event["html"])
+        self.assertIsNone(event["spectator_html"])
+
+    def test_guest_turn_single_variant(self):
+        """Test only one variant is rendered if a guest is at turn."""
+        game = self.create_game()
+        game.game_players.filter(rank=1).update(player=None, guest_name="Guest")
+
+        event = build_game_content_event(game.id)
+
+        self.assertIsNone(event["turn_player_id"])
+        self.assertIsNone(event["spectator_html"])
+
+
+class GameActorTests(TestCase):
+
+    def setUp(self):
+        """Set up a two player game managed on one device."""
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass")
+        self.user2 = User.objects.create_user(username="testuser2", password="testpass")
+        self.game = MultiplayerGame.objects.create(
+            score=100,
+            creator=self.user1,
+            max_players=2,
+            status=MultiplayerGameStatus.PROGRESS.value,
+            session=Session.objects.create(),
+            one_device_manage=True,
+        )
+        MultiplayerPlayer.objects.create(game=self.game, rank=1, player=self.user1)
+        MultiplayerPlayer.objects.create(game=self.game, rank=2, player=self.user2)
+
+    def apply(self, *messages):
+        """Helper method to apply messages of user1 as one batch."""
+        return apply_commands(self.game.id, [Command(self.user1, message) for message in messages])
+
+    def test_batch_is_applied_in_order(self):
+        """Test the throws of a batch are recorded in turn order and each updates the card."""
+        updates = self.apply({"points": "20"}, {"points": "40"}, {"points": "60"})
+
+        rounds = MultiplayerRound.objects.filter(game=self.game).order_by("id")
+        self.assertEqual([r.player.rank for r in rounds], [1, 2, 1])
+        self.assertEqual([r.points for r in rounds], [20, 40, 60])
+        self.assertEqual(updates, [CONTENT_UPDATE] * 3)
+
+    def test_throw_after_winning_throw_is_ignored(self):
+        """Test a throw queued behind the winning throw does not add a round."""
+        updates = self.apply({"points": "100"}, {"points": "60"})
+
+        self.assertEqual(MultiplayerRound.objects.filter(game=self.game).count(), 1)
+        self.assertEqual(updates, [redirect_all_event(f"/multiplayer/game/{self.game.id}/overview/")])
+
+    def test_throw_of_another_worker_is_seen(self):
+        """Test a throw applied to a game loaded before another worker won it does not add a round."""
+        stale_game = MultiplayerGame.objects.get(id=self.game.id)
+        self.apply({"points": "100"})
+
+        with transaction.atomic():
+            self.assertIsNone(apply_command(stale_game, self.user1, {"points": "60"}))
+        self.assertEqual(MultiplayerRound.objects.filter(game=self.game).count(), 1)
+
+    def test_turn_is_read_under_the_game_lock(self):
+        """Test the game row is locked before it is read whose turn it is."""
+        calls = mock.Mock()
+        with (
+            mock.patch.object(game_actor, "lock_game", wraps=game_actor.lock_game) as lock_game,
+            mock.patch.object(game_actor, "get_turn", wraps=game_actor.get_turn) as get_turn,
+        ):
+            calls.attach_mock(lock_game, "lock_game")
+            calls.attach_mock(get_turn, "get_turn")
+            self.apply({"points": "20"})
+        self.assertEqual([call[0] for call in calls.mock_calls], ["lock_game", "get_turn"])
+
+    def test_failing_command_does_not_stop_the_batch(self):
+        """Test an invalid message is skipped and the rest of the batch is applied."""
+        with self.assertLogs("main.consumers.game_actor", "ERROR"):
+            updates = self.apply({"points": "20"}, {"points": "abc"}, {"points": "40"})
+
+        self.assertEqual(MultiplayerRound.objects.filter(game=self.game).count(), 2)
+        self.assertEqual(len(updates), 2)
+
+
+class FailingChannelLayer:
+    async def group_send(self, group, message):
+        raise ConnectionError("channel layer is down")
+
+
+class GameActorRunTests(SimpleTestCase):
+
+    def tearDown(self):
+        game_events.clear()
+
+    async def run_batch(self, *commands):
+        """Helper method to run an actor over the queued commands."""
+        actor = game_actor.GameActor("game")
+        for command in commands:
+            actor.queue.put_nowait(command)
+        await actor.run()
+
+    def command(self):
+        return Command(None, {"points": "20"}, asyncio.get_running_loop().create_future())
+
+    @mock.patch("main.consumers.game_actor.apply_commands", return_value=[])
+    async def test_cancelled_command_does_not_stop_the_actor(self, apply_commands):
+        """Test the other commands of a batch resolve if one of them was cancelled meanwhile."""
+        cancelled, waiting = self.command(), self.command()
+        cancelled.done.cancel()
+
+        await self.run_batch(cancelled, waiting)
+
+        self.assertIsNone(waiting.done.result())
+        self.assertNotIn("game", game_actor._actors)
+
+    @mock.patch("main.consumers.game_actor.get_channel_layer", return_value=FailingChannelLayer())
+    @mock.patch("main.consumers.game_actor.apply_commands", return_value=[redirect_all_event("/")])
+    async def test_failing_publish_does_not_fail_the_commands(self, apply_commands, get_channel_layer):
+        """Test committed commands succeed although their update could not be published."""
+        command = self.command()
+
+        with self.assertLogs("main.consumers.game_actor", "ERROR"):
+            await self.run_batch(command)
+
+        self.assertIsNone(command.done.result())
+
+
+class GameConsumerTests(TransactionTestCase):
+
+    def setUp(self):
+        """Set up a two player game for each test method."""
+        self.user1 = User.objects.create_user(username="testuser1", password="testpass")
+        self.user2 = User.objects.create_user(username="testuser2", password="testpass")
+        self.game = MultiplayerGame.objects.create(
+            score=301,
+            creator=self.user1,
+            max_players=2,
+            status=MultiplayerGameStatus.PROGRESS.value,
+            session=Session.objects.create(),
+        )
+        MultiplayerPlayer.objects.create(game=self.game, rank=1, player=self.user1)
+        MultiplayerPlayer.objects.create(game=self.game, rank=2, player=self.user2)
+
+    def tearDown(self):
+        game_state.clear()
+        game_events.clear()
+
+    def create_communicator(self, user, protocol=None):
+        path = f"/ws/{self.game.id}/" + (f"?protocol={protocol}" if protocol else "")
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), path)
+        communicator.scope["user"] = user
+        return communicator
+
+    def test_round_is_broadcast(self):
+        """Test a round of the player at turn updates the player and the spectator socket."""
+
+        async def play():
+            player = self.create_communicator(self.user1)
+            spectator = self.create_communicator(self.user2)
+            self.assertTrue((await player.connect())[0])
+            self.assertTrue((await spectator.connect())[0])
+
+            await player.send_to(text_data=json.dumps({"points": "60"}))
+            player_html = await player.receive_from()
+            spectator_html = await spectator.receive_from()
+
+            await player.disconnect()
+            await spectator.disconnect()
+            return player_html, spectator_html
+
+        player_html, spectator_html = async_to_sync(play)()
+
+        self.assertIn('id="game-content"', player_html)
+        self.assertIn('id="game-content"', spectator_html)
+        self.assertEqual(MultiplayerRound.objects.get(game=self.game).points, 60)
+
+    def test_concurrent_sockets_are_serialized(self):
+        """Test throws sent at the same time on two sockets are applied one after another."""
+        MultiplayerGame.objects.filter(id=self.game.id).update(one_device_manage=True)
+
+        async def play():
+            sockets = [self.create_communicator(self.user1) for _ in range(2)]
+            for socket in sockets:
+                self.assertTrue((await socket.connect())[0])
+            await asyncio.gather(
+                *(socket.send_to(text_data=json.dumps({"points": "60"})) for socket in sockets)
+            )
+            for socket in sockets:
+                await socket.receive_from()
+            for socket in sockets:
+                await socket.disconnect()
+
+        async_to_sync(play)()
+
+        rounds = MultiplayerRound.objects.filter(game=self.game).order_by("id")
+        self.assertEqual([r.player.rank for r in rounds], [1, 2])
+
+    def test_json_protocol_sends_state_and_deltas(self):
+        """Test json sockets get the state on connect and only the changes after a round."""
+
+        async def play():
+            player = self.create_communicator(self.user1, "json")
+            spectator = self.create_communicator(self.user2, "json")
+            self.assertTrue((await player.connect())[0])
+            self.assertTrue((await spectator.connect())[0])
+            initial = await spectator.receive_json_from()
+            await player.receive_json_from()
+
+            await player.send_to(text_data=json.dumps({"points": "60"}))
+            await player.receive_json_from()
+            update = await spectator.receive_json_from()
+
+            await player.disconnect()
+            await spectator.disconnect()
+            return initial, update
+
+        initial, update = async_to_sync(play)()
+
+        player1, player2 = (str(p.id) for p in self.game.game_players.order_by("rank"))
+        self.assertEqual(initial["type"], "state")
+        self.assertEqual(initial["state"]["turn"], player1)
+        self.assertEqual(initial["state"]["players"][player1]["left_score"], 301)
+        self.assertEqual(update["type"], "delta")
+        self.assertEqual(update["base_version"], initial["version"])
+        self.assertEqual(update["delta"]["turn"], player2)
+        self.assertEqual(update["delta"]["players"], {player1: {"left_score": 241, "average_points": 60.0}})
+        self.assertNotIn("one_device_manage", update["delta"])
+
+    @override_settings(GAME_UPDATE_COALESCE_WINDOW_MS=200)
+    def test_rapid_updates_are_coalesced(self):
+        """Test a throw and its quick deletion are published as one card."""
+        MultiplayerGame.objects.filter(id=self.game.id).update(one_device_manage=True)
+        game_actor.reset_counters()
+
+        async def play():
+            player = self.create_communicator(self.user1)
+            self.assertTrue((await player.connect())[0])
+            await player.send_to(text_data=json.dumps({"points": "60"}))
+            await player.send_to(text_data=json.dumps({"action": "delete_last_round"}))
+            html = await player.receive_from(timeout=2)
+            nothing_else = await player.receive_nothing(timeout=0.5)
+            await player.disconnect()
+            return html, nothing_else
+
+        html, nothing_else = async_to_sync(play)()
+
+        self.assertIn('id="game-content"', html)
+        self.assertTrue(nothing_else)
+        self.assertFalse(MultiplayerRound.objects.filter(game=self.game).exists())
+        counters = game_actor.get_counters()
+        self.assertEqual(counters["content_updates"], 2)
+        self.assertEqual(counters["content_published"], 1)
+        self.assertEqual(counters["coalesced"], 1)
+
+    @override_settings(GAME_UPDATE_COALESCE_WINDOW_MS=0)
+    def test_reconnect_resumes_from_sequence(self):
+        """Test a reconnecting json socket gets only the missed events, or the state if the gap is too old."""
+
+        async def play():
+            spectator = self.create_communicator(self.user2, "json")
+            self.assertTrue((await spectator.connect())[0])
+            initial = await spectator.receive_json_from()
+            await spectator.disconnect()
+
+            player = self.create_communicator(self.user1)
+            self.assertTrue((await player.connect())[0])
+            await player.send_to(text_data=json.dumps({"points": "60"}))
+            await player.receive_from()
+            await player.disconnect()
+
+            since = f"{initial['epoch']}:{initial['seq']}"
+            resumed = self.create_communicator(self.user2, f"json&since={since}&version={initial['version']}")
+            self.assertTrue((await resumed.connect())[0])
+            missed = await resumed.receive_json_from()
+            nothing_else = await resumed.receive_nothing()
+            await resumed.disconnect()
+
+            stale = self.create_communicator(self.user2, f"json&since=expired:1&version={initial['version']}")
+            self.assertTrue((await stale.connect())[0])
+            snapshot = await stale.receive_json_from()
+            await stale.disconnect()
+            return initial, missed, nothing_else, snapshot
+
+        initial, missed, nothing_else, snapshot = async_to_sync(play)()
+
+        self.assertEqual(missed["type"], "delta")
+        self.assertEqual(missed["base_version"], initial["version"])
+        self.assertEqual(missed["seq"], initial["seq"] + 1)
+        self.assertTrue(nothing_else)
+        self.assertEqual(snapshot["type"], "state")
+        self.assertEqual(snapshot["seq"], missed["seq"])
+        self.assertEqual(snapshot["version"], missed["version"])
+
+    def test_anonymous_user_is_rejected(self):
+        """Test sockets of anonymous users are closed."""
+
+        async def connect():
+            communicator = self.create_communicator(AnonymousUser())
+            connected, _ = await communicator.connect()
+            return connected
+
+        self.assertFalse(async_to_sync(connect)())
@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase, override_settings
+
+from main.consumers import game_events
+
+
+@override_settings(GAME_EVENT_BUFFER_SIZE=3)
+class GameEventsTests(SimpleTestCase):
+
+    def tearDown(self):
+        game_events.clear()
+
+    def record(self, count: int, game_id="game"):
+        """Helper method to record count events of the game."""
+        return [game_events.record(game_id, {"type": "redirect_all", "url": str(i)}) for i in range(count)]
+
+    def test_events_are_numbered_per_game(self):
+        """Every game has its own sequence, starting at 1"""
+        self.record(2)
+        other = self.record(1, game_id="other")
+        self.assertEqual(other[0]["seq"], 1)
+        self.assertEqual(game_events.get_position("game"), (game_events.EPOCH, 2))
+        self.assertEqual(game_events.get_position("unknown"), (game_events.EPOCH, 0))
+
+    def test_missed_events_are_replayed(self):
+        """A client gets the events after its sequence number, in order"""
+        events = self.record(3)
+        self.assertEqual(game_events.get_events_since("game", game_events.EPOCH, 1), events[1:])
+        self.assertEqual(game_events.get_events_since("game", game_events.EPOCH, 3), [])
+
+    def test_gap_beyond_the_buffer_needs_a_snapshot(self):
+        """Events that fell out of the ring buffer can not be replayed"""
+        self.record(5)
+        self.assertIsNone(game_events.get_events_since("game", game_events.EPOCH, 1))
+        self.assertEqual(len(game_events.get_events_since("game", game_events.EPOCH, 2)), 3)
+
+    def test_other_epoch_needs_a_snapshot(self):
+        """Sequence numbers of another process or start are not comparable"""
+        self.record(1)
+        self.assertIsNone(game_events.get_events_since("game", "other", 0))
+        self.assertIsNone(game_events.get_events_since("game", game_events.EPOCH, 5))
+
+    def test_buffer_does_not_keep_html(self):
+        """The rendered card is dropped from the buffer, the published event keeps it"""
+        event = game_events.record("game", {"type": "send_game_content", "html": "<div>", "spectator_html": None})
+        self.assertEqual(event["html"], "<div>")
+        self.assertIsNone(game_events.get_events_since("game", game_events.EPOCH, 0)[0]["html"])
@@ -0,0 +1,100 @@
+from datetime import date, datetime, timedelta, timezone
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from main.business_logic.game_history import decode_cursor, get_multiplayer_page, get_singleplayer_page
+from main.models import Game, MultiplayerGame, MultiplayerPlayer, MultiplayerRound
+from main.utils import GameStatus, MultiplayerGameStatus
+
+
+class GameHistoryTests(TestCase):
+
+    def setUp(self):
+        """Set up a user with 25 singleplayer games, three of them on each day."""
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        for i in range(25):
+            Game.objects.create(
+                score=301, rounds=5, player=self.user, date=date(2026, 1, 1) + timedelta(days=i // 3),
+                status=GameStatus.WON.value,
+            )
+        self.games = Game.objects.filter(player=self.user)
+
+    def test_pages_walk_the_history_newest_first(self):
+        """The pages hold every game once, ordered by date and id, the last one has no cursor"""
+        pages = [get_singleplayer_page(self.games)]
+        while pages[-1].next_cursor:
+            pages.append(get_singleplayer_page(self.games, pages[-1].next_cursor))
+
+        self.assertEqual([len(page.games) for page in pages], [10, 10, 5])
+        self.assertEqual(
+            [game.id for page in pages for game in page.games],
+            list(self.games.order_by("-date", "-created_at", "-id").values_list("id", flat=True)),
+        )
+
+    def test_games_of_a_day_are_newest_first(self):
+        """Games of the same day are ordered by their creation, not by their random ids"""
+        day = date(2026, 6, 1)
+        created = [
+            Game.objects.create(
+                score=501, rounds=5, player=self.user, date=day, created_at=datetime(2026, 6, 1, hour, tzinfo=timezone.utc)
+            )
+            for hour in range(12)
+        ]
+        page = get_singleplayer_page(self.games)
+        rest = get_singleplayer_page(self.games, page.next_cursor)
+
+        self.assertEqual([game.id for game in page.games + rest.games[:2]], [game.id for game in reversed(created)])
+
+    def test_deep_page_is_one_query(self):
+        """A later page is one query, without a count"""
+        cursor = get_singleplayer_page(self.games, get_singleplayer_page(self.games).next_cursor).next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            page = get_singleplayer_page(self.games, cursor)
+
+        self.assertEqual(len(page.games), 5)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("COUNT", queries[0]["sql"])
+
+    def test_invalid_cursor(self):
+        """A cursor that is not a date and an id is rejected"""
+        with self.assertRaises(ValueError):
+            decode_cursor("2026-01-01")
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("statistics_history", args=["singleplayer"]), {"cursor": "nope"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse("statistics_history", args=["other"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_next_page_keeps_the_filter(self):
+        """The rows of a page load the next page with the same filter"""
+        self.client.force_login(self.user)
+        cursor = get_singleplayer_page(self.games).next_cursor
+        response = self.client.get(
+            reverse("statistics_history", args=["singleplayer"]), {"cursor": cursor, "score": 301}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["games"]), 10)
+        self.assertIn("score=301", response.context["next_query"])
+        self.assertContains(response, 'hx-trigger="intersect once"')
+
+    def test_multiplayer_page_counts_rounds(self):
+        """Multiplayer games come with their winner and number of rounds in two queries"""
+        game = MultiplayerGame.objects.create(score=301, max_players=2, status=MultiplayerGameStatus.FINISHED.value)
+        player = MultiplayerPlayer.objects.create(game=game, player=self.user, rank=1)
+        MultiplayerRound.objects.create(game=game, player=player, points=60, needed_darts=3)
+        MultiplayerRound.objects.create(game=game, player=player, points=60, needed_darts=3)
+        game.winner = player
+        game.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            page = get_multiplayer_page(MultiplayerGame.objects.filter(game_players__player=self.user))
+            self.assertEqual(page.games[0].winner.player_id, self.user.id)
+
+        self.assertEqual(page.games[0].round_count, 2)
+        self.assertIsNone(page.next_cursor)
+        self.assertEqual(len(queries), 2)
@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+
+from main.business_logic.game_state import get_delta, get_state_message, get_version
+
+
+class GameStateTests(SimpleTestCase):
+
+    def setUp(self):
+        """A state of a two player game"""
+        self.state = {
+            "game_id": "1",
+            "players": {"1": {"left_score": 301, "wins": 0}, "2": {"left_score": 301, "wins": 1}},
+            "turn": "1",
+            "last_points": None,
+        }
+
+    def test_delta_holds_changed_keys(self):
+        """Only changed keys are in the delta, the players are diffed per player"""
+        new = {
+            **self.state,
+            "players": {**self.state["players"], "1": {"left_score": 241, "wins": 0}},
+            "turn": "2",
+            "last_points": 60,
+        }
+        self.assertEqual(
+            get_delta(self.state, new),
+            {"players": {"1": {"left_score": 241}}, "turn": "2", "last_points": 60},
+        )
+
+    def test_removed_keys_have_no_delta(self):
+        """A state without a key of the old state can only be sent in full"""
+        new = {key: value for key, value in self.state.items() if key != "last_points"}
+        self.assertIsNone(get_delta(self.state, new))
+
+    def test_version_depends_on_content(self):
+        """Equal states have the same version regardless of the key order"""
+        reordered = dict(reversed(list(self.state.items())))
+        self.assertEqual(get_version(reordered), get_version(self.state))
+        self.assertNotEqual(get_version({**self.state, "turn": "2"}), get_version(self.state))
+
+    def test_full_state_for_unknown_version(self):
+        """Sockets that do not have the base version get the full state"""
+        update = {"version": "b", "state": self.state, "base_version": "a", "delta": {"turn": "2"}}
+        self.assertEqual(get_state_message(update, "a")["type"], "delta")
+        self.assertEqual(get_state_message(update, "x")["type"], "state")
+        self.assertEqual(get_state_message(update, None)["state"], self.state)
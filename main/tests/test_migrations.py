@@ -0,0 +1,107 @@
+from datetime import date
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MigrationTestCase(TransactionTestCase):
+    migrate_from = None
+    migrate_to = None
+
+    def setUp(self):
+        """Migrate back to the state before the migration under test."""
+        executor = MigrationExecutor(connection)
+        self.leaf = executor.loader.graph.leaf_nodes("main")
+        executor.migrate(self.migrate_from)
+        self.apps = executor.loader.project_state(self.migrate_from).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.leaf)
+
+    def migrate(self):
+        """Helper method to run the migration and return the apps of its state."""
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.migrate_to)
+        return executor.loader.project_state(self.migrate_to).apps
+
+
+class RemoveDuplicatePlayersMigrationTests(MigrationTestCase):
+    migrate_from = [("main", "0019_alter_multiplayergame_creator")]
+    migrate_to = [("main", "0020_indexes_and_constraints")]
+
+    def test_duplicate_with_rounds_is_merged(self):
+        """Rounds, win and missed doubles of a duplicate player move to the kept player"""
+        User = self.apps.get_model("auth", "User")
+        MultiplayerGame = self.apps.get_model("main", "MultiplayerGame")
+        MultiplayerPlayer = self.apps.get_model("main", "MultiplayerPlayer")
+        MultiplayerRound = self.apps.get_model("main", "MultiplayerRound")
+        user = User.objects.create(username="testuser")
+        game = MultiplayerGame.objects.create(score=301, max_players=2)
+        kept = MultiplayerPlayer.objects.create(game=game, player=user, rank=1, tried_doubles=1)
+        duplicate = MultiplayerPlayer.objects.create(game=game, player=user, rank=2, tried_doubles=2)
+        MultiplayerRound.objects.create(game=game, player=kept, points=60)
+        MultiplayerRound.objects.create(game=game, player=duplicate, points=241)
+        game.winner = duplicate
+        game.save()
+
+        apps = self.migrate()
+
+        players = apps.get_model("main", "MultiplayerPlayer").objects.filter(game_id=game.id)
+        self.assertEqual(list(players.values_list("id", "tried_doubles")), [(kept.id, 3)])
+        rounds = apps.get_model("main", "MultiplayerRound").objects.filter(game_id=game.id)
+        self.assertEqual(set(rounds.values_list("player_id", flat=True)), {kept.id})
+        self.assertEqual(apps.get_model("main", "MultiplayerGame").objects.get(id=game.id).winner_id, kept.id)
+
+
+class GameCreatedAtMigrationTests(MigrationTestCase):
+    migrate_from = [("main", "0027_rollup_bands_from_histograms")]
+    migrate_to = [("main", "0028_game_created_at")]
+
+    def test_existing_games_keep_the_order_of_their_rounds(self):
+        """Games of a day are ordered by their first round, games without rounds come first"""
+        User = self.apps.get_model("auth", "User")
+        Game = self.apps.get_model("main", "Game")
+        Round = self.apps.get_model("main", "Round")
+        user = User.objects.create(username="testuser")
+        games = [Game.objects.create(score=301, rounds=5, player=user, date=date(2026, 1, 1)) for _ in range(3)]
+        for game in (games[2], games[0]):
+            Round.objects.create(game=game, points=60, needed_darts=3)
+
+        apps = self.migrate()
+
+        ordered = apps.get_model("main", "Game").objects.order_by("created_at").values_list("id", flat=True)
+        self.assertEqual(list(ordered), [games[1].id, games[2].id, games[0].id])
+
+
+class StandingLegsPlayedMigrationTests(MigrationTestCase):
+    migrate_from = [("main", "0029_remove_sessionstanding_legs_played")]
+    migrate_to = [("main", "0030_sessionstanding_legs_played")]
+
+    def test_legs_are_filled_from_finished_games(self):
+        """Every player of a finished session game gets its leg, also without a win"""
+        User = self.apps.get_model("auth", "User")
+        Session = self.apps.get_model("main", "Session")
+        MultiplayerGame = self.apps.get_model("main", "MultiplayerGame")
+        MultiplayerPlayer = self.apps.get_model("main", "MultiplayerPlayer")
+        SessionStanding = self.apps.get_model("main", "SessionStanding")
+        user = User.objects.create(username="testuser")
+        session = Session.objects.create()
+        for _ in range(2):
+            game = MultiplayerGame.objects.create(score=301, max_players=2, session=session)
+            winner = MultiplayerPlayer.objects.create(game=game, player=user, rank=1)
+            MultiplayerPlayer.objects.create(game=game, guest_name="Guest", rank=2)
+            game.winner = winner
+            game.save()
+        MultiplayerGame.objects.create(score=301, max_players=2, session=session)
+        SessionStanding.objects.create(session=session, player=user, wins=2)
+
+        apps = self.migrate()
+
+        standings = apps.get_model("main", "SessionStanding").objects.filter(session_id=session.id)
+        self.assertEqual(
+            set(standings.values_list("player_id", "guest_name", "wins", "legs_played")),
+            {(user.id, None, 2, 2), (None, "Guest", 0, 2)},
+        )
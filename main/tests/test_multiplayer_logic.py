@@ -1,4 +1,7 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from main.business_logic.lobby import create_game as start_game
 from main.business_logic.multiplayer_game import (
     get_queue,
     get_turn,
@@ -10,7 +13,9 @@ from main.business_logic.multiplayer_game import (
     get_average_points,
     create_follow_up_game,
     get_wins,
+    get_players_ordered_by_wins,
 )
+from main.business_logic.utils import delete_last_round
 from main.models import MultiplayerGame, MultiplayerRound, MultiplayerPlayer, Session
 from main.utils import MultiplayerGameStatus
 from django.contrib.auth.models import User
@@ -212,6 +217,18 @@ class MultiplayerGameTests(TestCase):
         self.assertEqual(result2, False)
         self.assertEqual(game.game_rounds.last().points, 0)
 
+    def test_left_score_after_delete_last_round(self):
+        """Test the left score is read from the running totals after the last round is deleted."""
+        game = self.create_game(score=301, max_players=2)
+        self.create_players(game, 2)
+        add_round(game, self.get_player(game, 1), 60, True)
+        add_round(game, self.get_player(game, 2), 45, True)
+
+        delete_last_round(game)
+
+        self.assertEqual(get_left_score(game, self.get_player(game, 1)), 241)
+        self.assertEqual(get_left_score(game, self.get_player(game, 2)), 301)
+
     def test_get_average_points(self):
         """Test get_average_points calculation for a player."""
         game = self.create_game(score=100, max_players=1)
@@ -285,6 +302,32 @@ class MultiplayerGameTests(TestCase):
         self.assertEqual(new_player_1.player, original_player_2.player)
         self.assertEqual(new_player_2.player, original_player_1.player)
 
+    def test_create_follow_up_game_query_count(self):
+        """create_follow_up_game needs the same number of queries for 2 and 10 players"""
+        query_counts = []
+        for max_players in (2, 10):
+            game = self.create_game(max_players=max_players, status=MultiplayerGameStatus.FINISHED.value)
+            self.create_players(game, max_players)
+            game = MultiplayerGame.objects.get(id=game.id)
+            with CaptureQueriesContext(connection) as queries:
+                new_game = create_follow_up_game(game)
+            query_counts.append(len(queries))
+            self.assertEqual(new_game.game_players.count(), max_players)
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_start_game_query_count(self):
+        """Starting a game from the lobby needs the same number of queries for 2 and 10 players"""
+        query_counts = []
+        for max_players in (2, 10):
+            game = self.create_game(max_players=max_players, status=MultiplayerGameStatus.WAITING.value)
+            player = MultiplayerPlayer.objects.create(game=game, player=self.user1, rank=1)
+            with CaptureQueriesContext(connection) as queries:
+                start_game(game, {f"{player.id}-rank": str(max_players)})
+            query_counts.append(len(queries))
+            self.assertEqual(self.get_player(game, max_players).player, self.user1)
+            self.assertEqual(game.game_players.filter(player__isnull=True).count(), max_players - 1)
+        self.assertEqual(query_counts[0], query_counts[1])
+
     def test_get_wins_with_null_session(self):
         """Test get_wins returns 0 when session is None."""
         game = self.create_game(score=100, max_players=1)
@@ -525,3 +568,58 @@ class MultiplayerGameTests(TestCase):
         player = self.get_player(game, 1)
         add_round(game, player, 60, False)
         self.assertEqual(game.status, MultiplayerGameStatus.PROGRESS.value)
+
+    def test_get_game_context_query_count(self):
+        """Test get_game_context needs the same number of queries for 1 to 10 players."""
+        session = Session.objects.create()
+        previous_game = self.create_game(score=100, max_players=1, session=session)
+        previous_winner = MultiplayerPlayer.objects.create(
+            game=previous_game, rank=1, player=self.user1
+        )
+        previous_game.winner = previous_winner
+        previous_game.save()
+
+        for num_players in range(1, 11):
+            game = self.create_game(score=501, max_players=num_players, session=session)
+            MultiplayerPlayer.objects.create(game=game, rank=1, player=self.user1)
+            for rank in range(2, num_players + 1):
+                MultiplayerPlayer.objects.create(
+                    game=game, rank=rank, guest_name=f"Guest {rank}"
+                )
+            for rank in range(1, num_players + 1):
+                self.add_round_for_player(game, rank, 60)
+
+            # players, last round, session wins and keyboard
+            with self.assertNumQueries(4):
+                context = get_game_context(game)
+
+            self.assertEqual(len(context["queue"]), num_players - 1)
+            self.assertEqual(context["turn"].rank, 1)
+            self.assertEqual(context["left_score"], 441)
+            self.assertEqual(context["wins"], 1)
+            self.assertEqual(context["average_points"], 60)
+
+    def test_get_players_ordered_by_wins(self):
+        """Test the session leaderboard needs the same number of queries for any session length."""
+        session = Session.objects.create()
+        current_game = None
+        for games in (3, 30):
+            while session.games.filter(winner__isnull=False).count() < games:
+                game = self.create_game(max_players=2, session=session)
+                user_player = MultiplayerPlayer.objects.create(game=game, rank=1, player=self.user1)
+                guest_player = MultiplayerPlayer.objects.create(game=game, rank=2, guest_name="Guest")
+                game.winner = user_player if session.games.count() % 3 else guest_player
+                game.status = MultiplayerGameStatus.FINISHED.value
+                game.save()
+                current_game = game
+            # a follow up game without a winner yet
+            create_follow_up_game(current_game)
+
+            # grouped wins and players of the game
+            with self.assertNumQueries(2):
+                players = get_players_ordered_by_wins(session, current_game)
+
+            user_wins = get_wins(session, current_game.game_players.get(rank=1))
+            guest_wins = get_wins(session, current_game.game_players.get(rank=2))
+            self.assertEqual(players, [("testuser1", user_wins), ("Guest", guest_wins)])
+            self.assertEqual(user_wins + guest_wins, games)
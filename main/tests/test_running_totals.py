@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from main.business_logic import multiplayer_game, singleplayer_game
+from main.business_logic.utils import delete_last_round, set_needed_darts
+from main.models import Game, MultiplayerGame, MultiplayerPlayer, Round
+from main.utils import MultiplayerGameStatus
+
+
+class RunningTotalsTests(TestCase):
+
+    def setUp(self):
+        """Set up a singleplayer and a multiplayer game for each test method."""
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.game = Game.objects.create(score=121, rounds=5, player=self.user)
+        self.multiplayer_game = MultiplayerGame.objects.create(
+            score=301,
+            creator=self.user,
+            max_players=1,
+            status=MultiplayerGameStatus.PROGRESS.value,
+        )
+        self.player = MultiplayerPlayer.objects.create(
+            game=self.multiplayer_game, rank=1, player=self.user
+        )
+
+    def assertTotals(self, instance, points_scored, rounds_played, darts_thrown):
+        instance.refresh_from_db()
+        self.assertEqual(
+            (instance.points_scored, instance.rounds_played, instance.darts_thrown),
+            (points_scored, rounds_played, darts_thrown),
+        )
+
+    def test_add_and_delete_round(self):
+        """Test adding and deleting rounds keeps the totals in sync."""
+        singleplayer_game.add_round(self.game, 60, True)
+        singleplayer_game.add_round(self.game, 41, True)
+        multiplayer_game.add_round(self.multiplayer_game, self.player, 100, True)
+        self.assertTotals(self.game, 101, 2, 6)
+        self.assertTotals(self.player, 100, 1, 3)
+
+        delete_last_round(self.game)
+        delete_last_round(self.multiplayer_game)
+        self.assertTotals(self.game, 60, 1, 3)
+        self.assertTotals(self.player, 0, 0, 0)
+
+    def test_set_needed_darts(self):
+        """Test correcting the darts of the checkout round updates the darts total."""
+        singleplayer_game.add_round(self.game, 81, True)
+        singleplayer_game.add_round(self.game, 40, True)
+
+        set_needed_darts(self.game, 1)
+
+        self.assertTotals(self.game, 121, 2, 4)
+
+    def test_game_delete_does_not_update_totals(self):
+        """Test deleting a game with rounds does not update the deleted game row by row."""
+        singleplayer_game.add_round(self.game, 60, True)
+        singleplayer_game.add_round(self.game, 20, True)
+
+        # select game, select rounds, delete rounds, delete game
+        with self.assertNumQueries(4):
+            Game.objects.filter(id=self.game.id).delete()
+
+    def test_rebuild_and_verify_command(self):
+        """Test the management command finds and repairs wrong totals."""
+        singleplayer_game.add_round(self.game, 60, True)
+        Game.objects.filter(id=self.game.id).update(points_scored=0)
+        Round.objects.bulk_create([Round(game=self.game, points=20)])
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_running_totals", "--verify", stdout=StringIO())
+
+        call_command("rebuild_running_totals", stdout=StringIO())
+
+        self.assertTotals(self.game, 80, 2, 6)
+        call_command("rebuild_running_totals", "--verify", stdout=StringIO())
@@ -0,0 +1,61 @@
+from itertools import product
+
+from django.test import TestCase
+
+from main.business_logic import score_tables
+from main.business_logic.utils import get_points_of_round
+from main.constants import IMPOSSIBLE_POINTS, checkout_map
+
+SINGLES = [0, *range(1, 21), 25]
+DOUBLES = [*(number * 2 for number in range(1, 21)), 50]
+TREBLES = [number * 3 for number in range(1, 21)]
+DARTS = SINGLES + DOUBLES + TREBLES
+
+
+def brute_force_reachable(darts: int) -> set[int]:
+    return {sum(throws) for throws in product(DARTS, repeat=darts)}
+
+
+def brute_force_finishable(darts: int) -> set[int]:
+    return {sum(throws) + double for throws in product(DARTS, repeat=darts - 1) for double in DOUBLES}
+
+
+class ScoreTablesTests(TestCase):
+
+    def test_tables_match_brute_force(self):
+        """Test the tables equal every combination of darts (a miss scores 0)."""
+        for darts in (1, 2, 3):
+            reachable = brute_force_reachable(darts)
+            finishable = brute_force_finishable(darts)
+            for points in range(0, 181):
+                self.assertEqual(score_tables.is_reachable(points, darts), points in reachable, (points, darts))
+                self.assertEqual(score_tables.is_finishable(points, darts), points in finishable, (points, darts))
+
+    def test_three_darts_match_constants(self):
+        """Test three darts match IMPOSSIBLE_POINTS and the checkouts of checkout_map."""
+        for points in range(0, 181):
+            self.assertEqual(score_tables.is_reachable(points), points not in IMPOSSIBLE_POINTS)
+            self.assertEqual(score_tables.is_finishable(points), points in checkout_map)
+
+    def test_get_points_of_round_for_all_darts(self):
+        """Test every score and dart count is only accepted if the darts can score it."""
+        for darts, points in product((1, 2, 3), range(0, 181)):
+            with self.subTest(darts=darts, points=points):
+                # no checkout, enough points left
+                expected = points if score_tables.is_reachable(points, darts) else 0
+                self.assertEqual(get_points_of_round(501, points, True, darts), expected)
+                # checkout
+                expected = points if score_tables.is_finishable(points, darts) else 0
+                self.assertEqual(get_points_of_round(points, points, True, darts), expected)
+                self.assertEqual(get_points_of_round(points, points, False, darts), 0)
+
+    def test_examples(self):
+        """Test typical scores that need more darts than were thrown."""
+        self.assertEqual(get_points_of_round(501, 100, True, 1), 0)
+        self.assertEqual(get_points_of_round(501, 60, True, 1), 60)
+        self.assertEqual(get_points_of_round(501, 120, True, 2), 120)
+        self.assertEqual(get_points_of_round(501, 121, True, 2), 0)
+        self.assertEqual(get_points_of_round(100, 100, True, 2), 100)
+        self.assertEqual(get_points_of_round(103, 103, True, 2), 0)
+        self.assertEqual(get_points_of_round(103, 103, True, 3), 103)
+        self.assertEqual(get_points_of_round(50, 50, True, 1), 50)
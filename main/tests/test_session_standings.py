@@ -0,0 +1,127 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from main.business_logic.multiplayer_game import add_round, get_wins
+from main.models import MultiplayerGame, MultiplayerPlayer, Session, SessionStanding
+from main.utils import MultiplayerGameStatus
+
+
+class SessionStandingTests(TestCase):
+
+    def setUp(self):
+        """A session with a user and a guest"""
+        self.user = User.objects.create_user(username="testuser1", password="testpass")
+        self.session = Session.objects.create(first_to=3)
+
+    def create_game(self):
+        """Helper method to create a running two player game of the session."""
+        game = MultiplayerGame.objects.create(
+            score=60,
+            max_players=2,
+            status=MultiplayerGameStatus.PROGRESS.value,
+            session=self.session,
+        )
+        user = MultiplayerPlayer.objects.create(game=game, player=self.user, rank=1)
+        guest = MultiplayerPlayer.objects.create(game=game, guest_name="Guest", rank=2)
+        return game, user, guest
+
+    def get_standings(self) -> dict:
+        """Helper method to get (wins, legs played) by username or guest name."""
+        return {
+            standing.player.username if standing.player else standing.guest_name: (
+                standing.wins,
+                standing.legs_played,
+            )
+            for standing in self.session.standings.select_related("player")
+        }
+
+    def test_finishing_a_game_updates_the_standings(self):
+        """The winner gets a win and every player a leg when add_round finishes the game"""
+        game, user, guest = self.create_game()
+        add_round(game, user, 60, True)
+        self.assertEqual(self.get_standings(), {"testuser1": (1, 1), "Guest": (0, 1)})
+
+        game, user, guest = self.create_game()
+        add_round(game, user, 20, True)
+        add_round(game, guest, 60, True)
+        self.assertEqual(self.get_standings(), {"testuser1": (1, 2), "Guest": (1, 2)})
+
+    def test_finished_game_increments_without_recount(self):
+        """The winning round updates the rows of its players instead of recounting the session"""
+        for _ in range(2):
+            game, user, _ = self.create_game()
+            add_round(game, user, 60, True)
+        game, user, _ = self.create_game()
+        with CaptureQueriesContext(connection) as queries:
+            add_round(game, user, 60, True)
+        standing_queries = [query["sql"] for query in queries if "main_sessionstanding" in query["sql"]]
+        self.assertEqual(len(standing_queries), 2)
+        self.assertTrue(all(sql.startswith("UPDATE") for sql in standing_queries))
+        self.assertEqual(self.get_standings(), {"testuser1": (3, 3), "Guest": (0, 3)})
+
+    def test_saving_a_game_does_not_touch_the_standings(self):
+        """Saving a finished game again neither counts it again nor queries the standings"""
+        game, user, _ = self.create_game()
+        add_round(game, user, 60, True)
+        loaded_game = MultiplayerGame.objects.get(id=game.id)
+        with CaptureQueriesContext(connection) as queries:
+            game.save()
+            loaded_game.save()
+        self.assertFalse([query for query in queries if "main_sessionstanding" in query["sql"]])
+        self.assertFalse([query for query in queries if query["sql"].startswith('SELECT "main_multiplayergame"')])
+        self.assertEqual(self.get_standings(), {"testuser1": (1, 1), "Guest": (0, 1)})
+
+    def test_changing_the_winner_moves_the_win(self):
+        """A winner set on a finished game replaces the win of the old one"""
+        game, user, guest = self.create_game()
+        add_round(game, user, 60, True)
+        game = MultiplayerGame.objects.get(id=game.id)
+        game.winner = guest
+        game.save()
+        self.assertEqual(self.get_standings(), {"testuser1": (0, 1), "Guest": (1, 1)})
+
+    def test_deleted_user_becomes_a_deleted_guest(self):
+        """The standings of a deleted account move to the guest its players are renamed to"""
+        game, user, _ = self.create_game()
+        add_round(game, user, 60, True)
+        self.client.force_login(self.user)
+        self.client.post(reverse("delete_account"))
+        self.assertEqual(self.get_standings(), {"deleted": (1, 1), "Guest": (0, 1)})
+
+    def test_running_games_do_not_count(self):
+        """Games without a winner neither add wins nor legs"""
+        game, user, _ = self.create_game()
+        add_round(game, user, 20, True)
+        self.assertEqual(self.get_standings(), {})
+
+    def test_get_wins_reads_one_row(self):
+        """get_wins is a single lookup regardless of the number of games"""
+        for _ in range(3):
+            game, user, guest = self.create_game()
+            add_round(game, user, 60, True)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_wins(self.session, user), 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_wins(self.session, guest), 0)
+
+    def test_deleting_a_game_removes_its_win(self):
+        """Deleting a finished game refreshes the standings after the commit"""
+        game, user, _ = self.create_game()
+        add_round(game, user, 60, True)
+        with self.captureOnCommitCallbacks(execute=True):
+            game.delete()
+        self.assertEqual(self.get_standings(), {})
+
+    def test_rebuild_session_standings_command(self):
+        """The command restores standings that are out of date"""
+        game, user, _ = self.create_game()
+        add_round(game, user, 60, True)
+        SessionStanding.objects.all().delete()
+        call_command("rebuild_session_standings", stdout=StringIO())
+        self.assertEqual(self.get_standings(), {"testuser1": (1, 1), "Guest": (0, 1)})
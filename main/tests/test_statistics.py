@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from main.business_logic.statistics import (
+    ScoreHistogram,
+    get_avg_per_week_multiplayer,
+    get_multiplayer_statistics,
+    get_score_histogram,
+    get_singleplayer_statistics,
+)
+from main.models import Game, MultiplayerGame, MultiplayerPlayer, MultiplayerRound, Round
+from main.utils import GameStatus, MultiplayerGameStatus
+
+
+class ScoreHistogramTests(TestCase):
+
+    def setUp(self):
+        """Set up a finished game with rounds in every band."""
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.game = Game.objects.create(score=501, rounds=20, player=self.user, status=GameStatus.WON.value)
+        for points, needed_darts in [(26, 3), (26, 3), (60, 3), (85, 3), (100, 3), (140, 3), (180, 3), (41, 2), (0, 3)]:
+            Round.objects.create(game=self.game, points=points, needed_darts=needed_darts)
+
+    def test_histogram_is_one_query(self):
+        """The histogram counts rounds per points and per needed darts in one query"""
+        with self.assertNumQueries(1):
+            histogram = get_score_histogram(Round.objects.filter(game=self.game))
+
+        self.assertEqual(len(histogram.points), 181)
+        self.assertEqual(histogram.points[26], 2)
+        self.assertEqual(histogram.darts, (0, 0, 1, 8))
+        self.assertEqual(histogram.total_rounds, 9)
+        self.assertEqual(histogram.total_points, 658)
+        self.assertEqual(histogram.total_darts, 26)
+        self.assertEqual(histogram.count(100), 3)
+
+    def test_statistics_are_derived_from_the_histogram(self):
+        """Totals and bands of the statistics come from the histogram"""
+        statistics = get_singleplayer_statistics(Game.objects.filter(player=self.user))
+
+        self.assertEqual((statistics.wins, statistics.losses, statistics.total_games), (1, 0, 1))
+        self.assertEqual(statistics.total_points, 658)
+        self.assertEqual(statistics.total_rounds, 9)
+        self.assertEqual(statistics.total_darts_needed, 26)
+        self.assertEqual(
+            (statistics.sixty_plus, statistics.eighty_plus, statistics.hundred_plus),
+            (1, 1, 1),
+        )
+        self.assertEqual((statistics.hundred_forty_plus, statistics.hundred_eighty, statistics.twenty_six), (1, 1, 2))
+
+    def test_histograms_add_up(self):
+        """Histograms of parts add up to the histogram of the whole"""
+        rounds = Round.objects.filter(game=self.game)
+        low = get_score_histogram(rounds.filter(points__lt=90))
+        high = get_score_histogram(rounds.filter(points__gte=90))
+        self.assertEqual(low + high, get_score_histogram(rounds))
+        self.assertEqual(ScoreHistogram.from_lists([], []), ScoreHistogram())
+
+
+class MultiplayerStatisticsTests(TestCase):
+
+    def setUp(self):
+        """Set up a finished ten player game in which the opponents throw better."""
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.game = MultiplayerGame.objects.create(
+            score=501, max_players=10, status=MultiplayerGameStatus.FINISHED.value
+        )
+        for rank in range(1, 11):
+            user = self.user if rank == 1 else User.objects.create_user(username=f"opponent{rank}")
+            player = MultiplayerPlayer.objects.create(game=self.game, rank=rank, player=user)
+            for _ in range(3):
+                MultiplayerRound.objects.create(
+                    game=self.game, player=player, points=60 if rank == 1 else 180, needed_darts=3
+                )
+
+    def test_only_rounds_of_the_user_count(self):
+        """Bands, averages and darts of the user leave out the rounds of the opponents"""
+        statistics = get_multiplayer_statistics(MultiplayerGame.objects.all(), self.user)
+
+        self.assertEqual(statistics.total_rounds, 3)
+        self.assertEqual(statistics.total_darts_needed, 9)
+        self.assertEqual(statistics.average_points, 60)
+        self.assertEqual(statistics.sixty_plus, 3)
+        self.assertEqual(statistics.hundred_eighty, 0)
+        self.assertEqual(
+            get_avg_per_week_multiplayer(MultiplayerGame.objects.all(), self.user)[0]["y"], 60
+        )
@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import TestCase
+from django.urls import reverse
+
+from main.business_logic import singleplayer_game, statistics_cache
+from main.business_logic.statistics import get_statistics
+from main.business_logic.utils import delete_last_round
+from main.models import Game, MultiplayerGame, Round
+
+
+class StatisticsCacheTests(TestCase):
+
+    def setUp(self):
+        """Set up a user with a running game and an empty cache for each test method."""
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.game = Game.objects.create(score=121, rounds=5, player=self.user)
+        Round.objects.create(game=self.game, points=60, needed_darts=3)
+        self.digest = statistics_cache.get_params_digest(QueryDict())
+
+    def get_statistics(self):
+        return statistics_cache.get_or_compute(
+            self.user.id,
+            "statistics",
+            self.digest,
+            lambda: get_statistics(
+                Game.objects.filter(player=self.user),
+                MultiplayerGame.objects.filter(game_players__player=self.user),
+                self.user,
+            ),
+        )
+
+    def test_repeat_visit_is_cache_hit(self):
+        """Test the statistics page is only computed on the first visit."""
+        self.client.force_login(self.user)
+
+        self.client.get(reverse("statistics"))
+        self.client.get(reverse("statistics"))
+
+        counters = statistics_cache.get_counters()
+        # statistics and both week averages
+        self.assertEqual(counters["misses"], 3)
+        self.assertEqual(counters["hits"], 3)
+        self.assertEqual(counters["hit_rate"], 50.0)
+
+    def test_params_digest_ignores_order(self):
+        """Test the same filter in another order uses the same cache entry."""
+        self.assertEqual(
+            statistics_cache.get_params_digest(QueryDict("score=121&rounds=5")),
+            statistics_cache.get_params_digest(QueryDict("rounds=5&score=121")),
+        )
+        self.assertNotEqual(
+            statistics_cache.get_params_digest(QueryDict("score=121")),
+            statistics_cache.get_params_digest(QueryDict("score=81")),
+        )
+
+    def test_finishing_game_invalidates(self):
+        """Test finishing a game drops the cached statistics of its player."""
+        self.assertEqual(self.get_statistics().single_player.total_games, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            singleplayer_game.add_round(self.game, 61, True)
+
+        self.assertEqual(self.get_statistics().single_player.total_games, 1)
+
+    def test_running_game_keeps_cache(self):
+        """Test rounds of a running game do not invalidate the cached statistics."""
+        self.get_statistics()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            singleplayer_game.add_round(self.game, 20, True)
+        self.get_statistics()
+
+        self.assertEqual(statistics_cache.get_counters()["hits"], 1)
+
+    def test_deleting_round_invalidates(self):
+        """Test deleting a round of a finished game drops the cached statistics."""
+        with self.captureOnCommitCallbacks(execute=True):
+            singleplayer_game.add_round(self.game, 61, True)
+        self.assertEqual(self.get_statistics().single_player.total_rounds, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_last_round(self.game)
+
+        self.assertEqual(self.get_statistics().single_player.total_rounds, 1)
@@ -0,0 +1,173 @@
+from io import StringIO
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+
+from main.business_logic import multiplayer_game, singleplayer_game
+from main.business_logic.statistics import (
+    get_avg_per_week_multiplayer,
+    get_avg_per_week_singleplayer,
+    get_multiplayer_histogram,
+    get_singleplayer_histogram,
+    get_statistics,
+)
+from main.business_logic.statistics_rollup import (
+    _Period,
+    ensure_rollups,
+    get_rollup_avg_per_week,
+    get_rollup_histogram,
+    get_rollup_statistics,
+)
+from main.business_logic.utils import delete_last_round
+from main.models import (
+    Game,
+    MultiplayerGame,
+    MultiplayerPlayer,
+    Round,
+    StatisticsRollup,
+    StatisticsRollupCoverage,
+)
+from main.utils import GameStatus, MultiplayerGameStatus, StatisticsMode
+from main.views.statistics import get_filters, get_rollup_period
+
+# a wednesday, so the ranges below start and end inside weeks as well as on week borders
+START = date(2025, 1, 1)
+PERIODS = [
+    (None, None),
+    (date(2025, 1, 6), date(2025, 1, 19)),
+    (date(2025, 1, 3), date(2025, 1, 22)),
+    (date(2025, 1, 8), date(2025, 1, 9)),
+    (date(2025, 1, 13), None),
+    (None, date(2025, 1, 15)),
+]
+
+
+class StatisticsRollupTests(TestCase):
+
+    def setUp(self):
+        """Set up finished and running games spread over several weeks."""
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.other = User.objects.create_user(username="otheruser", password="testpass")
+        for day in range(0, 28, 2):
+            game = Game.objects.create(
+                score=121,
+                rounds=5,
+                player=self.user,
+                date=START + timedelta(days=day),
+                status=[GameStatus.WON, GameStatus.LOST, GameStatus.PROGRESS][day % 3].value,
+                tried_doubles=day % 4,
+            )
+            for points in (26, 60 + day, 100, 180 - day):
+                Round.objects.create(game=game, points=points, needed_darts=3)
+        for day in range(1, 28, 3):
+            game = MultiplayerGame.objects.create(
+                score=301,
+                creator=self.user,
+                max_players=2,
+                date=START + timedelta(days=day),
+                status=MultiplayerGameStatus.FINISHED.value if day % 2 else MultiplayerGameStatus.PROGRESS.value,
+            )
+            player = MultiplayerPlayer.objects.create(game=game, rank=1, player=self.user, tried_doubles=day % 3)
+            other = MultiplayerPlayer.objects.create(game=game, rank=2, player=self.other)
+            for points in (45, 81 + day, 140):
+                game.game_rounds.create(player=player, points=points, needed_darts=3)
+                game.game_rounds.create(player=other, points=points - 20, needed_darts=3)
+            if game.status == MultiplayerGameStatus.FINISHED.value:
+                game.winner = player if day % 4 else other
+                game.save()
+
+    def filtered_games(self, start, end):
+        games = Game.objects.filter(player=self.user)
+        multiplayer_games = MultiplayerGame.objects.filter(game_players__player=self.user)
+        if start:
+            games, multiplayer_games = games.filter(date__gte=start), multiplayer_games.filter(date__gte=start)
+        if end:
+            games, multiplayer_games = games.filter(date__lte=end), multiplayer_games.filter(date__lte=end)
+        return games, multiplayer_games
+
+    def assertMatchesRaw(self):
+        for start, end in PERIODS:
+            with self.subTest(start=start, end=end):
+                games, multiplayer_games = self.filtered_games(start, end)
+                self.assertEqual(
+                    get_rollup_statistics(self.user.id, start, end),
+                    get_statistics(games, multiplayer_games, self.user),
+                )
+                self.assertEqual(
+                    get_rollup_avg_per_week(self.user.id, StatisticsMode.SINGLEPLAYER, start, end),
+                    get_avg_per_week_singleplayer(games),
+                )
+                self.assertEqual(
+                    get_rollup_avg_per_week(self.user.id, StatisticsMode.MULTIPLAYER, start, end),
+                    get_avg_per_week_multiplayer(multiplayer_games, self.user),
+                )
+                self.assertEqual(
+                    get_rollup_histogram(self.user.id, StatisticsMode.SINGLEPLAYER, start, end),
+                    get_singleplayer_histogram(games),
+                )
+                self.assertEqual(
+                    get_rollup_histogram(self.user.id, StatisticsMode.MULTIPLAYER, start, end),
+                    get_multiplayer_histogram(multiplayer_games, self.user),
+                )
+
+    def test_rollups_match_raw_statistics(self):
+        """Test the rollup statistics equal the raw statistics for full and partial weeks."""
+        self.assertMatchesRaw()
+        self.assertTrue(StatisticsRollupCoverage.objects.filter(user=self.user).exists())
+        self.assertTrue(StatisticsRollup.objects.filter(user=self.user).exists())
+
+    def test_filtered_full_weeks_come_from_rollups(self):
+        """Test a date filter of the form reads the weeks it covers completely from the rollups."""
+        request = RequestFactory().get("/statistics/", {"date_min": "2025-01-06", "date_max": "2025-01-19"})
+        request.user = self.user
+        game_filter, games, multiplayer_games = get_filters(request)
+        period = get_rollup_period(game_filter)
+        self.assertEqual(period, (date(2025, 1, 6), date(2025, 1, 19)))
+
+        ensure_rollups(self.user.id)
+        rollups = _Period(self.user.id, StatisticsMode.SINGLEPLAYER, *period)
+        self.assertEqual(
+            list(rollups.rollups.values_list("week", flat=True).order_by("week")),
+            [date(2025, 1, 6), date(2025, 1, 13)],
+        )
+        self.assertFalse(rollups.uncovered_games.exclude(status=GameStatus.PROGRESS.value).exists())
+        self.assertEqual(
+            get_rollup_statistics(self.user.id, *period), get_statistics(games, multiplayer_games, self.user)
+        )
+
+    def test_rollups_follow_finished_games(self):
+        """Test finishing a game and deleting its last round refresh the rollups."""
+        get_rollup_statistics(self.user.id)
+        game = Game.objects.filter(player=self.user, status=GameStatus.PROGRESS.value).first()
+        singleplayer_game.add_round(game, 121, True)
+        self.assertNotEqual(game.status, GameStatus.PROGRESS.value)
+        self.assertMatchesRaw()
+
+        delete_last_round(game)
+        self.assertMatchesRaw()
+
+    def test_rollups_follow_finished_multiplayer_games(self):
+        """Test a won multiplayer game is added to the rollups of all its players."""
+        get_rollup_statistics(self.user.id)
+        get_rollup_statistics(self.other.id)
+        game = MultiplayerGame.objects.filter(status=MultiplayerGameStatus.PROGRESS.value).first()
+        player = game.game_players.get(player=self.user)
+        self.assertTrue(multiplayer_game.add_round(game, player, game.score - player.points_scored, True))
+        game.refresh_from_db()
+        self.assertEqual(game.status, MultiplayerGameStatus.FINISHED.value)
+        self.assertMatchesRaw()
+        self.assertEqual(
+            get_rollup_statistics(self.other.id),
+            get_statistics(Game.objects.none(), MultiplayerGame.objects.filter(game_players__player=self.other), self.other),
+        )
+
+    def test_rebuild_command(self):
+        """Test the rebuild command recreates stale rollups."""
+        get_rollup_statistics(self.user.id)
+        StatisticsRollup.objects.filter(user=self.user).update(total_points=0)
+
+        call_command("rebuild_statistics_rollups", user=self.user.username, stdout=StringIO())
+
+        self.assertMatchesRaw()
@@ -1,7 +1,8 @@
 from django.urls import path
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 
-from main.views.api import SetSinglePlayerCheckoutMissView, SetMultiplayerCheckoutMissView
+from main.views.api import SetSinglePlayerCheckoutMissView, SetMultiplayerCheckoutMissView, CheckoutTableView
 
 from .views import (
     HomeView,
@@ -9,9 +10,12 @@ from .views import (
     GameView,
     ResultView,
     StatisticsView,
+    StatisticsHistoryView,
+    StatisticsCacheView,
     MultiplayerStartGame,
     Lobby,
     MultiplayerGameView,
+    GameUpdateCountersView,
     MultiplayerGameOverviewView,
     DeleteRoundView,
     SignUpView,
@@ -28,9 +32,20 @@ home_urlpatterns = [
         login_required(StatisticsView.as_view()),
         name="statistics",
     ),
+    path(
+        "statistics/history/<str:mode>/",
+        login_required(StatisticsHistoryView.as_view()),
+        name="statistics_history",
+    ),
+    path(
+        "statistics/cache/",
+        staff_member_required(StatisticsCacheView.as_view()),
+        name="statistics_cache",
+    ),
 ]
 help_urlpatterns = [
     path("checkout-hint/<int:left_score>/<int:throws_left>/", login_required(CheckoutHintView.as_view()), name="checkout_hint"),
+    path("checkout-table/<str:version>.json", CheckoutTableView.as_view(), name="checkout_table"),
     path("set-needed-darts/singleplayer/<uuid:game_id>/<int:needed_darts>/", login_required(SetNeededDartsView.as_view()), name="set-needed-darts-singleplayer"),
     path("set-checkout-misses/singleplayer/<uuid:game_id>/<str:operator>/", login_required(SetSinglePlayerCheckoutMissView.as_view()), name="set-checkout-misses-singleplayer"),
     path("set-checkout-misses/multiplayer/<int:player_id>/<str:operator>/", login_required(SetMultiplayerCheckoutMissView.as_view()), name="set-checkout-misses-multiplayer"),
@@ -77,6 +92,11 @@ multiplayer_urlpatterns = [
         login_required(MultiplayerGameOverviewView.as_view()),
         name="multiplayer_game_overview",
     ),
+    path(
+        "multiplayer/updates/",
+        staff_member_required(GameUpdateCountersView.as_view()),
+        name="multiplayer_updates",
+    ),
 ]
 
 urlpatterns = home_urlpatterns + single_player_urlpatterns + multiplayer_urlpatterns + help_urlpatterns
@@ -17,6 +17,11 @@ class GameStatus(enum.Enum):
     LOST = 2
 
 
+class StatisticsMode(enum.Enum):
+    SINGLEPLAYER = 0
+    MULTIPLAYER = 1
+
+
 GAME_STATUS_CHOICES = [
     (GameStatus.PROGRESS.value, GameStatus.PROGRESS.name),
     (GameStatus.WON.value, GameStatus.WON.name),
@@ -29,6 +34,11 @@ MULTIPLAYER_GAME_STATUS_CHOICES = [
     (MultiplayerGameStatus.FINISHED.value, MultiplayerGameStatus.FINISHED.name),
 ]
 
+STATISTICS_MODE_CHOICES = [
+    (StatisticsMode.SINGLEPLAYER.value, StatisticsMode.SINGLEPLAYER.name),
+    (StatisticsMode.MULTIPLAYER.value, StatisticsMode.MULTIPLAYER.name),
+]
+
 
 def get_random_name(names: list):
     return random.choice(names)
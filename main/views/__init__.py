@@ -4,10 +4,10 @@ from .policy import Policy
 from .single_player.start_game import StartGame
 from .single_player.game import GameView
 from .single_player.result import ResultView
-from .statistics import StatisticsView
+from .statistics import StatisticsView, StatisticsHistoryView, StatisticsCacheView
 from .multiplayer.start_game import StartGame as MultiplayerStartGame
 from .multiplayer.lobby import Lobby
-from .multiplayer.game import MultiplayerGameView
+from .multiplayer.game import MultiplayerGameView, GameUpdateCountersView
 from .multiplayer.game_overview import MultiplayerGameOverviewView
 from .single_player.delete_round import DeleteRoundView
 from .auth import SignUpView, DeleteAccountView
@@ -21,6 +21,7 @@ __all__ = [
     MultiplayerStartGame.__name__,
     Lobby.__name__,
     MultiplayerGameView.__name__,
+    GameUpdateCountersView.__name__,
     MultiplayerGameOverviewView.__name__,
     DeleteRoundView.__name__,
     SignUpView.__name__,
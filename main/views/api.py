@@ -1,28 +1,50 @@
-from django.shortcuts import render, get_object_or_404
+from django.shortcuts import render, get_object_or_404, redirect
 from django.template.context_processors import request
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag
 from django.http import JsonResponse
-from main.business_logic.utils import get_checkout_suggestion
+from main.business_logic import checkout_solver
+from main.business_logic.statistics_rollup import refresh_rollups_for_game
+from main.business_logic.utils import get_checkout_suggestion, set_needed_darts, is_finished
 from main.models import Game, MultiplayerGame, MultiplayerPlayer
 import uuid
 from django.urls import reverse
 
+def checkout_table_etag(request, *args, **kwargs) -> str:
+    return checkout_solver.TABLE_VERSION
+
+
+@method_decorator(etag(checkout_table_etag), name="get")
+@method_decorator(cache_control(private=True, max_age=60 * 60 * 24), name="get")
 class CheckoutHintView(View):
+    """single suggestion, fallback for clients without the checkout table"""
 
     def get(self, request, left_score: int, throws_left: int) -> JsonResponse:
         checkout_suggestion = get_checkout_suggestion(left_score, throws_left)
         return JsonResponse({"checkout_suggestion": checkout_suggestion})
 
+
+@method_decorator(cache_control(public=True, max_age=60 * 60 * 24 * 365, immutable=True), name="get")
+class CheckoutTableView(View):
+    """all suggestions by darts left and score, the url contains the version of the table"""
+
+    def get(self, request, version: str) -> JsonResponse:
+        if version != checkout_solver.TABLE_VERSION:
+            return redirect("checkout_table", version=checkout_solver.TABLE_VERSION)
+        return JsonResponse(
+            {"version": checkout_solver.TABLE_VERSION, "suggestions": checkout_solver.SUGGESTIONS}
+        )
+
 class SetNeededDartsView(View):
     def post(self, request, game_id: uuid.UUID, needed_darts: int):
         game = Game.objects.filter(id=game_id).first() or MultiplayerGame.objects.filter(id=game_id).first()
         if not game:
             raise ValueError("game not found")
-        last_round = game.game_rounds.last()
         if needed_darts > 3 or needed_darts < 1:
             raise ValueError("only 1 - 3 darts are valid")
-        last_round.needed_darts = needed_darts
-        last_round.save()
+        set_needed_darts(game, needed_darts)
         return render(request, 'partials/needed_darts_card.html', context={"needed_darts": needed_darts, "game": game})
 
 
@@ -33,7 +55,9 @@ class SetSinglePlayerCheckoutMissView(View):
             game.tried_doubles += 1
         elif operator == "minus" and game.tried_doubles > 0:
             game.tried_doubles -= 1
-        game.save()
+        game.save(update_fields=["tried_doubles"])
+        if is_finished(game):
+            refresh_rollups_for_game(game)
         return render(
             request,
             'single_player/tried_doubles.html',
@@ -50,7 +74,9 @@ class SetMultiplayerCheckoutMissView(View):
             player.tried_doubles += 1
         elif operator == "minus" and player.tried_doubles > 0:
             player.tried_doubles -= 1
-        player.save()
+        player.save(update_fields=["tried_doubles"])
+        if player.game.is_finished:
+            refresh_rollups_for_game(player.game)
         return render(
             request,
             'multiplayer/game/partials/tried_doubles.html',
@@ -7,7 +7,8 @@ from django.db import transaction, connection
 from django.shortcuts import render, redirect
 from django.views import View
 
-from main.models import Game, MultiplayerGame, MultiplayerPlayer, PreferredKeyBoard
+from main.business_logic.session_standings import move_user_to_guest
+from main.models import Game, MultiplayerGame, PreferredKeyBoard
 
 
 class SignUpView(FormView):
@@ -30,7 +31,7 @@ class DeleteAccountView(LoginRequiredMixin, View):
     def post(self, request, *args, **kwargs):
         user = request.user
         with transaction.atomic():
-            MultiplayerPlayer.objects.filter(player=user).update(player=None, guest_name="deleted")
+            move_user_to_guest(user.id, "deleted")
             PreferredKeyBoard.objects.filter(player=user).delete()
             Game.objects.filter(player=user).delete()
             user.delete()
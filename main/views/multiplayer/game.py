@@ -1,7 +1,10 @@
 from django import views
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
+from django.http import JsonResponse
 from django.urls import reverse_lazy
+from main.consumers import game_actor
 from main.models import MultiplayerGame
 from main.business_logic.multiplayer_game import get_game_context, get_ending_context
 from main.utils import MultiplayerGameStatus
@@ -32,4 +35,10 @@ class MultiplayerGameView(views.View):
         context = get_game_context(game)
         keyboard = request.session.get("keyboard", 0)
         context["keyboard"] = keyboard
+        context["socket_protocol"] = settings.GAME_SOCKET_PROTOCOL
         return render(request, "multiplayer/game/game.html", context=context)
+
+
+class GameUpdateCountersView(views.View):
+    def get(self, request):
+        return JsonResponse(game_actor.get_counters())
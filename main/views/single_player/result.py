@@ -3,6 +3,7 @@ from django.db.models import Q
 from django.shortcuts import get_object_or_404, render, redirect
 from django.urls import reverse_lazy
 from django.utils import timezone
+from main.business_logic.statistics_rollup import refresh_rollups_for_game, week_of
 from main.models import Game
 from main.utils import GameStatus
 
@@ -11,12 +12,13 @@ class ResultView(views.View):
     def get(self, request, game_id):
         game = get_object_or_404(Game, id=game_id)
         if game.date != timezone.now():
+            previous_date = game.date
             game.date = timezone.now()
-            game.save()
-        rounds = game.game_rounds.all()
-
-        total_points = sum(rounds.values_list("points", flat=True))
-        round_count = rounds.count()
+            game.save(update_fields=["date"])
+            if game.status != GameStatus.PROGRESS.value and week_of(previous_date) != week_of(game.date):
+                refresh_rollups_for_game(game, previous_date)
+        total_points = game.points_scored
+        round_count = game.rounds_played
         score_difference = game.score - total_points
 
         games_today = Game.objects.filter(
@@ -1,56 +1,163 @@
 import json
 
 from django import views
+from django.db.models import QuerySet
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render
 
 from main.business_logic.statistics import (
     get_statistics, get_avg_per_week_singleplayer, get_avg_per_week_multiplayer,
 )
+from main.business_logic import filter_choices, statistics_cache
+from main.business_logic.game_history import HistoryPage, get_multiplayer_page, get_singleplayer_page
+from main.business_logic.concurrent_queries import run_concurrently
+from main.business_logic.statistics_rollup import (
+    ensure_rollups, get_rollup_statistics, get_rollup_avg_per_week,
+)
 from main.models import Game, MultiplayerGame, MultiplayerRound
-from main.filter.game_filter import GameFilter, MultiplayerGameFilter
+from main.filter.game_filter import GameFilter
+from main.utils import StatisticsMode
+
+
+def get_date_range(data: dict) -> slice | None:
+    """the date range of the cleaned filter data, None if it has no bound"""
+    dates = data.get("date")
+    # an empty range may be cleaned to slice(None, None), which is truthy but filters nothing
+    if dates and (dates.start or dates.stop):
+        return dates
+    return None
+
+
+def get_rollup_period(game_filter: GameFilter) -> tuple | None:
+    """date period of the filter or None if it filters by something the weekly rollups can not answer"""
+    if not game_filter.form.is_valid():
+        return None
+    data = game_filter.form.cleaned_data
+    if data.get("rounds") or data.get("score"):
+        return None
+    dates = get_date_range(data)
+    if not dates:
+        return None, None
+    # the range is cleaned to aware datetimes from 00:00 to 23:59, the rollups are cut by day
+    return tuple(bound.date() if bound else None for bound in (dates.start, dates.stop))
+
+
+def get_filters(request) -> tuple[GameFilter, QuerySet[Game], QuerySet[MultiplayerGame]]:
+    """the filter of the request and the singleplayer and multiplayer games of the user it selects"""
+    games = Game.objects.filter(player=request.user)
+    multiplayer_games = MultiplayerGame.objects.filter(game_players__player=request.user)
+    round_choices, score_choices = filter_choices.get_choices(request.user.id)
+    game_filter = GameFilter(
+        request.GET,
+        queryset=games,
+        round_choices=round_choices,
+        score_choices=score_choices,
+    )
+    # invalid values are left out of cleaned_data and do not filter, like in FilterSet.qs
+    game_filter.form.is_valid()
+    data = game_filter.form.cleaned_data
+    dates = get_date_range(data)
+    if not (data.get("rounds") or data.get("score") or dates):
+        return game_filter, games, multiplayer_games
+    if dates:
+        # multiplayer games are only filtered by date, with the range the form validated already
+        multiplayer_games = game_filter.filters["date"].filter(multiplayer_games, dates)
+    return game_filter, game_filter.qs, multiplayer_games
+
+
+def get_next_query(request, page: HistoryPage) -> str | None:
+    """query string of the next page, it keeps the filter of the request"""
+    if page.next_cursor is None:
+        return None
+    params = request.GET.copy()
+    params["cursor"] = page.next_cursor
+    return params.urlencode()
 
 
 class StatisticsView(views.View):
     def get(self, request):
         user = request.user
-        games = Game.objects.filter(player=user)
-        multiplayer_games = MultiplayerGame.objects.filter(game_players__player=user)
-        round_choices = set(games.values_list("rounds", flat=True))
-        score_choices = set(games.values_list("score", flat=True))
-        single_player_filter = GameFilter(
-            request.GET,
-            queryset=games,
-            round_choices=round_choices,
-            score_choices=score_choices,
-        )
-        multiplayer_filter = MultiplayerGameFilter(
-            request.GET, queryset=multiplayer_games
-        )
-        games = single_player_filter.qs
-        multiplayer_games = multiplayer_filter.qs
-        game_slice = games.count() - 10 if games.count() >= 10 else 0
-        multiplayer_game_slice = multiplayer_games.count() - 10 if multiplayer_games.count() >= 10 else 0
+        single_player_filter, games, multiplayer_games = get_filters(request)
+        period = get_rollup_period(single_player_filter)
+        params_digest = statistics_cache.get_params_digest(request.GET)
+        if period is None:
+            compute_statistics = lambda: get_statistics(games, multiplayer_games, user)
+            compute_week_avg_singleplayer = lambda: get_avg_per_week_singleplayer(games)
+            compute_week_avg_multiplayer = lambda: get_avg_per_week_multiplayer(multiplayer_games, user)
+        else:
+            # built once here, the computations below may run at the same time
+            ensure_rollups(user.id)
+            compute_statistics = lambda: get_rollup_statistics(user.id, *period)
+            compute_week_avg_singleplayer = lambda: get_rollup_avg_per_week(
+                user.id, StatisticsMode.SINGLEPLAYER, *period
+            )
+            compute_week_avg_multiplayer = lambda: get_rollup_avg_per_week(
+                user.id, StatisticsMode.MULTIPLAYER, *period
+            )
+        singleplayer_page = get_singleplayer_page(games)
+        multiplayer_page = get_multiplayer_page(multiplayer_games)
+        history = {
+            "singleplayer_games": singleplayer_page.games,
+            "singleplayer_next_query": get_next_query(request, singleplayer_page),
+            "multiplayer_games": multiplayer_page.games,
+            "multiplayer_next_query": get_next_query(request, multiplayer_page),
+        }
         if request.META.get("HTTP_HX_REQUEST"):
+            statistics = statistics_cache.get_or_compute(user.id, "statistics", params_digest, compute_statistics)
             return render(
                 request,
                 "statistics/partials/statistics.detail.html",
                 context={
-                    "singleplayer_games": games[game_slice:][::-1],
-                    "multiplayer_games": multiplayer_games[multiplayer_game_slice:][::-1],
-                    "statistics": get_statistics(games, multiplayer_games, user),
+                    **history,
+                    "statistics": statistics,
                     "filter": single_player_filter,
                 },
             )
 
+        # the three do not depend on each other, the page waits for the slowest one only
+        statistics, week_avg_singleplayer, week_avg_multiplayer = run_concurrently(
+            lambda: statistics_cache.get_or_compute(user.id, "statistics", params_digest, compute_statistics),
+            lambda: statistics_cache.get_or_compute(
+                user.id, "week_avg_singleplayer", params_digest, compute_week_avg_singleplayer
+            ),
+            lambda: statistics_cache.get_or_compute(
+                user.id, "week_avg_multiplayer", params_digest, compute_week_avg_multiplayer
+            ),
+        )
         return render(
             request,
             "statistics/statistics.html",
             context={
-                "singleplayer_games": games[game_slice:][::-1],
-                "multiplayer_games": multiplayer_games[multiplayer_game_slice:][::-1],
-                "statistics": get_statistics(games, multiplayer_games, user),
+                **history,
+                "statistics": statistics,
                 "filter": single_player_filter,
-                "week_avg_singleplayer": json.dumps(get_avg_per_week_singleplayer(games)),
-                "week_avg_multiplayer": json.dumps(get_avg_per_week_multiplayer(multiplayer_games))
+                "week_avg_singleplayer": json.dumps(week_avg_singleplayer),
+                "week_avg_multiplayer": json.dumps(week_avg_multiplayer)
             },
         )
+
+
+class StatisticsHistoryView(views.View):
+    """the rows of the next page of a game table of the statistics page, for the infinite scroll"""
+
+    def get(self, request, mode: str):
+        _, games, multiplayer_games = get_filters(request)
+        try:
+            if mode == "singleplayer":
+                page = get_singleplayer_page(games, request.GET.get("cursor"))
+            elif mode == "multiplayer":
+                page = get_multiplayer_page(multiplayer_games, request.GET.get("cursor"))
+            else:
+                raise Http404
+        except ValueError:
+            return HttpResponseBadRequest("invalid cursor")
+        return render(
+            request,
+            f"statistics/partials/history_rows_{mode}.html",
+            context={"games": page.games, "next_query": get_next_query(request, page)},
+        )
+
+
+class StatisticsCacheView(views.View):
+    def get(self, request):
+        return JsonResponse(statistics_cache.get_counters())